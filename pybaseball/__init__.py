@@ -5,7 +5,8 @@ from .playerid_lookup import playerid_lookup
 from .playerid_lookup import chadwick_register
 from .teamid_lookup import fangraphs_teams
 from .teamid_lookup import team_ids
-from .statcast import statcast, statcast_single_game
+from .statcast import statcast, statcast_iter, statcast_job_status, statcast_scan, statcast_single_game
+from .statcast_async import statcast_async
 from .statcast_pitcher import (
 	statcast_pitcher,
 	statcast_pitcher_exitvelo_barrels,
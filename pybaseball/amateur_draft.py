@@ -16,7 +16,7 @@ def get_draft_results(year: int, draft_round: int) -> pl.DataFrame:
     return draft_results
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def amateur_draft(year: int, draft_round: int, keep_stats: bool = True) -> pl.DataFrame:
     """
     Retrieves the MLB amateur draft results by year and round.
@@ -39,7 +39,7 @@ def drop_stats(draft_results: pl.DataFrame) -> pl.DataFrame:
     return draft_results
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def amateur_draft_by_team(
     team: str, year: int, keep_stats: bool = True
 ) -> pl.DataFrame:
@@ -1,4 +1,7 @@
 from .cache import config
 from .cache import df_cache
-from .cache import disable, enable, flush, purge
+from .cache import (add_listener, coalesced_calls, disable, drain_writes, enable, evict, export_bundle, flush,
+                    import_bundle, pin, purge, reindex, remove_listener, reset_stats, stats, tier_stats, unpin, usage,
+                    verify, write_stats)
 from .cache_config import CacheConfig
+from .expiry import ExpiryPolicy, FixedExpiry, SeasonalExpiry, set_policy
@@ -0,0 +1,251 @@
+'''
+Cache bundles: a cache's records and Statcast days packed into one archive, so one machine can warm a cache and
+others (e.g. ones without network access) can load it instead of fetching the same data again.
+
+A bundle is a tar file holding the cache records, with their dataframe paths relative to the record, their frames,
+the Statcast stores' day files, and a manifest.json listing them all with their SHA-256 checksums. Importing checks
+every checksum before it changes anything, then moves the files into the cache directory and merges them into the
+index and the Statcast manifests. No frame is read on either side.
+'''
+import hashlib
+import io
+import json
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Union, cast
+
+from . import cache_index, cache_record, expiry, file_utils, func_utils, statcast_store
+from .storage import LocalStorage, Storage
+
+BUNDLE_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+RECORDS_DIRECTORY = 'records'
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def export_bundle(cache_directory: str, path: str, funcs: Optional[Iterable[Union[str, Callable]]] = None,
+                  seasons: Optional[Iterable[int]] = None, storage: Optional[Storage] = None) -> Dict[str, int]:
+    '''
+    Pack the unexpired records of a cache directory (kept in storage, the cache directory itself if not given), and
+    its Statcast days, into a bundle at path.
+
+    funcs limits the records to those of the given functions (or function names); the Statcast days are included
+    unless 'statcast' is among them. seasons limits records to those whose season or date arguments cover one of
+    the seasons (records without any are left out), and Statcast days to the ones in them.
+    Returns the number of records and Statcast days exported.
+    '''
+    func_names = None if funcs is None else {
+        func if isinstance(func, str) else func_utils.get_func_name(func) for func in funcs
+    }
+    season_set = None if seasons is None else {int(season) for season in seasons}
+    manifest: Dict[str, Any] = {
+        'version': BUNDLE_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(),
+        'records': [],
+        'statcast': [],
+        'files': {},
+    }
+
+    storage = storage or LocalStorage(cache_directory)
+    with tarfile.open(path, 'w') as bundle:
+        index = cache_index.get_index(cache_directory, storage)
+        for filename in index.filenames():
+            try:
+                record = cache_record.CacheRecord(filename, storage=storage)
+            except (OSError, ValueError, KeyError):
+                # Unreadable, so it can't be a cache hit here either
+                continue
+            if record.expired or (func_names is not None and record.data.get('func') not in func_names):
+                continue
+            if season_set is not None and not _covers(record.data.get('kwargs') or {}, season_set):
+                continue
+            manifest['records'].append(_add_record(bundle, manifest['files'], record))
+
+        if func_names is None or 'statcast' in func_names:
+            for name in statcast_store.store_names(storage):
+                store = _add_store(bundle, manifest['files'], storage, name, season_set)
+                if store['days']:
+                    manifest['statcast'].append(store)
+
+        _add_bytes(bundle, MANIFEST_FILENAME, json.dumps(manifest, indent=1).encode('utf-8'))
+
+    return {
+        'records': len(manifest['records']),
+        'statcast_days': sum(len(store['days']) for store in manifest['statcast']),
+    }
+
+
+def import_bundle(cache_directory: str, path: str, storage: Optional[Storage] = None) -> Dict[str, int]:
+    '''
+    Merge a bundle made by export_bundle into a cache directory, with its records kept in storage (the cache
+    directory itself if not given). Every file is checked against its checksum first,
+    and nothing is changed if any of them doesn't match. Imported records replace the cache's records for the same
+    calls, and records that have expired since the export are skipped. Statcast days are kept when the cache
+    fetched them more recently than the bundle did.
+    Returns the number of records and Statcast days imported.
+    '''
+    file_utils.mkdir(cache_directory)
+    # Staged in the cache directory, so moving the files into place is a rename on the same filesystem
+    staging = tempfile.mkdtemp(dir=cache_directory, prefix='.bundle-')
+    try:
+        with tarfile.open(path, 'r') as bundle:
+            manifest = _read_manifest(bundle)
+            for name, checksum in manifest['files'].items():
+                _extract(bundle, name, checksum, staging)
+
+        storage = storage or LocalStorage(cache_directory)
+        index = cache_index.get_index(cache_directory, storage)
+        records = 0
+        for entry in manifest['records']:
+            records += _import_record(index, storage, staging, entry)
+
+        days = 0
+        for store in manifest['statcast']:
+            days += statcast_store.merge_days(storage, cache_directory, store['directory'], store['days'],
+                                              os.path.join(staging, *store['directory'].split('/')))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return {'records': records, 'statcast_days': days}
+
+
+def _covers(arguments: Dict[str, Any], seasons: Set[int]) -> bool:
+    # Whether the seasons or dates in a call's arguments span any of the seasons
+    years = []
+    for name in expiry.SEASON_ARGUMENTS + expiry.DATE_ARGUMENTS:
+        value = arguments.get(name)
+        if value is not None:
+            try:
+                years.append(int(str(value)[:4]))
+            except ValueError:
+                continue
+    return bool(years) and any(min(years) <= season <= max(years) for season in seasons)
+
+
+def _add_record(bundle: tarfile.TarFile, files: Dict[str, str], record: cache_record.CacheRecord) -> Dict[str, Any]:
+    data = dict(record.data)
+    entry: Dict[str, Any] = {
+        'key': cache_index.record_key(data),
+        'func': data.get('func', 'unknown_call'),
+        'expires': data['expires'],
+        'record': posixpath.join(RECORDS_DIRECTORY, os.path.basename(record.filename)),
+        'dataframe': None,
+    }
+    if data.get('dataframe'):
+        # Relative to the record, so the frame can be found wherever the bundle is imported
+        entry['dataframe'] = posixpath.join(RECORDS_DIRECTORY, os.path.basename(data['dataframe']))
+        data['dataframe'] = os.path.basename(data['dataframe'])
+        local_path = record.storage.local_path(record.data['dataframe'])
+        files[entry['dataframe']] = (
+            _add_file(bundle, entry['dataframe'], local_path) if local_path is not None
+            else _add_bytes(bundle, entry['dataframe'], record.storage.read(record.data['dataframe']))
+        )
+    files[entry['record']] = _add_bytes(bundle, entry['record'], json.dumps(data).encode('utf-8'))
+    return entry
+
+
+def _add_store(bundle: tarfile.TarFile, files: Dict[str, str], storage: Storage, name: str,
+               seasons: Optional[Set[int]]) -> Dict[str, Any]:
+    days = {
+        day: entry for day, entry in statcast_store.load_manifest(storage, name).items()
+        if seasons is None or int(day[:4]) in seasons
+    }
+    for day, entry in days.items():
+        if entry['rows'] > 0:
+            # Named the same in the bundle as in storage
+            member = posixpath.join(name, f'{day}.parquet')
+            local_path = storage.local_path(member)
+            files[member] = _add_file(bundle, member, local_path) if local_path is not None \
+                else _add_bytes(bundle, member, storage.read(member))
+    return {'directory': name, 'days': days}
+
+
+def _add_file(bundle: tarfile.TarFile, name: str, filename: str) -> str:
+    # Added and checksummed from the one open file, in case a save replaces the file meanwhile
+    with open(filename, 'rb') as file:
+        bundle.addfile(bundle.gettarinfo(arcname=name, fileobj=file), file)
+        file.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _add_bytes(bundle: tarfile.TarFile, name: str, content: bytes) -> str:
+    info = tarfile.TarInfo(name)
+    info.size = len(content)
+    info.mtime = int(datetime.now().timestamp())
+    bundle.addfile(info, io.BytesIO(content))
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_manifest(bundle: tarfile.TarFile) -> Dict[str, Any]:
+    try:
+        manifest_file = bundle.extractfile(MANIFEST_FILENAME)
+    except KeyError as ex:
+        raise ValueError(f"Not a cache bundle: it has no {MANIFEST_FILENAME}") from ex
+    assert manifest_file is not None
+    manifest = cast(Dict[str, Any], json.load(manifest_file))
+    if manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Unsupported cache bundle version: {manifest.get('version')}")
+    return manifest
+
+
+def _extract(bundle: tarfile.TarFile, name: str, checksum: str, staging: str) -> None:
+    # Only the files the manifest lists are extracted, and only below the staging directory
+    parts = name.split('/')
+    if posixpath.isabs(name) or '..' in parts:
+        raise ValueError(f"Cache bundle member {name} is outside the bundle")
+    try:
+        source = bundle.extractfile(name)
+    except KeyError as ex:
+        raise ValueError(f"Cache bundle is missing {name}") from ex
+    if source is None:
+        raise ValueError(f"Cache bundle member {name} is not a file")
+
+    filename = os.path.join(staging, *parts)
+    file_utils.mkdir(os.path.dirname(filename))
+    digest = hashlib.sha256()
+    with source, open(filename, 'wb') as target:
+        for chunk in iter(lambda: source.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            target.write(chunk)
+    if digest.hexdigest() != checksum:
+        raise ValueError(f"Cache bundle member {name} doesn't match its checksum")
+
+
+def _import_record(index: cache_index.CacheIndex, storage: Storage, staging: str, entry: Dict[str, Any]) -> int:
+    if expiry.expired(expiry.parse(entry['expires'])):
+        return 0
+
+    data = file_utils.load_json(os.path.join(staging, *entry['record'].split('/')))
+    assert isinstance(data, dict)
+    frame = data.pop('dataframe', None)
+    record = cache_record.CacheRecord(data=data, storage=storage)
+    # Keep the names from the bundle: records from before storage backends were named at random, not by their call
+    record.filename = posixpath.basename(entry['record'])
+    if frame is None:
+        del record.data['dataframe']
+    else:
+        record.data['dataframe'] = frame
+
+    # The frame goes first, so a stored record always has a complete frame to load
+    if entry['dataframe'] is not None:
+        storage.move_in(data['dataframe'], os.path.join(staging, *entry['dataframe'].split('/')))
+    record.save()
+
+    old_filename = index.get(entry['key'])
+    if old_filename is not None and old_filename != record.filename:
+        try:
+            cache_record.CacheRecord(old_filename, storage=storage).delete()
+        except FileNotFoundError:
+            pass
+    index.add(entry['key'], entry['func'], record.filename, entry['expires'],
+              cache_index.record_size(record.filename, data, storage))
+    return 1
+
@@ -1,13 +1,19 @@
 import abc
+import contextlib
 import datetime
 import functools
-import glob
-import os
-from typing import Any, Callable, Dict, Optional, TypeVar, cast
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar, Union, cast
 
 import polars as pl
 
-from . import cache_record, func_utils
+from . import (bundle, cache_index, cache_record, dataframe_utils, expiry, file_utils, func_utils, integrity,
+               statcast_store, storage)
+from .metrics import Listener, metrics as _metrics
+from .write_behind import writer as _writer
 from .cache_config import CacheConfig, autoload_cache
 
 # Doing this instead of defining the types in our cache functions allows VS Code to pick up the proper type annotations
@@ -26,96 +32,649 @@ def disable() -> None:
     config.enable(False)
 
 
+def _storage() -> storage.Storage:
+    return storage.from_config(config)
+
+
+def _index() -> cache_index.CacheIndex:
+    return cache_index.get_index(config.cache_directory, _storage())
+
+
+def _lock_directory() -> str:
+    # Shared storage keeps the locks where every process sharing it can see them
+    return _storage().lock_directory or config.cache_directory
+
+
+class _MemoryTier:
+    '''
+    An in-process LRU of recently returned frames, held to config.memory_max_bytes, that sits in front of the
+    on-disk cache. Frames are cloned on the way in and out (which is cheap, the column buffers are shared),
+    so a caller modifying its result in place can't change what the next caller gets.
+
+    Hits still count as uses of the record on disk, so a frame in steady use here isn't evicted from disk as least
+    recently used. touch_due() says when a hit should mark it used in the index, at most once a TOUCH_INTERVAL per
+    key, so a hot loop doesn't turn into a SQLite write per call.
+    '''
+
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(self) -> None:
+        self._frames: 'OrderedDict[str, Tuple[pl.DataFrame, int, expiry.Expiry]]' = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[pl.DataFrame]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            if expiry.expired(entry[2]):
+                self._discard(key)
+                return None
+            self._frames.move_to_end(key)
+            return entry[0].clone()
+
+    def put(self, key: str, frame: pl.DataFrame, expires: expiry.Expiry, max_bytes: Optional[int]) -> None:
+        if not max_bytes:
+            return
+        size = int(frame.estimated_size())
+        if size > max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._frames[key] = (frame.clone(), size, expires)
+            # Loading or saving the frame has just marked its record used
+            self._touched[key] = time.monotonic()
+            self._bytes += size
+            while self._bytes > max_bytes:
+                self._discard(next(iter(self._frames)))
+
+    def touch_due(self, key: str) -> bool:
+        ''' Whether a hit on key should mark its record used in the index, noting that it has if so '''
+        now = time.monotonic()
+        with self._lock:
+            if now - self._touched.get(key, float('-inf')) < self.TOUCH_INTERVAL:
+                return False
+            self._touched[key] = now
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._touched.clear()
+            self._bytes = 0
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._frames), 'bytes': self._bytes}
+
+    def _discard(self, key: str) -> None:
+        entry = self._frames.pop(key, None)
+        self._touched.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+_memory = _MemoryTier()
+
+_TIERS = ('memory', 'disk')
+_tier_counts = {tier: {'hits': 0, 'misses': 0} for tier in _TIERS}
+_tier_counts_lock = threading.Lock()
+
+
+def _count(tier: str, hit: bool) -> None:
+    with _tier_counts_lock:
+        _tier_counts[tier]['hits' if hit else 'misses'] += 1
+
+
+def tier_stats() -> Dict[str, Dict[str, int]]:
+    ''' Report the hits and misses of each cache tier in this process, and what the memory tier holds '''
+    with _tier_counts_lock:
+        stats = {tier: dict(counts) for tier, counts in _tier_counts.items()}
+    stats['memory'].update(_memory.usage())
+    return stats
+
+
+class _Flight:
+    ''' A cached call being made in this process, which identical calls made meanwhile wait on instead of repeating '''
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[pl.DataFrame] = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_coalesced = 0
+
+
+def write_stats() -> Dict[str, Union[int, float]]:
+    '''
+    Report on the background writes of cached frames in this process (see config.write_behind): how many are queued
+    now and at most, how many were written, failed, or written on the request path because the queue was full, and
+    the seconds spent writing in total and at most
+    '''
+    return _writer.stats()
+
+
+def drain_writes(timeout: Optional[float] = None) -> bool:
+    ''' Wait for the cached frames queued for writing to be written. Returns whether they were within timeout. '''
+    return _writer.drain(timeout)
+
+
+def coalesced_calls() -> int:
+    ''' Report how many calls in this process waited on an identical call already in flight instead of fetching '''
+    with _flights_lock:
+        return _coalesced
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    '''
+    Report what the cache did for each cached function in this process: its hits and misses, the bytes read and
+    seconds spent loading hits from disk, the seconds spent fetching misses, the saves and the bytes written and
+    seconds spent writing them, and the errors the cache recovered from (also logged to the 'pybaseball.cache'
+    logger)
+    '''
+    return _metrics.stats()
+
+
+def reset_stats() -> None:
+    _metrics.reset()
+
+
+def add_listener(listener: Listener) -> None:
+    '''
+    Call listener(event, func_name, details) on each cache event in this process: 'hit', 'miss', 'save' or 'error'.
+    The details are the event's counters (e.g. bytes_read, load_seconds) and, for hits, the tier that served it;
+    for errors, the stage that failed and the error.
+    '''
+    _metrics.add_listener(listener)
+
+
+def remove_listener(listener: Listener) -> None:
+    _metrics.remove_listener(listener)
+
+
 def purge() -> None:
     ''' Remove all records from the cache '''
-    record_files = glob.glob(os.path.join(config.cache_directory, '*.cache_record.json'))
-    records = [cache_record.CacheRecord(filename) for filename in record_files]
-    for record in records:
-        record.delete()
+    # Otherwise a queued write could land after the purge
+    _writer.drain()
+    _memory.clear()
+    index = _index()
+    for filename in index.filenames():
+        _delete_record(index, filename)
+    statcast_store.purge(_storage())
+    integrity.purge(config.cache_directory)
+    file_utils.remove_stale_locks(_lock_directory())
+
+
+def export_bundle(path: str, funcs: Optional[Iterable[Union[str, Callable]]] = None,
+                  seasons: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    '''
+    Pack the cache into a bundle file at path, for import_bundle() to load into another cache, e.g. on a machine
+    without network access: `cache.export_bundle('2019.tar', funcs=[pybaseball.batting_stats, 'statcast'],
+    seasons=[2019])`. funcs and seasons limit what's exported (see bundle.export_bundle).
+    Returns the number of records and Statcast days exported.
+    '''
+    # Otherwise frames still queued for writing would be left out
+    _writer.drain()
+    return bundle.export_bundle(config.cache_directory, path, funcs, seasons, _storage())
+
+
+def import_bundle(path: str) -> Dict[str, int]:
+    '''
+    Merge a bundle made by export_bundle() into the cache, replacing the cached results of the same calls.
+    Raises ValueError, leaving the cache as it was, if the bundle doesn't match its checksums.
+    Returns the number of records and Statcast days imported.
+    '''
+    counts = bundle.import_bundle(config.cache_directory, path, _storage())
+    # The memory tier may hold the results the bundle replaced
+    _memory.clear()
+    return counts
+
+
+def verify(workers: Optional[int] = None) -> Dict[str, int]:
+    '''
+    Check every cached frame against the size and checksum saved with it, with up to workers threads, quarantining
+    broken records (into quarantine/ in the cache directory) and repairing the index to match the records stored.
+    Returns the number of records checked, quarantined and reindexed, and of index entries removed.
+    '''
+    # Otherwise frames still queued for writing could be taken for missing
+    _writer.drain()
+    return integrity.verify(config.cache_directory, _storage(), workers)
 
 
 def flush() -> None:
-    ''' Remove all expired files from the cache '''
-    record_files = glob.glob(os.path.join(config.cache_directory, '*.cache_record.json'))
-    records = [cache_record.CacheRecord(filename) for filename in record_files]
-    for record in records:
-        if record.expired:
-            record.delete()
+    ''' Remove all expired files from the cache, and any lock files left behind by processes that were killed '''
+    index = _index()
+    for filename in index.filenames(expired_before=datetime.date.today()):
+        _delete_record(index, filename)
+    file_utils.remove_stale_locks(_lock_directory())
+
+
+def reindex() -> None:
+    ''' Rebuild the cache index from the cache records on disk '''
+    _index().rebuild()
+
+
+def usage() -> Dict[str, Optional[int]]:
+    '''
+    Report how much of the cache is used: the records and bytes in it (and how many of those are pinned),
+    the budget it's held to, the days and bytes taken by the day-partitioned Statcast cache (which count towards the
+    budget too), and the lock files in it (held now, or left behind by killed processes until the next flush or
+    eviction).
+    '''
+    report: Dict[str, Optional[int]] = dict(_index().usage())
+    report['max_bytes'] = config.max_bytes
+    report['max_entries'] = config.max_entries
+    days = statcast_store.stored_days(_storage())
+    report['statcast_days'] = len(days)
+    report['statcast_bytes'] = sum(day.size for day in days)
+    report['lock_files'] = len(file_utils.lock_filenames(_lock_directory()))
+    return report
+
+
+def evict() -> None:
+    '''
+    Remove the least recently used unpinned records and Statcast days until the cache is within max_bytes and
+    max_entries, along with any lock files left behind by processes that were killed
+    '''
+    index = _index()
+    days = statcast_store.stored_days(_storage())
+    usage = index.usage()
+    excess_bytes = usage['bytes'] + sum(day.size for day in days) - config.max_bytes \
+        if config.max_bytes is not None else 0
+    excess_entries = usage['entries'] + len(days) - config.max_entries if config.max_entries is not None else 0
+
+    if excess_bytes > 0 or excess_entries > 0:
+        # Records and Statcast days alike, least recently used first
+        candidates: List[Tuple[float, int, Union[str, statcast_store.StoredDay]]] = [
+            (accessed, size, filename) for filename, size, accessed in index.lru_records()
+        ]
+        candidates += [(day.accessed, day.size, day) for day in days]
+        evicted_days: Dict[str, List[str]] = {}
+        for _, size, candidate in sorted(candidates, key=lambda candidate: candidate[0]):
+            if excess_bytes <= 0 and excess_entries <= 0:
+                break
+            if isinstance(candidate, str):
+                _delete_record(index, candidate)
+            else:
+                evicted_days.setdefault(candidate.store, []).append(candidate.day)
+            excess_bytes -= size
+            excess_entries -= 1
+        for store, evicted in evicted_days.items():
+            statcast_store.remove_days(_storage(), config.cache_directory, store, evicted)
+
+    file_utils.remove_stale_locks(_lock_directory())
+
+
+_EVICTION_LOCK = threading.Lock()
+
+
+def _evict_in_background(func_name: str) -> None:
+    # At most one eviction runs at a time; a save that lands mid-eviction is picked up by the next one
+    if config.max_bytes is None and config.max_entries is None:
+        return
+    if not _EVICTION_LOCK.acquire(blocking=False):
+        return
+
+    def _evict() -> None:
+        try:
+            evict()
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(func_name, 'evict', ex)
+        finally:
+            _EVICTION_LOCK.release()
+
+    threading.Thread(target=_evict, name='pybaseball-cache-eviction', daemon=True).start()
+
+
+def pin(func: Callable, *args: Any, **kwargs: Any) -> None:
+    '''
+    Pin the cached result of func(*args, **kwargs) so it is never evicted, e.g. a completed season:
+    `cache.pin(pybaseball.batting_stats, 2019)`. The call needn't be cached yet.
+    '''
+    _index().pin(
+        cache_index.record_key(_func_data(func, args, kwargs, getattr(func, 'canonical', None)))
+    )
+
+
+def unpin(func: Callable, *args: Any, **kwargs: Any) -> None:
+    ''' Let the cached result of func(*args, **kwargs) be evicted again '''
+    _index().pin(
+        cache_index.record_key(_func_data(func, args, kwargs, getattr(func, 'canonical', None))), pinned=False
+    )
+
+
+def _func_data(func: Callable, args: Any, kwargs: Any,
+               canonical: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict:
+    func_name = func_utils.get_func_name(func)
+    # The table classes are left out of the key when they're self
+    bound_self = bool(args) and isinstance(args[0], abc.ABC)
+
+    try:
+        # Key on the arguments bound to the signature, so the same call made different ways hits the same record
+        positional, named = func_utils.canonical_arguments(func, args, kwargs)
+        if bound_self:
+            del named[next(iter(inspect.signature(func).parameters))]
+        if canonical is not None:
+            canonical(named)
+    except (TypeError, ValueError, KeyError, StopIteration):
+        # The call doesn't fit the signature (so it's about to fail anyway), or there's no signature to go by
+        positional = [func_utils.normalize(arg) for arg in args[1 if bound_self else 0:]]
+        named = {key: func_utils.normalize(arg) for key, arg in kwargs.items()}
+
+    return {"func": func_name, "args": positional, "kwargs": named}
+
+
+def _safe_func_name(func: Callable) -> str:
+    # For reporting an error, which may have come from get_func_name itself
+    try:
+        return func_utils.get_func_name(func)
+    except Exception:  # pylint: disable=broad-except
+        return getattr(func, '__name__', repr(func))
+
+
+def _delete_record(index: cache_index.CacheIndex, filename: str) -> None:
+    try:
+        cache_record.CacheRecord(filename).delete()
+    except FileNotFoundError:
+        pass
+    index.remove(filename)
 
  # pylint: disable=invalid-name
  # pylint: disable=too-few-public-methods
 class df_cache:
-    def __init__(self, expires: int = CacheConfig.DEFAULT_EXPIRATION):
+    '''
+    Cache a function's results. Results are kept for expires days, or until the named expiry policy says (see
+    expiry.POLICIES) when it has an opinion on the call, e.g. forever for a completed season.
+    Empty ones are kept as tombstones (a record holding the frame's schema, with no frame file) for empty_expires
+    days, or the configured empty_expiration if that's not given, so that e.g. days with no games aren't requested
+    again on every run. Tombstones a policy keeps forever are kept forever too.
+
+    Calls are keyed on their arguments bound to the function's signature, with defaults filled in, so the same call
+    made with positional or keyword arguments hits the same record. canonical can fill in what the signature can't
+    tell, e.g. an end_season that defaults to start_season: it's given the arguments by name to change in place.
+    '''
+
+    def __init__(self, expires: int = CacheConfig.DEFAULT_EXPIRATION, empty_expires: Optional[int] = None,
+                 policy: Optional[str] = None, canonical: Optional[Callable[[Dict[str, Any]], None]] = None):
         self.cache_config = config
         self.expires = expires
+        self.empty_expires = empty_expires
+        self.policy = policy
+        self.canonical = canonical
 
     def __call__(self, func: _CacheFunc) -> _CacheFunc:
         @functools.wraps(func)
-        def _cached(*args: Any, **kwargs: Any) -> pl.DataFrame:
+        def _cached(*args: Any, **kwargs: Any) -> Optional[pl.DataFrame]:
             func_data = self._safe_get_func_data(func, args, kwargs)
             result = self._safe_load_func_cache(func_data)
 
             if result is None:
-                result = func(*args, **kwargs)
-                if len(result) > 0:
-                    self._safe_save_func_cache(func_data, result)
+                result = self._coalesced(func, args, kwargs, func_data)
 
             return result
 
+        _cached.canonical = self.canonical  # type: ignore
         return cast(_CacheFunc, _cached)
 
-    def _safe_get_func_data(self, func: _CacheFunc, args: Any, kwargs: Any) -> Dict:
+    def _coalesced(self, func: _CacheFunc, args: Any, kwargs: Any, func_data: Dict) -> Optional[pl.DataFrame]:
+        # Identical calls missing the cache at the same time in this process (threads, or coroutines running
+        # them in an executor) share one fetch: the first makes it and the rest wait on its result.
+        key = self._safe_get_record_key(func_data)
+        if key is None:
+            return self._fetch(func, args, kwargs, func_data)
+
+        global _coalesced  # pylint: disable=global-statement
+        with _flights_lock:
+            flight = _flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _flights[key] = _Flight()
+            else:
+                _coalesced += 1
+        assert flight is not None
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                if not isinstance(flight.error, Exception):
+                    # The first call was interrupted rather than failing, so make the call afresh
+                    return self._coalesced(func, args, kwargs, func_data)
+                # Raise an exception of our own, chained to the first call's: raising that one from every waiting
+                # thread would have them all appending to the one traceback
+                try:
+                    error: Exception = type(flight.error)(*flight.error.args)
+                except Exception:  # pylint: disable=broad-except
+                    error = RuntimeError(f"{func_data['func']} failed in an identical call made at the same time")
+                raise error from flight.error
+            if flight.result is None:
+                return None
+            _metrics.record('hit', func_data['func'], tier='coalesced')
+            return flight.result.clone()
+
         try:
-            func_name = func_utils.get_func_name(func)
+            flight.result = self._fetch(func, args, kwargs, func_data)
+            return flight.result
+        except BaseException as ex:
+            flight.error = ex
+            raise
+        finally:
+            with _flights_lock:
+                del _flights[key]
+            flight.done.set()
+
+    def _fetch(self, func: _CacheFunc, args: Any, kwargs: Any, func_data: Dict) -> Optional[pl.DataFrame]:
+        with contextlib.ExitStack() as stack:
+            # Only one process fetches a given call at a time.
+            # The rest wait for it, then load what it cached.
+            result = None
+            if self._safe_lock(func_data, stack):
+                result = self._safe_load_func_cache(func_data, count=False)
+
+            if result is None:
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                if func_data:
+                    _metrics.record('miss', func_data['func'], fetch_seconds=time.perf_counter() - start)
+                if result is not None:
+                    self._safe_save_func_cache(func_data, result, self._safe_expires(func, args, kwargs, result),
+                                               stack)
+
+        return result
 
+    def _safe_get_func_data(self, func: _CacheFunc, args: Any, kwargs: Any) -> Dict:
+        try:
             # Skip all this if cache is disabled
             if not self.cache_config.enabled:
                 return {}
 
-            arglist = list(args)  # tuple won't come through the JSONify well
-            if arglist and isinstance(arglist[0], abc.ABC):  # remove the table classes when they're self
-                arglist = arglist[1:]
-
-            arglist = [
-                (
-                    arg.isoformat()
-                    if any(
-                        map(
-                            lambda dtype: isinstance(arg, dtype),
-                            [datetime.datetime, datetime.date],
-                        )
-                    )
-                    else arg
-                )
-                for arg in arglist
-            ]
-
-            return {"func": func_name, "args": arglist, "kwargs": kwargs}
-        except:  # pylint: disable=bare-except
+            return _func_data(func, args, kwargs, self.canonical)
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(_safe_func_name(func), 'key', ex)
             return {}
 
-    def _safe_load_func_cache(self, func_data: Dict) -> Optional[pl.DataFrame]:
+    @staticmethod
+    def _safe_get_record_key(func_data: Dict) -> Optional[str]:
+        try:
+            return cache_index.record_key(func_data) if func_data else None
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(func_data['func'], 'key', ex)
+            return None
+
+    def _safe_lock(self, func_data: Dict, stack: contextlib.ExitStack) -> bool:
+        try:
+            if not func_data:
+                return False
+
+            lock_filename = file_utils.lock_filename(_lock_directory(), cache_index.record_key(func_data))
+            stack.enter_context(file_utils.FileLock(lock_filename))
+            return True
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(func_data['func'], 'lock', ex)
+            return False
+
+    def _safe_load_func_cache(self, func_data: Dict, count: bool = True) -> Optional[pl.DataFrame]:
         try:
-            glob_path = os.path.join(self.cache_config.cache_directory, f'{func_data["func"]}*.cache_record.json')
+            if not func_data:
+                return None
 
-            record_files = glob.glob(glob_path)
+            func_name = func_data['func']
+            key = cache_index.record_key(func_data)
+            if self.cache_config.memory_max_bytes:
+                result = _memory.get(key)
+                if count:
+                    _count('memory', result is not None)
+                if result is not None:
+                    if _memory.touch_due(key):
+                        self._safe_touch(func_name, key)
+                    _metrics.record('hit', func_name, tier='memory')
+                    return result
 
-            records = [cache_record.CacheRecord(filename) for filename in record_files]
+            # A frame still on its way to disk
+            result = _writer.pending(key)
+            if result is not None:
+                if count:
+                    _count('disk', True)
+                _metrics.record('hit', func_name, tier='pending')
+                return result
 
-            for record in records:
-                if not record.expired and record.supports(func_data):
-                    return record.load_df()
+            start = time.perf_counter()
+            loaded = self._load_from_disk(key, func_data)
+            if count:
+                _count('disk', loaded is not None)
+            if loaded is None:
+                return None
 
+            result, expires, size = loaded
+            _metrics.record('hit', func_name, tier='disk', bytes_read=size, load_seconds=time.perf_counter() - start)
+            _memory.put(key, result, expires, self.cache_config.memory_max_bytes)
+            return result
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(func_data['func'], 'load', ex)
             return None
-        except:  # pylint: disable=bare-except
+
+    def _safe_touch(self, func_name: str, key: str) -> None:
+        try:
+            _index().touch(key)
+        except Exception as ex:  # pylint: disable=broad-except
+            # Only the eviction order is lost, the hit is still good
+            _metrics.error(func_name, 'touch', ex)
+
+    def _load_from_disk(self, key: str, func_data: Dict,
+                        retry: bool = True) -> Optional[Tuple[pl.DataFrame, expiry.Expiry, int]]:
+        index = _index()
+        filename = index.get(key)
+        indexed = filename is not None
+        if filename is None:
+            # Another process sharing the storage, with an index of its own, may have saved it
+            filename = cache_record.record_filename(func_data)
+            if not _storage().exists(filename):
+                return None
+
+        try:
+            record = cache_record.CacheRecord(filename)
+        except FileNotFoundError:
+            # The index outlived the record
+            index.remove(filename)
             return None
+        except ValueError as ex:
+            return self._load_broken(key, func_data, retry, index, _storage(), filename, None, ex)
+        if record.expired:
+            _delete_record(index, filename)
+            return None
+
+        if record.supports(func_data):
+            try:
+                result = record.load_df()
+            except (FileNotFoundError, dataframe_utils.CorruptFrameError) as ex:
+                # Left broken, e.g. by a process killed mid-write
+                return self._load_broken(key, func_data, retry, index, record.storage, filename, record.data, ex)
+            size = cache_index.record_size(filename, record.data, record.storage)
+            if indexed:
+                index.touch(key)
+            else:
+                index.add(key, func_data['func'], filename, record.data['expires'], size)
+            return result, record.expires, size
+
+        return None
+
+    def _load_broken(self, key: str, func_data: Dict, retry: bool, index: cache_index.CacheIndex,
+                     record_storage: storage.Storage, filename: str, data: Optional[Dict[str, Any]],
+                     ex: Exception) -> Optional[Tuple[pl.DataFrame, expiry.Expiry, int]]:
+        # Set aside, so later calls don't trip on it too, and this one is fetched again like any miss
+        if integrity.quarantine(config.cache_directory, record_storage, index, filename, data, repr(ex)):
+            return None
+        # Saved again since it was read (e.g. by another process fetching the same call), so load that instead
+        if retry:
+            return self._load_from_disk(key, func_data, retry=False)
+        raise ex
+
+    def _safe_expires(self, func: _CacheFunc, args: Any, kwargs: Any, result: pl.DataFrame) -> expiry.Expiry:
+        today = datetime.date.today()
+        expires: expiry.Expiry = today + datetime.timedelta(days=self.expires)
+        if self.policy is not None:
+            try:
+                expires = expiry.get_policy(self.policy).expires(func_utils.bind_arguments(func, args, kwargs)) \
+                    or expires
+            except Exception as ex:  # pylint: disable=broad-except
+                _metrics.error(_safe_func_name(func), 'expiry', ex)
+
+        if len(result) == 0 and expires != expiry.NEVER:
+            empty_expires = self.empty_expires if self.empty_expires is not None else self.cache_config.empty_expiration
+            expires = expiry.earliest(expires, today + datetime.timedelta(days=empty_expires))
+        return expires
 
-    def _safe_save_func_cache(self, func_data: Dict, result: pl.DataFrame) -> None:
+    def _safe_save_func_cache(self, func_data: Dict, result: pl.DataFrame, expires: expiry.Expiry,
+                              stack: Optional[contextlib.ExitStack] = None) -> None:
         try:
             if self.cache_config.enabled and func_data:
-                new_record = cache_record.CacheRecord(data=func_data, expires=self.expires)
-                new_record.save()
-                new_record.save_df(result)
-        except:  # pylint: disable=bare-except
-            pass
+                key = cache_index.record_key(func_data)
+                _memory.put(key, result, expires, self.cache_config.memory_max_bytes)
+
+                if self.cache_config.write_behind:
+                    # The writer takes over the call's lock (if any) and releases it once the frame is written,
+                    # so other processes still wait for the write rather than fetching the call again
+                    held = stack.pop_all() if stack is not None else contextlib.ExitStack()
+                    frame = result.clone()
+
+                    def _write() -> None:
+                        with held:
+                            try:
+                                self._save_to_disk(key, func_data, frame, expires)
+                            except Exception as ex:  # pylint: disable=broad-except
+                                # Still raised, for the writer to count the failure
+                                _metrics.error(func_data['func'], 'write', ex)
+                                raise
+
+                    if _writer.submit(key, frame, _write, self.cache_config.write_behind_queue):
+                        return
+                    # The queue is full, so write it here, still holding the lock
+                    if stack is not None:
+                        stack.enter_context(held)
+
+                self._save_to_disk(key, func_data, result, expires)
+        except Exception as ex:  # pylint: disable=broad-except
+            _metrics.error(func_data['func'], 'save', ex)
+
+    def _save_to_disk(self, key: str, func_data: Dict, result: pl.DataFrame, expires: expiry.Expiry) -> None:
+        start = time.perf_counter()
+        index = _index()
+        new_record = cache_record.CacheRecord(data=func_data, expires=expires)
+        # The frame goes first, so a stored record always has a complete frame to load
+        new_record.save_df(result)
+        new_record.save()
+
+        # Replace any stale record for this call (e.g. one whose frame failed to load)
+        old_filename = index.get(key)
+        if old_filename is not None and old_filename != new_record.filename:
+            _delete_record(index, old_filename)
+
+        size = cache_index.record_size(new_record.filename, new_record.data, new_record.storage)
+        index.add(key, func_data['func'], new_record.filename, new_record.data['expires'], size)
+        _metrics.record('save', func_data['func'], bytes_written=size, save_seconds=time.perf_counter() - start)
+        _evict_in_background(func_data['func'])
 
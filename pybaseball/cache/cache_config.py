@@ -1,6 +1,6 @@
 import os
 import pathlib
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from . import file_utils
 from ..datahelpers import singleton
@@ -9,23 +9,107 @@ from ..datahelpers import singleton
 class CacheConfig(singleton.Singleton):
     DEFAULT_CACHE_DIR = os.path.join(pathlib.Path.home(), '.pybaseball', 'cache')
     DEFAULT_EXPIRATION = 7  # number of days to cache by default
+    DEFAULT_EMPTY_EXPIRATION = 1  # number of days to cache empty results by default
+    DEFAULT_WRITE_BEHIND_QUEUE = 16  # number of frames that can wait to be written in the background
+    STORAGE_TYPES = ('local', 'shared', 'http')
     DEFAULT_CACHE_TYPE = 'parquet'
+    CACHE_TYPES = ('csv', 'parquet', 'arrow', 'feather')
+    DEFAULT_PARQUET_COMPRESSION = 'zstd'
+    PARQUET_COMPRESSIONS = ('zstd', 'lz4', 'snappy', 'uncompressed')
     CFG_FILENAME = 'cache_config.json'
     PYBASEBALL_CACHE_ENV = 'PYBASEBALL_CACHE'
 
-    def __init__(self, enabled: bool = False, default_expiration: int = None, cache_type: Optional[str] = None):
+    def __init__(self, enabled: bool = False, default_expiration: int = None, cache_type: Optional[str] = None,
+                 max_bytes: Optional[int] = None, max_entries: Optional[int] = None,
+                 memory_max_bytes: Optional[int] = None, parquet_compression: Optional[str] = None,
+                 parquet_compression_level: Optional[int] = None, parquet_row_group_size: Optional[int] = None,
+                 empty_expiration: Optional[int] = None, write_behind: bool = False,
+                 write_behind_queue: Optional[int] = None, storage_type: Optional[str] = None,
+                 storage_location: Optional[str] = None):
         self.enabled = enabled
         self.cache_directory = os.environ.get(CacheConfig.PYBASEBALL_CACHE_ENV) or CacheConfig.DEFAULT_CACHE_DIR
         self.default_expiration = default_expiration or CacheConfig.DEFAULT_EXPIRATION
         if cache_type is not None:
             self.cache_type = cache_type.lower()
-            if self.cache_type not in ('csv', 'parquet'):
+            if self.cache_type not in CacheConfig.CACHE_TYPES:
                 raise ValueError(f"Invalid cache_type: {cache_type}")
         else:
             self.cache_type = CacheConfig.DEFAULT_CACHE_TYPE
 
+        # Empty results (e.g. a day with no games) are cached as tombstones, for a shorter time than data
+        if empty_expiration is not None and empty_expiration < 0:
+            raise ValueError(f"Invalid empty_expiration: {empty_expiration}")
+        self.empty_expiration = (
+            empty_expiration if empty_expiration is not None else CacheConfig.DEFAULT_EMPTY_EXPIRATION
+        )
+
+        # Size budget for the cache (None is unbounded), past which the least recently used records are evicted,
+        # and for the in-process memory tier in front of it (None disables it)
+        budgets = (('max_bytes', max_bytes), ('max_entries', max_entries), ('memory_max_bytes', memory_max_bytes))
+        for name, value in budgets:
+            if value is not None and value < 0:
+                raise ValueError(f"Invalid {name}: {value}")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.memory_max_bytes = memory_max_bytes
+
+        # Write cached frames on a background thread, with at most write_behind_queue of them waiting
+        if write_behind_queue is not None and write_behind_queue < 1:
+            raise ValueError(f"Invalid write_behind_queue: {write_behind_queue}")
+        self.write_behind = write_behind
+        self.write_behind_queue = write_behind_queue or CacheConfig.DEFAULT_WRITE_BEHIND_QUEUE
+
+        # Where records, their frames and the Statcast days are kept (see storage.py): the cache directory, unless
+        # storage_location says otherwise. The index stays in the cache directory.
+        self.storage_type = (storage_type or 'local').lower()
+        if self.storage_type not in CacheConfig.STORAGE_TYPES:
+            raise ValueError(f"Invalid storage_type: {storage_type}")
+        if self.storage_type == 'http' and not storage_location:
+            raise ValueError("storage_location must be the bucket URL for the 'http' storage_type")
+        self.storage_location = storage_location
+
+        # Parquet layout, checked whenever it's set (see the properties below)
+        self.parquet_compression = parquet_compression
+        self.parquet_compression_level = parquet_compression_level
+        self.parquet_row_group_size = parquet_row_group_size
+
         file_utils.mkdir(self.cache_directory)
 
+    @property
+    def parquet_compression(self) -> str:
+        return self._parquet_compression
+
+    @parquet_compression.setter
+    def parquet_compression(self, parquet_compression: Optional[str]) -> None:
+        # 'none' is accepted for 'uncompressed'
+        compression = (parquet_compression or CacheConfig.DEFAULT_PARQUET_COMPRESSION).lower()
+        compression = 'uncompressed' if compression == 'none' else compression
+        if compression not in CacheConfig.PARQUET_COMPRESSIONS:
+            raise ValueError(f"Invalid parquet_compression: {parquet_compression}")
+        self._parquet_compression = compression
+
+    @property
+    def parquet_compression_level(self) -> Optional[int]:
+        return self._parquet_compression_level
+
+    @parquet_compression_level.setter
+    def parquet_compression_level(self, parquet_compression_level: Optional[int]) -> None:
+        # Only zstd takes a level. It's kept when switching to another codec (which ignores it), so switching back
+        # restores it and a saved config never becomes invalid.
+        if parquet_compression_level is not None and not 1 <= parquet_compression_level <= 22:
+            raise ValueError(f"Invalid parquet_compression_level: {parquet_compression_level}")
+        self._parquet_compression_level = parquet_compression_level
+
+    @property
+    def parquet_row_group_size(self) -> Optional[int]:
+        return self._parquet_row_group_size
+
+    @parquet_row_group_size.setter
+    def parquet_row_group_size(self, parquet_row_group_size: Optional[int]) -> None:
+        if parquet_row_group_size is not None and parquet_row_group_size < 1:
+            raise ValueError(f"Invalid parquet_row_group_size: {parquet_row_group_size}")
+        self._parquet_row_group_size = parquet_row_group_size
+
     def enable(self, enabled: bool = True) -> None:
         self.enabled = enabled
         if self.enabled:
@@ -38,10 +122,30 @@ class CacheConfig(singleton.Singleton):
         data = {
             'enabled': self.enabled,
             'default_expiration': self.default_expiration,
+            'empty_expiration': self.empty_expiration,
             'cache_type': self.cache_type.lower(), # in case of "Parquet" or "CSV", ensures a uniform filename.
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'memory_max_bytes': self.memory_max_bytes,
+            'write_behind': self.write_behind,
+            'write_behind_queue': self.write_behind_queue,
+            'storage_type': self.storage_type,
+            'storage_location': self.storage_location,
+            'parquet_compression': self.parquet_compression,
+            'parquet_compression_level': self.parquet_compression_level,
+            'parquet_row_group_size': self.parquet_row_group_size,
         }
         file_utils.safe_jsonify(self.cache_directory, CacheConfig.CFG_FILENAME, data)
 
+    def parquet_options(self) -> Dict[str, Any]:
+        ''' Get the write_parquet arguments for the configured layout, leaving out the ones left to polars '''
+        options: Dict[str, Any] = {'compression': self.parquet_compression, 'statistics': True}
+        if self.parquet_compression == 'zstd' and self.parquet_compression_level is not None:
+            options['compression_level'] = self.parquet_compression_level
+        if self.parquet_row_group_size is not None:
+            options['row_group_size'] = self.parquet_row_group_size
+        return options
+
 
 def autoload_cache() -> CacheConfig:
     ''' Load from the policy file if it exists, otherwise create an object '''
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import file_utils
+from .metrics import logger
+from .storage import LocalStorage, Storage
+
+INDEX_FILENAME = 'cache_index.sqlite'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    func TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    expires TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    accessed REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS records_expires ON records (expires);
+CREATE TABLE IF NOT EXISTS pins (
+    key TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+'''
+
+
+def record_key(func_data: Dict[str, Any]) -> str:
+    ''' Build the canonical hash for a cached call from its func, args and kwargs '''
+    payload = json.dumps(
+        [func_data.get('func'), func_data.get('args'), func_data.get('kwargs')],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def record_size(filename: str, data: Dict[str, Any], storage: Optional[Storage] = None) -> int:
+    ''' Get the bytes a record takes in storage (or on disk, by path): the record itself plus its dataframe '''
+    storage = storage or LocalStorage(os.getcwd())
+    size = 0
+    for name in (filename, data.get('dataframe')):
+        if name:
+            try:
+                # The record knows its frame's size, which saves asking the storage
+                size += data['dataframe_size'] if name == data.get('dataframe') and 'dataframe_size' in data \
+                    else storage.size(name)
+            except FileNotFoundError:
+                pass
+    return size
+
+
+class CacheIndex:
+    '''
+    A SQLite index of every cache record in a cache directory, keyed by the record_key of the call.
+
+    This lets lookups, flushes and purges touch only the records they need instead of globbing and parsing
+    every cache_record.json in the directory.
+    It also tracks the size and last access of each record, and which calls are pinned, for LRU eviction.
+    '''
+
+    def __init__(self, cache_directory: str, storage: Optional[Storage] = None):
+        self.cache_directory = cache_directory
+        # Where the records are, for rebuilding the index from them
+        self.storage = storage or LocalStorage(cache_directory)
+        self.filename = os.path.join(cache_directory, INDEX_FILENAME)
+        file_utils.mkdir(cache_directory)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+            self._add_missing_columns(conn)
+        if not self._migrated():
+            self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.filename, timeout=30)
+
+    @staticmethod
+    def _add_missing_columns(conn: sqlite3.Connection) -> None:
+        # Indexes created before records were sized won't have the eviction columns yet
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(records)')}
+        if 'size' not in columns:
+            conn.execute('ALTER TABLE records ADD COLUMN size INTEGER NOT NULL DEFAULT 0')
+        if 'accessed' not in columns:
+            conn.execute('ALTER TABLE records ADD COLUMN accessed REAL NOT NULL DEFAULT 0')
+
+    def _migrated(self) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'migrated'").fetchone()
+        return row is not None
+
+    def get(self, key: str) -> Optional[str]:
+        ''' Get the record filename for a key, if there is one '''
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT filename FROM records WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, key: str, func: str, filename: str, expires: str, size: int = 0) -> None:
+        ''' Add or replace the record for a key '''
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO records (key, func, filename, expires, size, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, func, filename, expires, size, time.time())
+            )
+
+    def touch(self, key: str) -> None:
+        ''' Mark the record for a key as just used '''
+        with closing(self._connect()) as conn, conn:
+            conn.execute('UPDATE records SET accessed = ? WHERE key = ?', (time.time(), key))
+
+    def pin(self, key: str, pinned: bool = True) -> None:
+        ''' Pin (or unpin) the record for a key so it is never evicted. The key needn't be cached yet. '''
+        with closing(self._connect()) as conn, conn:
+            if pinned:
+                conn.execute('INSERT OR IGNORE INTO pins (key) VALUES (?)', (key,))
+            else:
+                conn.execute('DELETE FROM pins WHERE key = ?', (key,))
+
+    def usage(self) -> Dict[str, int]:
+        ''' Count the records in the index and the bytes they take, in total and for the pinned ones '''
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records').fetchone()
+            pinned_entries, pinned_size = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records WHERE key IN (SELECT key FROM pins)'
+            ).fetchone()
+        return {'entries': entries, 'bytes': size, 'pinned_entries': pinned_entries, 'pinned_bytes': pinned_size}
+
+    def lru_filenames(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None) -> List[str]:
+        '''
+        List the least recently used unpinned records that have to go to bring the cache within budget,
+        oldest first. Pinned records count towards the budget but are never listed.
+        '''
+        usage = self.usage()
+        excess_bytes = usage['bytes'] - max_bytes if max_bytes is not None else 0
+        excess_entries = usage['entries'] - max_entries if max_entries is not None else 0
+        if excess_bytes <= 0 and excess_entries <= 0:
+            return []
+
+        filenames = []
+        for filename, size, _ in self.lru_records():
+            if excess_bytes <= 0 and excess_entries <= 0:
+                break
+            filenames.append(filename)
+            excess_bytes -= size
+            excess_entries -= 1
+        return filenames
+
+    def lru_records(self) -> List[Tuple[str, int, float]]:
+        ''' List the filename, size and last access of every unpinned record, least recently used first '''
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                'SELECT filename, size, accessed FROM records WHERE key NOT IN (SELECT key FROM pins) ORDER BY accessed'
+            ).fetchall()
+        return [(filename, size, accessed) for filename, size, accessed in rows]
+
+    def entries(self) -> Dict[str, Tuple[str, int]]:
+        ''' Map the key of every record in the index to its filename and size '''
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT key, filename, size FROM records').fetchall()
+        return {key: (filename, size) for key, filename, size in rows}
+
+    def remove(self, filename: str) -> None:
+        ''' Remove the record stored in filename from the index '''
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM records WHERE filename = ?', (filename,))
+
+    def filenames(self, expired_before: Optional[date] = None) -> List[str]:
+        ''' List every record filename, or only those that expired before the given date '''
+        with closing(self._connect()) as conn:
+            if expired_before is None:
+                rows = conn.execute('SELECT filename FROM records').fetchall()
+            else:
+                rows = conn.execute(
+                    'SELECT filename FROM records WHERE expires < ?', (str(expired_before),)
+                ).fetchall()
+        return [row[0] for row in rows]
+
+    def rebuild(self) -> None:
+        '''
+        Rebuild the index from the cache_record.json files on disk.
+
+        This is run automatically the first time an index is opened on a cache directory,
+        so caches written before the index existed keep working.
+        '''
+        entries = list(self._scan_records())
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM records')
+            conn.executemany(
+                'INSERT OR REPLACE INTO records (key, func, filename, expires, size, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                entries
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('migrated', '1')")
+
+    def _scan_records(self) -> Iterator[tuple]:
+        for filename in self.storage.names('.cache_record.json'):
+            try:
+                data = self.storage.read_json(filename)
+                assert isinstance(data, dict)
+                yield (record_key(data), data.get('func', 'unknown_call'), filename, data['expires'],
+                       record_size(filename, data, self.storage), self.storage.modified(filename))
+            except Exception as ex:  # pylint: disable=broad-except
+                # An unreadable record can never be a cache hit, so leave it out of the index
+                logger.warning('Leaving unreadable cache record %s out of the index: %r', filename, ex)
+                continue
+
+
+_INDEXES: Dict[str, CacheIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_index(cache_directory: str, storage: Optional[Storage] = None) -> CacheIndex:
+    '''
+    Get the index for a cache directory, of the records in storage (the cache directory itself if not given),
+    opening (and migrating) it on first use
+    '''
+    with _INDEXES_LOCK:
+        if cache_directory not in _INDEXES:
+            _INDEXES[cache_directory] = CacheIndex(cache_directory, storage)
+        elif storage is not None:
+            _INDEXES[cache_directory].storage = storage
+        return _INDEXES[cache_directory]
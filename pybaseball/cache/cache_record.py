@@ -1,28 +1,43 @@
-import os
+import uuid
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, Optional, Union, cast
 
 import polars as pl
 
-from . import cache_config, dataframe_utils, file_utils
+from . import cache_config, cache_index, dataframe_utils, expiry
+from .storage import Storage, from_config
 
 cfg = cache_config.autoload_cache()
 
-DateOrNumDays = Union[date, int]
+DateOrNumDays = Union[expiry.Expiry, int]
+
+
+def record_filename(data: Dict[str, Any]) -> str:
+    '''
+    Get the name a call's record is stored under. It's derived from the call, so every process sharing a storage
+    finds a call's record under the same name.
+    '''
+    return f"{data.get('func', 'unknown_call')}-{cache_index.record_key(data)}.cache_record.json"
 
 
 class CacheRecord:
     def __init__(self, filename: str = None, data: Optional[Dict[str, Any]] = None,
-                 expires: DateOrNumDays = cache_config.CacheConfig.DEFAULT_EXPIRATION):
-        ''' Create a new cache record. Loads from file if filename is provided, otherwise creates from data, expires '''
+                 expires: DateOrNumDays = cache_config.CacheConfig.DEFAULT_EXPIRATION,
+                 storage: Optional[Storage] = None):
+        '''
+        Create a new cache record. Loads from file if filename is provided, otherwise creates from data, expires.
+        Records are kept in storage, the configured storage if it isn't given, with their frames named relative to it.
+        '''
 
         if filename is None and data is None:
             raise ValueError("CacheRecord must be instantiated with either a file or source data.")
 
+        self.storage = storage or from_config(cfg)
+
         if filename:
-            self.data = cast(Dict[str, Any], file_utils.load_json(filename))
+            self.data = cast(Dict[str, Any], self.storage.read_json(filename))
             assert isinstance(self.data, dict)
-            self.expiration_date = datetime.strptime(self.data['expires'], "%Y-%m-%d").date()
+            self.expires = expiry.parse(self.data['expires'])
             self.filename = filename
             return
 
@@ -31,35 +46,71 @@ class CacheRecord:
         if 'expires' not in data:
             if isinstance(expires, int):
                 expires = date.today() + timedelta(days=expires)
-            self.expiration_date = expires
-            data['expires'] = str(expires)
+            data['expires'] = expiry.serialize(expires)
+        self.expires = expiry.parse(data['expires'])
 
         self.data = cast(Dict, data)
-        base = self.data.get('func', 'unknown_call') + str(datetime.now().timestamp())
-        base = os.path.join(cfg.cache_directory, base)
-        frame_name = base + '.' + cfg.cache_type
-        self.data['dataframe'] = frame_name
-        self.filename = base + '.cache_record.json'
+        self.filename = record_filename(self.data)
+        # Each save gets a frame of its own, so a process loading the record it replaces still finds that record's
+        # frame (until it's removed)
+        self.data['dataframe'] = f"{self.data.get('func', 'unknown_call')}-{uuid.uuid4().hex}.{cfg.cache_type}"
 
     def save(self) -> None:
-        ''' Store the cache record to disk '''
-        file_utils.safe_jsonify(cfg.cache_directory, self.filename, self.data)
+        ''' Store the cache record, in place of any earlier record of the call, whose frame is then removed '''
+        replaced_frame = self._stored_frame()
+        self.storage.write_json(self.filename, self.data)
+        if replaced_frame is not None and replaced_frame != self.data.get('dataframe'):
+            try:
+                self.storage.delete(replaced_frame)
+            except FileNotFoundError:
+                pass
+
+    def _stored_frame(self) -> Optional[str]:
+        try:
+            data = self.storage.read_json(self.filename)
+        except (FileNotFoundError, ValueError):
+            return None
+        return data.get('dataframe') if isinstance(data, dict) else None
+
+    @property
+    def expiration_date(self) -> date:
+        ''' The last day the record is good for (for at least some of the day) '''
+        if isinstance(self.expires, datetime):
+            return self.expires.astimezone().date()
+        return self.expires
 
     @property
     def expired(self) -> bool:
-        return date.today() > self.expiration_date
+        return expiry.expired(self.expires)
+
+    @property
+    def empty(self) -> bool:
+        ''' Whether this is a tombstone for an empty result, which keeps its schema in the record instead of a file '''
+        return 'empty_schema' in self.data
 
     def load_df(self) -> pl.DataFrame:
-        return dataframe_utils.load_df(self.data['dataframe'])
+        if self.empty:
+            return dataframe_utils.empty_df(self.data['empty_schema'])
+        return dataframe_utils.load_df(self.data['dataframe'], self.storage, self.data.get('dataframe_size'))
 
     def save_df(self, df: pl.DataFrame) -> None:
-        dataframe_utils.save_df(df, self.data['dataframe'])
+        if len(df) == 0:
+            self.data.pop('dataframe', None)
+            self.data['empty_schema'] = dataframe_utils.serialize_schema(df)
+            return
+        # Kept so a load can tell a frame that's been cut short, and verify() one that's been changed
+        self.data['dataframe_size'], self.data['dataframe_sha256'] = dataframe_utils.save_df(
+            df, self.data['dataframe'], cfg.parquet_options(), self.storage
+        )
 
     def delete(self) -> None:
         df_filename = self.data.get('dataframe')
-        if df_filename and os.path.exists(df_filename):
-            file_utils.remove(df_filename)
-        file_utils.remove(self.filename)
+        if df_filename:
+            try:
+                self.storage.delete(df_filename)
+            except FileNotFoundError:
+                pass
+        self.storage.delete(self.filename)
 
     def supports(self, function_data: Dict) -> bool:
         ''' Check if this record matches the function data '''
@@ -1,20 +1,145 @@
+import base64
+import hashlib
+import io
+import os
+from typing import Any, Dict, Literal, Optional, Tuple, Union, cast
+
 import polars as pl
+import pyarrow as pa
+from pyarrow import ipc
 
+from . import file_utils
+from .storage import Storage
 
-def load_df(filename: str) -> pl.DataFrame:
-    if filename.lower().endswith('csv'):
-        data = pl.read_csv(filename, index_col=0)
-    elif filename.lower().endswith('parquet'):
-        data = pl.read_parquet(filename)
-    else:
+_IpcCompression = Literal['uncompressed', 'lz4', 'zstd']
+
+# Arrow IPC is written uncompressed so it can be memory-mapped: loading it maps the file instead of decoding it,
+# and processes loading the same file share its pages. Feather trades that for LZ4 compression.
+_IPC_COMPRESSION: Dict[str, _IpcCompression] = {'arrow': 'uncompressed', 'feather': 'lz4'}
+
+# What a whole file of each format starts and ends with (CSV has nothing to go by)
+_MARKERS = {'parquet': b'PAR1', 'arrow': b'ARROW1', 'feather': b'ARROW1'}
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class CorruptFrameError(ValueError):
+    ''' A cached frame isn't the whole file its record describes, e.g. one cut short by a process killed mid-write '''
+
+
+def load_df(filename: str, storage: Optional[Storage] = None, size: Optional[int] = None) -> pl.DataFrame:
+    '''
+    Load a frame from a file, or from the file named filename in storage. If its size is given, the file is checked
+    against it, and against its format's markers, before it's decoded (see check_frame).
+    '''
+    extension = filename.lower().rsplit('.', 1)[-1]
+    if extension not in ('csv', 'parquet', *_IPC_COMPRESSION):
         raise ValueError(f"Cache frame {filename} has an unsupported extension.")
+
+    content = _source(filename, storage)
+    if size is not None:
+        _check(filename, content, size)
+    source = content if isinstance(content, str) else io.BytesIO(content)
+
+    if extension == 'csv':
+        data = pl.read_csv(source, try_parse_dates=True)
+    elif extension == 'parquet':
+        data = pl.read_parquet(source)
+    elif extension == 'arrow' and isinstance(source, str):
+        data = _load_mapped_ipc(source)
+    else:
+        data = pl.read_ipc(source)
     return data
 
 
-def save_df(data: pl.DataFrame, filename: str) -> None:
-    if filename.lower().endswith('csv'):
-        data.to_csv(filename)
-    elif filename.lower().endswith('parquet'):
-        data.to_parquet(filename)
+def check_frame(filename: str, storage: Optional[Storage] = None, size: Optional[int] = None,
+                sha256: Optional[str] = None) -> None:
+    '''
+    Check a frame file (or the file named filename in storage) is whole without decoding it: that it starts and ends
+    with its format's markers, is size bytes long if that's given, and, if sha256 is given, that its content hashes
+    to it, which means reading all of it. Raises CorruptFrameError if it isn't, or FileNotFoundError.
+    '''
+    _check(filename, _source(filename, storage), size, sha256)
+
+
+def _source(filename: str, storage: Optional[Storage]) -> Union[str, bytes]:
+    if storage is None:
+        return filename
+    path = storage.local_path(filename)
+    # Frames that aren't on this machine are downloaded whole
+    return path if path is not None else storage.read(filename)
+
+
+def _check(filename: str, content: Union[str, bytes], size: Optional[int] = None,
+           sha256: Optional[str] = None) -> None:
+    marker = _MARKERS.get(filename.lower().rsplit('.', 1)[-1], b'')
+    if isinstance(content, str):
+        actual_size = os.path.getsize(content)
+        with open(content, 'rb') as file:
+            head = file.read(len(marker))
+            file.seek(max(actual_size - len(marker), 0))
+            tail = file.read(len(marker))
     else:
+        actual_size = len(content)
+        head, tail = content[:len(marker)], content[max(actual_size - len(marker), 0):]
+
+    if size is not None and actual_size != size:
+        raise CorruptFrameError(f"Cache frame {filename} is {actual_size} bytes, not the {size} it was saved with")
+    if head != marker or tail != marker or actual_size < 2 * len(marker):
+        raise CorruptFrameError(f"Cache frame {filename} isn't a whole {filename.rsplit('.', 1)[-1]} file")
+    if sha256 is not None and digest(content)[1] != sha256:
+        raise CorruptFrameError(f"Cache frame {filename} doesn't match its checksum")
+
+
+def digest(content: Union[str, bytes]) -> Tuple[int, str]:
+    ''' Get the size and SHA-256 of a file, by path, or of its content '''
+    if not isinstance(content, str):
+        return len(content), hashlib.sha256(content).hexdigest()
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(content, 'rb') as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+            size += len(chunk)
+    return size, sha256.hexdigest()
+
+
+def _load_mapped_ipc(filename: str) -> pl.DataFrame:
+    # pl.read_ipc reads the whole file into memory, so map it with pyarrow and hand polars the mapped buffers.
+    # They stay mapped for as long as the frame uses them, after the file itself is closed.
+    with pa.memory_map(filename, 'r') as source:
+        table = ipc.open_file(source).read_all()
+    return cast(pl.DataFrame, pl.from_arrow(table, rechunk=False))
+
+
+def serialize_schema(data: pl.DataFrame) -> str:
+    ''' Encode a frame's schema (as a base64 Arrow IPC schema), so an empty frame can be kept without a file '''
+    return base64.b64encode(data.to_arrow().schema.serialize().to_pybytes()).decode('ascii')
+
+
+def empty_df(schema: str) -> pl.DataFrame:
+    ''' Rebuild an empty frame from a schema encoded by serialize_schema '''
+    arrow_schema = ipc.read_schema(pa.py_buffer(base64.b64decode(schema)))
+    return cast(pl.DataFrame, pl.from_arrow(arrow_schema.empty_table()))
+
+
+def save_df(data: pl.DataFrame, filename: str, parquet_options: Optional[Dict[str, Any]] = None,
+            storage: Optional[Storage] = None) -> Tuple[int, str]:
+    ''' Save a frame to a file, or to the file named filename in storage. Returns the file's size and SHA-256. '''
+    extension = filename.lower().rsplit('.', 1)[-1]
+    if extension not in ('csv', 'parquet', *_IPC_COMPRESSION):
         raise ValueError(f"DataFrame {filename} is an unsupported type")
+
+    # Write to a temporary file that replaces the file once it's complete, so a concurrent load never sees a partial
+    # frame
+    writing = storage.writing(filename) if storage is not None else file_utils.atomic_path(filename)
+    with writing as temp_filename:
+        if extension == 'csv':
+            data.write_csv(temp_filename)
+        elif extension == 'parquet':
+            data.write_parquet(temp_filename, **(parquet_options or {}))
+        else:
+            data.write_ipc(temp_filename, compression=_IPC_COMPRESSION[extension])
+        # Hashed before it's stored, so it's not read back from a remote storage
+        checksum = digest(temp_filename)
+    return checksum
@@ -0,0 +1,179 @@
+'''
+Expiry policies: when a cached call's result should expire, worked out from the call's arguments.
+
+Data for completed seasons doesn't change, so it can be kept for good, while data for the season in progress
+changes every day. Policies are registered by source name (see POLICIES), and a df_cache given a policy name looks
+it up when it saves, so a policy can be swapped for a whole source with set_policy().
+'''
+import abc
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+# A date expires once the day is over, a datetime at that moment
+Expiry = Union[date, datetime]
+
+NEVER = date.max
+
+# Sources publish the previous day's games overnight, so data covering today is refreshed at 6am Eastern
+REFRESH_HOUR = 6
+
+# The postseason is always over by then
+SEASON_END = (12, 1)
+
+SEASON_ARGUMENTS = ('season', 'year', 'start_season', 'end_season')
+DATE_ARGUMENTS = ('start_dt', 'end_dt')
+
+
+def serialize(expires: Expiry) -> str:
+    ''' Format an expiry for a cache record: YYYY-MM-DD for a date, ISO 8601 in UTC for a datetime '''
+    if isinstance(expires, datetime):
+        return _as_utc(expires).isoformat()
+    return str(expires)
+
+
+def parse(expires: str) -> Expiry:
+    ''' Read an expiry written by serialize '''
+    if 'T' in expires:
+        return datetime.fromisoformat(expires)
+    return datetime.strptime(expires, '%Y-%m-%d').date()
+
+
+def expires_at(expires: Expiry) -> datetime:
+    ''' Get the moment an expiry takes effect, in UTC '''
+    if isinstance(expires, datetime):
+        return _as_utc(expires)
+    if expires >= NEVER:
+        return datetime.max.replace(tzinfo=timezone.utc)
+    return _as_utc(datetime.combine(expires + timedelta(days=1), time.min))
+
+
+def expired(expires: Expiry, now: Optional[datetime] = None) -> bool:
+    return (now or datetime.now(timezone.utc)) >= expires_at(expires)
+
+
+def earliest(*expiries: Expiry) -> Expiry:
+    return min(expiries, key=expires_at)
+
+
+def next_refresh(now: Optional[datetime] = None) -> datetime:
+    ''' Get the next REFRESH_HOUR in US Eastern time after now, in UTC '''
+    now = _as_utc(now or datetime.now(timezone.utc))
+    local = now + _eastern_offset(now)
+    refresh = datetime.combine(local.date(), time(REFRESH_HOUR), tzinfo=timezone.utc)
+    if refresh <= local:
+        refresh += timedelta(days=1)
+    # The offset at the refresh itself, in case daylight saving time changes in between
+    return refresh - _eastern_offset(refresh - _eastern_offset(now))
+
+
+def last_completed_season(today: Optional[date] = None) -> int:
+    today = today or date.today()
+    return today.year if today >= date(today.year, *SEASON_END) else today.year - 1
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # Naive datetimes are local time
+    return moment.astimezone(timezone.utc)
+
+
+def _eastern_offset(moment: datetime) -> timedelta:
+    # US Eastern time is UTC-4 from 2am on the second Sunday in March until 2am on the first Sunday in November,
+    # and UTC-5 otherwise. Worked out here since zoneinfo needs Python 3.9, and tzdata on Windows.
+    def _sunday(month: int, week: int) -> date:
+        first = date(moment.year, month, 1)
+        return first + timedelta(days=(6 - first.weekday()) % 7 + 7 * (week - 1))
+
+    dst_start = datetime.combine(_sunday(3, 2), time(7), tzinfo=timezone.utc)
+    dst_end = datetime.combine(_sunday(11, 1), time(6), tzinfo=timezone.utc)
+    return timedelta(hours=-4) if dst_start <= moment < dst_end else timedelta(hours=-5)
+
+
+class ExpiryPolicy(abc.ABC):
+    ''' Works out when a call expires from its arguments, bound to the function's parameter names '''
+
+    @abc.abstractmethod
+    def expires(self, arguments: Mapping[str, Any]) -> Optional[Expiry]:
+        '''
+        Get when a call with these arguments expires, or None to leave it to the expires days given to df_cache
+        '''
+
+
+class FixedExpiry(ExpiryPolicy):
+    ''' Expire every call the same number of days after it's cached '''
+
+    def __init__(self, days: int):
+        self.days = days
+
+    def expires(self, arguments: Mapping[str, Any]) -> Optional[Expiry]:
+        return date.today() + timedelta(days=self.days)
+
+
+class SeasonalExpiry(ExpiryPolicy):
+    '''
+    Expire a call by the latest season or date it covers:
+    * only completed seasons: never
+    * today, or the season in progress: at the next refresh (6am Eastern)
+    * days of the season in progress before today: after days
+
+    Arguments left as None are skipped (e.g. an end_season that defaults to start_season), unless they all are,
+    which means the current season (or yesterday and today, for dates). Calls with none of the season or date
+    arguments are left to the expires days given to df_cache.
+    '''
+
+    def __init__(self, days: int = 1, season_arguments: Iterable[str] = SEASON_ARGUMENTS,
+                 date_arguments: Iterable[str] = DATE_ARGUMENTS):
+        self.days = days
+        self.season_arguments = tuple(season_arguments)
+        self.date_arguments = tuple(date_arguments)
+
+    def expires(self, arguments: Mapping[str, Any]) -> Optional[Expiry]:
+        today = date.today()
+        seasons = [name for name in self.season_arguments if name in arguments]
+        dates = [name for name in self.date_arguments if name in arguments]
+        if not seasons and not dates:
+            return None
+
+        values = [arguments[name] for name in seasons + dates if arguments[name] is not None]
+        if not values:
+            return next_refresh()
+
+        latest = max(self._as_date(value) for value in values)
+        if latest.year <= last_completed_season(today):
+            return NEVER
+        if latest >= today:
+            return next_refresh()
+        return today + timedelta(days=self.days)
+
+    @staticmethod
+    def _as_date(value: Any) -> date:
+        # The end of a season, or a day
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            return date(int(value), *SEASON_END) - timedelta(days=1)
+        return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+POLICIES: Dict[str, ExpiryPolicy] = {
+    'statcast': SeasonalExpiry(),
+    'fangraphs': SeasonalExpiry(),
+    'bref': SeasonalExpiry(),
+    # The register gains players all year round, with no season to key it by
+    'chadwick': FixedExpiry(7),
+}
+
+
+def get_policy(name: str) -> ExpiryPolicy:
+    if name not in POLICIES:
+        raise ValueError(f"Unknown expiry policy: {name}")
+    return POLICIES[name]
+
+
+def set_policy(name: str, policy: ExpiryPolicy) -> None:
+    '''
+    Set the expiry policy for a source ('statcast', 'fangraphs', 'bref', 'chadwick'), or a new name for a df_cache
+    to use, e.g. `cache.set_policy('fangraphs', cache.FixedExpiry(30))`
+    '''
+    POLICIES[name] = policy
@@ -1,10 +1,20 @@
 import json
 import os
 import pathlib
-from typing import Any, Dict, List, Union, cast
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union, cast
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+    import msvcrt
 
 JSONData = Union[List[Any], Dict[str, Any]]
 
+LOCK_DIRECTORY = '.locks'
+
 
 # Splitting this out for testing with no side effects
 def mkdir(directory: str) -> None:
@@ -16,13 +26,189 @@ def remove(filename: str) -> None:
     return os.remove(filename)
 
 
+@contextmanager
+def atomic_path(filename: str) -> Iterator[str]:
+    '''
+    Yield a temporary path in filename's directory to write to, which is renamed over filename once the write
+    finishes. Readers only ever see the old file or the complete new one, never a partial write.
+    Nothing is left behind if the write fails.
+    '''
+    descriptor, temp_filename = tempfile.mkstemp(
+        dir=os.path.dirname(filename) or '.', prefix=f'.{os.path.basename(filename)}.', suffix='.tmp'
+    )
+    os.close(descriptor)
+    try:
+        yield temp_filename
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+
 def safe_jsonify(directory: str, filename: str, data: JSONData) -> None:
     mkdir(directory)
     fname = os.path.join(directory, filename)
-    with open(fname, 'w') as json_file:
-        json.dump(data, json_file)
+    with atomic_path(fname) as temp_filename:
+        with open(temp_filename, 'w') as json_file:
+            json.dump(data, json_file)
 
 
 def load_json(filename: str) -> JSONData:
     with open(filename) as json_file:
         return cast(JSONData, json.load(json_file))
+
+
+def lock_filename(directory: str, name: str) -> str:
+    ''' Get the lock file for name in a cache directory '''
+    return os.path.join(directory, LOCK_DIRECTORY, f'{name}.lock')
+
+
+class FileLock:
+    '''
+    An exclusive advisory lock on a file, which holds across threads and processes (flock on POSIX, msvcrt
+    locking on Windows). Use a new FileLock for each acquisition. The lock file is created if needed and removed
+    again on release, so lock files don't pile up. A process that was waiting on a file that has since been
+    removed notices on acquiring it and starts again on the new one.
+    '''
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file: Optional[IO[bytes]] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        ''' Take the lock, waiting for it if blocking, otherwise giving up at once. Returns whether it was taken. '''
+        while True:
+            mkdir(os.path.dirname(self.filename))
+            lock_file = open(self.filename, 'a+b')
+            try:
+                locked = _lock(lock_file, blocking)
+            except BaseException:
+                lock_file.close()
+                raise
+            if not locked:
+                lock_file.close()
+                return False
+            if _is_current(lock_file, self.filename):
+                self._file = lock_file
+                return True
+            # The holder we waited on removed the file, so this lock guards nothing. Take the new file's lock.
+            _unlock(lock_file)
+            lock_file.close()
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                # Removed while still held, so nobody can take the lock on it in between
+                try:
+                    os.unlink(self.filename)
+                except FileNotFoundError:
+                    pass
+            _unlock(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+        if fcntl is None:
+            # Windows can't remove a file another process has open, which is what keeps this safe there
+            try:
+                os.unlink(self.filename)
+            except OSError:
+                pass
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+
+class FileLocks:
+    '''
+    Several file locks held together, e.g. one per day of a Statcast request. They're always taken in the same
+    (sorted) order, so holders of overlapping sets can't deadlock, and holders of disjoint sets never wait on
+    each other.
+    '''
+
+    def __init__(self, filenames: Iterable[str]):
+        self.locks = [FileLock(filename) for filename in sorted(set(filenames))]
+
+    def acquire(self) -> None:
+        acquired: List[FileLock] = []
+        try:
+            for lock in self.locks:
+                lock.acquire()
+                acquired.append(lock)
+        except BaseException:
+            for lock in reversed(acquired):
+                lock.release()
+            raise
+
+    def release(self) -> None:
+        for lock in reversed(self.locks):
+            lock.release()
+
+    def __enter__(self) -> 'FileLocks':
+        self.acquire()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.release()
+
+
+def _lock(lock_file: IO[bytes], blocking: bool) -> bool:
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    lock_file.seek(0)
+    while True:
+        try:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            if not blocking:
+                return False
+            # LK_LOCK gives up after 10 seconds, but a slow request can hold the lock for much longer
+
+
+def _unlock(lock_file: IO[bytes]) -> None:
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _is_current(lock_file: IO[bytes], filename: str) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        return os.fstat(lock_file.fileno()).st_ino == os.stat(filename).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def lock_filenames(directory: str) -> List[str]:
+    ''' Get every lock file under a cache directory '''
+    return [os.path.join(root, filename) for root, _, filenames in os.walk(directory)
+            if os.path.basename(root) == LOCK_DIRECTORY for filename in filenames]
+
+
+def remove_stale_locks(directory: str) -> None:
+    '''
+    Remove the lock files under a cache directory that nobody holds, e.g. ones left behind by a process that was
+    killed while holding them. Locks in use are left alone.
+    '''
+    for filename in lock_filenames(directory):
+        lock = FileLock(filename)
+        try:
+            if lock.acquire(blocking=False):
+                lock.release()
+        except OSError:
+            pass
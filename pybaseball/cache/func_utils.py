@@ -1,4 +1,7 @@
-from typing import Callable
+import datetime
+import enum
+import inspect
+from typing import Any, Callable, Dict, List, Tuple
 
 
 def get_func_name(func: Callable) -> str:
@@ -14,3 +17,81 @@ def get_func_name(func: Callable) -> str:
         return func.__qualname__
 
     return func.__name__
+
+
+def bind_arguments(func: Callable, args: Any, kwargs: Any) -> Dict[str, Any]:
+    '''
+    Get a call's arguments by parameter name, with defaults filled in. Keyword arguments gathered by **kwargs are
+    listed by their own names.
+    '''
+
+    signature = inspect.signature(func)
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    arguments: Dict[str, Any] = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        else:
+            arguments[name] = value
+    return arguments
+
+
+def canonical_arguments(func: Callable, args: Any, kwargs: Any) -> Tuple[List[Any], Dict[str, Any]]:
+    '''
+    Get a call's arguments in one canonical form, whichever way they were passed: every argument that has a name
+    (including defaults that weren't passed) by name, and only those gathered by *args by position. E.g.
+    f(2023), f(season=2023) and f(2023, end_season=2023) all come out the same if end_season defaults to season's
+    value. Values are normalized with normalize().
+    '''
+
+    signature = inspect.signature(func)
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    positional: List[Any] = []
+    named: Dict[str, Any] = {}
+    for name, value in bound.arguments.items():
+        kind = signature.parameters[name].kind
+        if kind == inspect.Parameter.VAR_POSITIONAL:
+            positional.extend(normalize(arg) for arg in value)
+        elif kind == inspect.Parameter.VAR_KEYWORD:
+            named.update((key, normalize(arg)) for key, arg in value.items())
+        else:
+            named[name] = normalize(value)
+    return positional, named
+
+
+def normalize(value: Any) -> Any:
+    '''
+    Turn an argument into a stable JSON value, so equal arguments give equal cache keys and match the records
+    they're saved with: dates become ISO strings, enums their values, and tuples and sets lists.
+    '''
+
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return normalize(value.value)
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize(item) for item in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    return str(value)
+
+
+def forwards_to(target: Callable) -> Callable[[Callable], Callable]:
+    '''
+    Mark a function that passes its arguments straight on to target (e.g. `def fetch(self, *args, **kwargs)`)
+    as taking target's parameters, so its calls can be bound by name.
+    '''
+
+    def _forwards(func: Callable) -> Callable:
+        func.__signature__ = inspect.signature(target)  # type: ignore
+        return func
+
+    return _forwards
@@ -0,0 +1,152 @@
+'''
+Cache integrity: finding cache records whose frames aren't what was saved, and setting them aside.
+
+A record stores its frame's size and SHA-256 when it's saved. Loads check a frame's size and its format's markers
+before decoding it, which catches a frame that was cut short (e.g. by a process killed mid-write, or a full disk)
+at the cost of a stat and two small reads. verify() checks every record against its checksum as well, several at a
+time, and repairs the index to match what's stored.
+
+Broken records are quarantined rather than deleted: the record and its frame are moved into quarantine/ in the
+cache directory, where they can be inspected, and dropped from the index, so later calls fetch the data again
+instead of tripping over the same record.
+'''
+import os
+import posixpath
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from . import cache_index, dataframe_utils, file_utils
+from .metrics import logger
+from .storage import LocalStorage, Storage
+
+QUARANTINE_DIRECTORY = 'quarantine'
+RECORD_SUFFIX = '.cache_record.json'
+
+
+class _Checked(NamedTuple):
+    filename: str
+    # The record as it was read, or None if it couldn't be
+    data: Optional[Dict[str, Any]]
+    # What's wrong with it, or None if nothing is (or it was removed before it could be read)
+    problem: Optional[str]
+    size: int = 0
+
+
+def verify(cache_directory: str, storage: Optional[Storage] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    '''
+    Check every record of a cache directory (kept in storage, the cache directory itself if not given) against
+    its frame's size and checksum, with up to workers threads (as many as concurrent.futures picks if not given).
+    Broken records are quarantined, and the index is repaired: stored records it's missing (or has the wrong size
+    for) are added, and entries whose records are gone are removed.
+    Returns the number of records checked, quarantined and reindexed, and of index entries removed.
+    '''
+    storage = storage or LocalStorage(cache_directory)
+    index = cache_index.get_index(cache_directory, storage)
+    filenames = storage.names(RECORD_SUFFIX)
+
+    # Hashing releases the GIL, and remote storage spends its time waiting on requests, so threads check in parallel
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pybaseball-cache-verify') as executor:
+        checked: List[_Checked] = list(executor.map(lambda filename: _check(storage, filename), filenames))
+
+    entries = index.entries()
+    quarantined: Set[str] = set()
+    valid_keys: Set[str] = set()
+    reindexed = 0
+    for record in checked:
+        if record.problem is not None:
+            if quarantine(cache_directory, storage, index, record.filename, record.data, record.problem):
+                quarantined.add(record.filename)
+        elif record.data is not None:
+            key = cache_index.record_key(record.data)
+            valid_keys.add(key)
+            if entries.get(key) != (record.filename, record.size):
+                index.add(key, record.data.get('func', 'unknown_call'), record.filename, record.data['expires'],
+                          record.size)
+                reindexed += 1
+
+    removed = 0
+    for key, (filename, _) in entries.items():
+        if key in valid_keys or filename in quarantined:
+            continue
+        if not storage.exists(filename):
+            index.remove(filename)
+            removed += 1
+
+    return {'records': len(checked), 'quarantined': len(quarantined), 'reindexed': reindexed, 'removed': removed}
+
+
+def quarantine(cache_directory: str, storage: Storage, index: cache_index.CacheIndex, filename: str,
+               data: Optional[Dict[str, Any]], reason: str) -> bool:
+    '''
+    Move a broken record, and its frame if it has one, out of storage into the cache directory's quarantine, and
+    drop it from the index. data is the record as it was found to be broken (None if it couldn't be read): a record
+    that's been replaced since is left alone. Returns whether it was quarantined.
+    '''
+    try:
+        current = storage.read_json(filename)
+    except FileNotFoundError:
+        index.remove(filename)
+        return False
+    except ValueError:
+        current = None
+    if (current if isinstance(current, dict) else None) != data:
+        # Saved again since it was checked, so it's not the broken record
+        return False
+
+    directory = os.path.join(cache_directory, QUARANTINE_DIRECTORY)
+    file_utils.mkdir(directory)
+    stamp = time.strftime('%Y%m%dT%H%M%S')
+    # The record goes first, so nothing loads it once its frame is gone
+    names = [filename] + ([data['dataframe']] if data and data.get('dataframe') else [])
+    for name in names:
+        # Records from before storage backends named their frames by absolute path
+        basename = posixpath.basename(name.replace(os.sep, '/'))
+        try:
+            storage.move_out(name, os.path.join(directory, f'{stamp}-{basename}'))
+        except FileNotFoundError:
+            pass
+    index.remove(filename)
+    logger.warning('Quarantined cache record %s: %s', filename, reason)
+    return True
+
+
+def purge(cache_directory: str) -> None:
+    ''' Remove the quarantined records from the cache directory '''
+    directory = os.path.join(cache_directory, QUARANTINE_DIRECTORY)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+
+
+def _check(storage: Storage, filename: str) -> _Checked:
+    try:
+        data = storage.read_json(filename)
+    except FileNotFoundError:
+        # Removed since the listing, e.g. by an eviction
+        return _Checked(filename, None, None)
+    except ValueError:
+        return _Checked(filename, None, 'unreadable record')
+    if not isinstance(data, dict):
+        return _Checked(filename, None, 'unreadable record')
+    if 'expires' not in data:
+        return _Checked(filename, data, 'unreadable record')
+
+    try:
+        if 'empty_schema' in data:
+            dataframe_utils.empty_df(data['empty_schema'])
+        elif data.get('dataframe'):
+            dataframe_utils.check_frame(data['dataframe'], storage, data.get('dataframe_size'),
+                                        data.get('dataframe_sha256'))
+        else:
+            return _Checked(filename, data, 'no frame')
+    except FileNotFoundError:
+        return _Checked(filename, data, 'missing frame')
+    except ValueError as ex:
+        # A frame that isn't what was saved, or a schema that can't be decoded
+        return _Checked(filename, data, str(ex))
+    except OSError as ex:
+        # e.g. the storage couldn't be reached, which says nothing about the record
+        logger.warning("Couldn't check cache record %s: %r", filename, ex)
+        return _Checked(filename, None, None)
+    return _Checked(filename, data, None, cache_index.record_size(filename, data, storage))
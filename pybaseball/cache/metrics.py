@@ -0,0 +1,72 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger('pybaseball.cache')
+
+# Called with the event ('hit', 'miss', 'save' or 'error'), the cached function's name, and the event's details
+Listener = Callable[[str, str, Dict[str, Any]], None]
+
+COUNTERS = ('hits', 'misses', 'saves', 'errors', 'bytes_read', 'bytes_written', 'load_seconds', 'fetch_seconds',
+            'save_seconds')
+_EVENT_COUNTERS = {'hit': 'hits', 'miss': 'misses', 'save': 'saves', 'error': 'errors'}
+
+
+class Metrics:
+    '''
+    Counts what the cache does for each cached function in this process:
+    * hits, and the bytes read and seconds spent loading them from disk (memory hits read nothing)
+    * misses, and the seconds spent fetching them
+    * saves, and the bytes written and seconds spent writing them
+    * errors the cache recovered from (the call goes on without the cache), which are also logged as warnings to
+      the 'pybaseball.cache' logger
+
+    Listeners are called with each event as it happens.
+    '''
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+
+    def record(self, event: str, func: str, **details: Any) -> None:
+        ''' Count an event for a function, adding the details named like counters to them '''
+        with self._lock:
+            stats = self._stats.setdefault(func, dict.fromkeys(COUNTERS, 0))
+            stats[_EVENT_COUNTERS[event]] += 1
+            for name, value in details.items():
+                if name in stats:
+                    stats[name] += value
+            listeners = list(self._listeners)
+
+        logger.debug('Cache %s for %s: %s', event, func, details)
+
+        for listener in listeners:
+            try:
+                listener(event, func, details)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Cache listener %r failed', listener)
+
+    def error(self, func: str, stage: str, error: BaseException) -> None:
+        ''' Count and log an error the cache recovered from at a stage (e.g. 'load' or 'save') of a call '''
+        logger.warning('Cache %s failed for %s, carrying on without it: %r', stage, func, error)
+        self.record('error', func, stage=stage, error=error)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {func: dict(stats) for func, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def add_listener(self, listener: Listener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        with self._lock:
+            self._listeners.remove(listener)
+
+
+metrics = Metrics()
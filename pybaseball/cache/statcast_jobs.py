@@ -0,0 +1,181 @@
+'''
+Statcast jobs: a long statcast() request, e.g. a multi-season backfill, recorded under a job id so that it can be
+resumed after it's interrupted.
+
+A job's manifest holds the request it was started with and the date chunks planned for it, each one planned,
+completed or failed, and it's saved as each chunk finishes. The chunks' data is kept in the Statcast store, so
+running the job again only has to fetch the chunks that aren't completed.
+'''
+import os
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import file_utils
+
+JOBS_DIRECTORY = 'statcast_jobs'
+PLANNED = 'planned'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+_JOB_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+_Chunk = Tuple[date, date]
+
+
+def _chunk_key(chunk: _Chunk) -> Tuple[str, str]:
+    return str(chunk[0]), str(chunk[1])
+
+
+class StatcastJob:
+    '''
+    The manifest of a Statcast job, kept in the cache directory as statcast_jobs/{job_id}.json.
+    Chunks are marked as they finish, from any thread, and the manifest is saved each time. Hold the job's lock
+    while running it, so a second run of the same job (e.g. a nightly run that overlaps the last one) can't
+    overwrite the first one's progress.
+    '''
+
+    def __init__(self, cache_directory: str, job_id: str):
+        if not _JOB_ID.match(job_id):
+            raise ValueError(f"Invalid job_id: {job_id}. Use letters, digits, '.', '_' and '-'.")
+        self.job_id = job_id
+        self.directory = os.path.join(cache_directory, JOBS_DIRECTORY)
+        self.filename = os.path.join(self.directory, f'{job_id}.json')
+        self.data: Dict[str, Any] = {}
+        self._chunks: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._run_started = time.monotonic()
+        self._elapsed_before = 0.0
+        self._file_lock = file_utils.FileLock(file_utils.lock_filename(self.directory, job_id))
+        if os.path.isfile(self.filename):
+            self._load()
+
+    def _load(self) -> None:
+        data = file_utils.load_json(self.filename)
+        assert isinstance(data, dict)
+        self.data = data
+        self._chunks = {(chunk['start'], chunk['end']): chunk for chunk in self.data['chunks']}
+        self._elapsed_before = float(self.data.get('elapsed', 0.0))
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.data)
+
+    def acquire(self) -> bool:
+        ''' Take the job's lock, unless another run holds it. Returns whether it was taken. '''
+        return self._file_lock.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._file_lock.release()
+
+    def start(self, request: Dict[str, Any], plan: Callable[[], List[_Chunk]]) -> None:
+        '''
+        Start the job for request (the arguments it's run with), planning its chunks with plan() if it's new.
+        Raises ValueError if the job was started with another request.
+        '''
+        with self._lock:
+            self._run_started = time.monotonic()
+            # The last run may have saved it since it was loaded
+            if os.path.isfile(self.filename):
+                self._load()
+            if self.exists:
+                if self.data['request'] != request:
+                    raise ValueError(
+                        f"Statcast job {self.job_id} was started for {self.data['request']}, not {request}. "
+                        "Use another job_id for a different request."
+                    )
+                return
+
+            now = datetime.now().isoformat(timespec='seconds')
+            self.data = {
+                'job_id': self.job_id,
+                'request': request,
+                'created': now,
+                'updated': now,
+                'elapsed': 0.0,
+                'chunks': [
+                    {'start': str(start), 'end': str(end), 'status': PLANNED, 'attempts': 0, 'rows': None,
+                     'error': None}
+                    for start, end in plan()
+                ],
+            }
+            self._chunks = {(chunk['start'], chunk['end']): chunk for chunk in self.data['chunks']}
+            self._elapsed_before = 0.0
+            self._save()
+
+    def chunks(self, *statuses: str) -> List[_Chunk]:
+        ''' List the job's chunks with any of the given statuses (all of them if none are given), in date order '''
+        with self._lock:
+            return [
+                (date.fromisoformat(chunk['start']), date.fromisoformat(chunk['end']))
+                for chunk in self.data.get('chunks', []) if not statuses or chunk['status'] in statuses
+            ]
+
+    def complete(self, chunk: _Chunk, rows: int, attempts: int = 1) -> None:
+        ''' Mark a chunk completed, with the rows it holds, after attempts requests for it '''
+        self._mark(chunk, COMPLETED, attempts, rows=rows, error=None)
+
+    def fail(self, chunk: _Chunk, error: BaseException, attempts: int = 1) -> None:
+        ''' Mark a chunk failed, with the error its last of attempts requests raised '''
+        self._mark(chunk, FAILED, attempts, error=repr(error))
+
+    def complete_stored(self, rows: Dict[_Chunk, int]) -> None:
+        ''' Mark chunks completed, with the rows they hold, whose days were already in the Statcast store '''
+        if rows:
+            with self._lock:
+                for chunk, count in rows.items():
+                    self._chunks[_chunk_key(chunk)].update(status=COMPLETED, rows=count, error=None)
+                self._save()
+
+    def reopen(self, chunks: List[_Chunk]) -> None:
+        ''' Plan chunks again, e.g. completed ones whose days have since left the Statcast store '''
+        if chunks:
+            with self._lock:
+                for chunk in chunks:
+                    self._chunks[_chunk_key(chunk)]['status'] = PLANNED
+                self._save()
+
+    def _mark(self, chunk: _Chunk, status: str, attempts: int, **fields: Any) -> None:
+        with self._lock:
+            entry = self._chunks[_chunk_key(chunk)]
+            entry['status'] = status
+            # Across every run of the job
+            entry['attempts'] += attempts
+            entry.update(fields)
+            self._save()
+
+    def _save(self) -> None:
+        # Only called with the lock held
+        self.data['updated'] = datetime.now().isoformat(timespec='seconds')
+        self.data['elapsed'] = self._elapsed_before + time.monotonic() - self._run_started
+        file_utils.safe_jsonify(self.directory, os.path.basename(self.filename), self.data)
+
+    def status(self) -> Dict[str, Any]:
+        '''
+        Report the job's progress: its chunks by status, the rows fetched so far, the seconds spent on it across
+        every run, and an estimate of the seconds left at the rate the chunks have been completed (None until one
+        has been).
+        '''
+        with self._lock:
+            chunks = self.data.get('chunks', [])
+            counts = {status: sum(chunk['status'] == status for chunk in chunks)
+                      for status in (PLANNED, COMPLETED, FAILED)}
+            elapsed = float(self.data.get('elapsed', 0.0))
+            remaining = counts[PLANNED] + counts[FAILED]
+            return {
+                'job_id': self.job_id,
+                'chunks': len(chunks),
+                **counts,
+                'rows': sum(chunk['rows'] or 0 for chunk in chunks if chunk['status'] == COMPLETED),
+                'elapsed_seconds': elapsed,
+                'eta_seconds': elapsed / counts[COMPLETED] * remaining if counts[COMPLETED] else None,
+                'errors': [chunk['error'] for chunk in chunks if chunk['status'] == FAILED],
+            }
+
+
+def load_job(cache_directory: str, job_id: str) -> Optional[StatcastJob]:
+    ''' Get a job that's been started in the cache directory, or None if there isn't one by that id '''
+    job = StatcastJob(cache_directory, job_id)
+    return job if job.exists else None
@@ -0,0 +1,321 @@
+import io
+import os
+import posixpath
+import shutil
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import polars as pl
+
+from ..datasources import statcast_schema
+from . import expiry, file_utils
+from .storage import LocalStorage, Storage
+
+STORE_DIRECTORY = 'statcast'
+MANIFEST_FILENAME = 'manifest.json'
+# Days a fetched day is kept if the expiry policy leaves it to the default, and for days stored before their
+# expiry was recorded
+DEFAULT_EXPIRATION = 365
+SCHEMA = 'statcast_search'  # the default schema the stored frames are parsed with
+# Each day is written sorted by these, with min/max statistics, so a filter on game_pk can skip every day (and
+# row group) that doesn't hold the game from the statistics alone. Sorting also makes the days compress better.
+SORT_COLUMNS = ['game_pk', 'at_bat_number', 'pitch_number']
+# A day's last use is only saved again once it's this many seconds old, so loads don't rewrite the manifest each time
+ACCESS_INTERVAL = 60
+
+
+class StoredDay(NamedTuple):
+    ''' A day with games in a Statcast store, as eviction sees it '''
+    store: str
+    day: str
+    size: int
+    accessed: float
+
+
+def _day_key(value: object) -> str:
+    # game_date may come back as a string, a date or a datetime depending on how the frame was parsed
+    return str(value)[:10]
+
+
+class StatcastStore:
+    '''
+    A Statcast cache partitioned by game_date: one parquet file per day, plus a manifest of the days fetched.
+
+    Because the partitions are per day, any date range can be assembled from whatever days are already cached,
+    and only the missing days need to be fetched from Baseball Savant.
+    Days with no games are recorded in the manifest without a file.
+    Days stored with an older version of the Statcast schema are treated as missing, so they are fetched again.
+    Each day expires by the 'statcast' expiry policy, worked out when it's fetched: days of completed seasons never
+    do, earlier days of the season in progress are fetched again once the policy says.
+    Frames parsed with another schema (e.g. float32 measurements) are kept in a store of their own.
+    The days and the manifest are kept in storage (the cache directory itself if not given), under
+    statcast/{schema}/{team}, and the locks on them where the storage keeps its locks, or the cache directory.
+    The manifest also notes when each day was last used, so the cache's budget can evict the least recently used
+    days along with its records.
+    '''
+
+    _lock = threading.Lock()
+
+    def __init__(self, cache_directory: str, team: Optional[str] = None,
+                 parquet_options: Optional[Dict[str, Any]] = None, schema: str = SCHEMA,
+                 storage: Optional[Storage] = None):
+        schema_directory = [] if schema == SCHEMA else [schema]
+        self.cache_directory = cache_directory
+        self.storage = storage or LocalStorage(cache_directory)
+        # The store's directory in storage
+        self.name = posixpath.join(STORE_DIRECTORY, *schema_directory, team.upper() if team else 'all')
+        self.lock_directory = _lock_directory(self.storage, cache_directory, self.name)
+        self.parquet_options: Dict[str, Any] = {'statistics': True}
+        self.parquet_options.update(parquet_options or {})
+        self.schema = schema
+        self.schema_version = statcast_schema.LATEST_VERSIONS[schema]
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        return load_manifest(self.storage, self.name)
+
+    def day_name(self, day: date) -> str:
+        ''' Get the name a day's parquet file is stored by '''
+        return _day_name(self.name, day.isoformat())
+
+    def fetched_days(self) -> Dict[date, int]:
+        ''' Get every unexpired day in the store, with the number of rows stored for it '''
+        days = {}
+        for day, entry in self._load_manifest().items():
+            if entry.get('schema') != self.schema_version:
+                continue
+            if not expiry.expired(_entry_expires(entry)):
+                days[datetime.strptime(day, '%Y-%m-%d').date()] = int(entry['rows'])
+        return days
+
+    def missing_days(self, days: Iterable[date]) -> List[date]:
+        ''' Filter days down to the ones that still need to be fetched '''
+        fetched = self.fetched_days()
+        return [day for day in days if day not in fetched]
+
+    def save(self, data: Optional[pl.DataFrame], days: Iterable[date]) -> None:
+        '''
+        Store the result of a request that covered the given days.
+
+        Only days before today are stored, since games still in progress would otherwise be cached incomplete.
+        Nothing is stored if the data doesn't fit the store's schema (its types were inferred because Savant
+        changed a column), so the days are fetched again next time.
+        '''
+        days = [day for day in days if day < date.today()]
+        if not days or (data is not None and not self._fits_schema(data)):
+            return
+
+        partitions: Dict[str, pl.DataFrame] = {}
+        if data is not None and len(data) > 0:
+            for key, partition in data.partition_by('game_date', as_dict=True).items():
+                partitions[_day_key(key[0] if isinstance(key, tuple) else key)] = partition
+
+        sizes: Dict[str, int] = {}
+        for day in days:
+            frame: Optional[pl.DataFrame] = partitions.get(day.isoformat())
+            if frame is not None:
+                sort_columns = [column for column in SORT_COLUMNS if column in frame.columns]
+                if sort_columns:
+                    frame = frame.sort(sort_columns)
+                with self.storage.writing(self.day_name(day)) as temp_filename:
+                    frame.write_parquet(temp_filename, **self.parquet_options)
+                    sizes[day.isoformat()] = os.path.getsize(temp_filename)
+
+        # Other processes sharing the cache may be updating the manifest too
+        with self._lock, _manifest_lock(self.lock_directory):
+            manifest = self._load_manifest()
+            fetched = str(date.today())
+            accessed = time.time()
+            for day in days:
+                manifest[day.isoformat()] = {
+                    'rows': len(partitions[day.isoformat()]) if day.isoformat() in partitions else 0,
+                    'bytes': sizes.get(day.isoformat(), 0),
+                    'fetched': fetched,
+                    'expires': expiry.serialize(day_expires(day)),
+                    'schema': self.schema_version,
+                    'accessed': accessed,
+                }
+            self.storage.write_json(posixpath.join(self.name, MANIFEST_FILENAME), manifest)
+
+    def _fits_schema(self, data: pl.DataFrame) -> bool:
+        schema = statcast_schema.get_schema(self.schema)
+        return all(dtype == schema[name] for name, dtype in data.schema.items() if name in schema)
+
+    def lock_days(self, days: Iterable[date]) -> file_utils.FileLocks:
+        '''
+        Get an exclusive lock on the given days in this store, across threads and processes.
+        Hold it while fetching the days, so processes sharing a cache don't fetch them twice. Requests for days
+        that don't overlap don't wait on each other.
+        '''
+        return file_utils.FileLocks(file_utils.lock_filename(self.lock_directory, day.isoformat()) for day in days)
+
+    def day_names(self, days: Iterable[date]) -> List[str]:
+        ''' Get the names of the parquet files stored for the given days, skipping days with no games '''
+        fetched = self.fetched_days()
+        return [self.day_name(day) for day in days if fetched.get(day, 0) > 0]
+
+    def touch(self, days: Iterable[date]) -> None:
+        ''' Note that the given days were just used, for eviction '''
+        now = time.time()
+        keys = {day.isoformat() for day in days}
+        if all(now - _entry_accessed(entry) < ACCESS_INTERVAL
+               for key, entry in self._load_manifest().items() if key in keys):
+            return
+        with self._lock, _manifest_lock(self.lock_directory):
+            manifest = self._load_manifest()
+            for key in keys:
+                if key in manifest:
+                    manifest[key]['accessed'] = now
+            self.storage.write_json(posixpath.join(self.name, MANIFEST_FILENAME), manifest)
+
+    def load(self, days: Iterable[date]) -> List[pl.DataFrame]:
+        ''' Load the stored frames for the given days, skipping days with no games '''
+        days = list(days)
+        names = self.day_names(days)
+        # Before they're read, so an eviction running meanwhile sees them as the most recently used
+        self.touch(days)
+        frames = []
+        for name in names:
+            path = self.storage.local_path(name)
+            frames.append(pl.read_parquet(path if path is not None else io.BytesIO(self.storage.read(name))))
+        return frames
+
+    def scan(self, days: Iterable[date]) -> pl.LazyFrame:
+        '''
+        Lazily scan the stored frames for the given days.
+
+        Each day is scanned as its own parquet file, so column selections and filters applied to the result are
+        pushed down to the parquet reader and only the needed columns and row groups are read. Days kept in
+        storage that isn't on this machine are downloaded whole first.
+        '''
+        days = list(days)
+        names = self.day_names(days)
+        self.touch(days)
+        if not names:
+            # Still give the frame its columns, so selections and filters on it work and just match nothing
+            return pl.LazyFrame(schema=statcast_schema.get_schema(self.schema))
+        scans = []
+        for name in names:
+            path = self.storage.local_path(name)
+            scans.append(pl.scan_parquet(path) if path is not None
+                         else pl.read_parquet(io.BytesIO(self.storage.read(name))).lazy())
+        return pl.concat(scans, how='diagonal_relaxed')
+
+
+def day_expires(day: date) -> expiry.Expiry:
+    ''' Work out when a day fetched now expires, by the 'statcast' expiry policy '''
+    day_string = day.isoformat()
+    return expiry.get_policy('statcast').expires({'start_dt': day_string, 'end_dt': day_string}) or \
+        date.today() + timedelta(days=DEFAULT_EXPIRATION)
+
+
+def _entry_expires(entry: Dict[str, Any]) -> expiry.Expiry:
+    if 'expires' in entry:
+        return expiry.parse(entry['expires'])
+    return datetime.strptime(entry['fetched'], '%Y-%m-%d').date() + timedelta(days=DEFAULT_EXPIRATION)
+
+
+def _entry_accessed(entry: Dict[str, Any]) -> float:
+    if 'accessed' in entry:
+        return float(entry['accessed'])
+    # Days stored before their use was noted count as last used when they were fetched
+    return time.mktime(datetime.strptime(entry['fetched'], '%Y-%m-%d').timetuple())
+
+
+def _day_name(store: str, day: str) -> str:
+    return posixpath.join(store, f'{day}.parquet')
+
+
+def _lock_directory(storage: Storage, cache_directory: str, store: str) -> str:
+    # Storage shared with other machines keeps the locks where they can all see them
+    return os.path.join(storage.lock_directory or cache_directory, *store.split('/'))
+
+
+def _manifest_lock(lock_directory: str) -> file_utils.FileLock:
+    return file_utils.FileLock(file_utils.lock_filename(lock_directory, 'manifest'))
+
+
+def store_names(storage: Storage) -> List[str]:
+    ''' List the directory in storage of every Statcast store kept there '''
+    return sorted(posixpath.dirname(name) for name in storage.tree(STORE_DIRECTORY)
+                  if posixpath.basename(name) == MANIFEST_FILENAME)
+
+
+def load_manifest(storage: Storage, store: str) -> Dict[str, Dict]:
+    ''' Load the manifest of the Statcast store kept in storage under store '''
+    try:
+        data = storage.read_json(posixpath.join(store, MANIFEST_FILENAME))
+    except FileNotFoundError:
+        return {}
+    assert isinstance(data, dict)
+    return data
+
+
+def merge_days(storage: Storage, cache_directory: str, store: str, entries: Dict[str, Dict],
+               source_directory: str) -> int:
+    '''
+    Move days fetched elsewhere into the Statcast store kept in storage under store: entries are their manifest
+    entries, and source_directory holds their parquet files. Days the store fetched more recently are kept.
+    Returns the number of days merged.
+    '''
+    with StatcastStore._lock, _manifest_lock(_lock_directory(storage, cache_directory, store)):
+        manifest = load_manifest(storage, store)
+        merged = 0
+        for day, entry in entries.items():
+            if day in manifest and manifest[day]['fetched'] > entry['fetched']:
+                continue
+            if entry['rows'] > 0:
+                storage.move_in(_day_name(store, day), os.path.join(source_directory, f'{day}.parquet'))
+            manifest[day] = entry
+            merged += 1
+        storage.write_json(posixpath.join(store, MANIFEST_FILENAME), manifest)
+    return merged
+
+
+def stored_days(storage: Storage) -> List[StoredDay]:
+    ''' List the days with games in every Statcast store kept in storage, with their files' sizes '''
+    days = []
+    for store in store_names(storage):
+        for day, entry in load_manifest(storage, store).items():
+            if entry['rows'] > 0:
+                try:
+                    # Days stored before their sizes were noted have to be asked for
+                    day_size = entry['bytes'] if 'bytes' in entry else storage.size(_day_name(store, day))
+                except FileNotFoundError:
+                    continue
+                days.append(StoredDay(store, day, day_size, _entry_accessed(entry)))
+    return days
+
+
+def remove_days(storage: Storage, cache_directory: str, store: str, days: Iterable[str]) -> None:
+    '''
+    Remove days (YYYY-MM-DD) from the Statcast store kept in storage under store, so they're fetched again when
+    next asked for
+    '''
+    days = list(days)
+    with StatcastStore._lock, _manifest_lock(_lock_directory(storage, cache_directory, store)):
+        manifest = load_manifest(storage, store)
+        for day in days:
+            manifest.pop(day, None)
+        # Out of the manifest first, so nothing looks for their files once they're gone
+        storage.write_json(posixpath.join(store, MANIFEST_FILENAME), manifest)
+        for day in days:
+            try:
+                storage.delete(_day_name(store, day))
+            except FileNotFoundError:
+                pass
+
+
+def purge(storage: Storage) -> None:
+    ''' Remove every day from every Statcast store kept in storage '''
+    directory = storage.local_path(STORE_DIRECTORY)
+    if directory is not None:
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        return
+    for name in storage.tree(STORE_DIRECTORY):
+        try:
+            storage.delete(name)
+        except FileNotFoundError:
+            pass
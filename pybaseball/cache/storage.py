@@ -0,0 +1,385 @@
+'''
+Storage backends: where cache records and their frames are kept.
+
+Records and frames are stored by name, a relative '/'-separated path, so the same names work in a local directory,
+a directory shared between machines, or an object store. Which one the cache uses is set by
+config.storage_type and config.storage_location:
+* 'local': a directory on this machine (the cache directory, unless another location is given)
+* 'shared': a directory shared between machines over NFS or the like
+* 'http': an object store bucket, given by its URL, that takes plain GET, PUT, HEAD and DELETE requests on its
+  objects and lists them like S3's ListObjectsV2 (e.g. MinIO, or S3 itself with a bucket policy that allows it)
+
+Cached records and their frames are kept at the top level, and the Statcast store's days under statcast/. The
+cache index, the Statcast jobs and, unless the storage can hold them, the locks stay in the cache directory, which
+should be on this machine.
+'''
+import abc
+import email.utils
+import errno
+import glob
+import json
+import os
+import posixpath
+import shutil
+import socket
+import tempfile
+import time
+import urllib.parse
+import uuid
+import xml.etree.ElementTree as ElementTree
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar, cast
+
+import requests
+
+from . import file_utils
+
+_T = TypeVar('_T')
+
+
+class Storage(abc.ABC):
+    '''
+    A place to keep named files. Writes are atomic: a reader sees the old content or the new, never part of it.
+    Reading, sizing or deleting a name that isn't stored raises FileNotFoundError.
+    '''
+
+    @abc.abstractmethod
+    def read(self, name: str) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def writing(self, name: str) -> ContextManager[str]:
+        ''' Get a context yielding a local path to write name's content to, which is stored once the context exits '''
+
+    @abc.abstractmethod
+    def delete(self, name: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def exists(self, name: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def size(self, name: str) -> int:
+        ...
+
+    @abc.abstractmethod
+    def modified(self, name: str) -> float:
+        ''' Get when name was last written, as a timestamp '''
+
+    @abc.abstractmethod
+    def names(self, suffix: str = '') -> List[str]:
+        ''' List the names stored at the top level (not in subdirectories) that end with suffix '''
+
+    @abc.abstractmethod
+    def tree(self, directory: str) -> List[str]:
+        ''' List every name stored under directory, in its subdirectories too, except hidden ones (e.g. locks) '''
+
+    def local_path(self, name: str) -> Optional[str]:
+        ''' Get the path name is stored at on this machine, if it is, so it can be read or memory-mapped in place '''
+        return None
+
+    @property
+    def lock_directory(self) -> Optional[str]:
+        ''' A directory to keep the locks on cached calls in, if every user of this storage can lock files in it '''
+        return None
+
+    def write(self, name: str, content: bytes) -> None:
+        with self.writing(name) as temp_filename:
+            with open(temp_filename, 'wb') as file:
+                file.write(content)
+
+    def read_json(self, name: str) -> file_utils.JSONData:
+        return cast(file_utils.JSONData, json.loads(self.read(name)))
+
+    def write_json(self, name: str, data: file_utils.JSONData) -> None:
+        self.write(name, json.dumps(data).encode('utf-8'))
+
+    def move_in(self, name: str, filename: str) -> None:
+        ''' Store the local file filename as name, removing the file '''
+        with self.writing(name) as temp_filename:
+            shutil.copyfile(filename, temp_filename)
+        file_utils.remove(filename)
+
+    def move_out(self, name: str, filename: str) -> None:
+        ''' Move name out of storage, to the local file filename '''
+        content = self.read(name)
+        with file_utils.atomic_path(filename) as temp_filename:
+            with open(temp_filename, 'wb') as file:
+                file.write(content)
+        self.delete(name)
+
+
+class LocalStorage(Storage):
+    '''
+    A directory on this machine. Records written before storage backends existed named their files by absolute
+    path, and those names are used as they are.
+    '''
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def local_path(self, name: str) -> str:
+        if os.path.isabs(name):
+            return name
+        return os.path.join(self.directory, *name.split('/'))
+
+    @property
+    def lock_directory(self) -> str:
+        return self.directory
+
+    def read(self, name: str) -> bytes:
+        with open(self.local_path(name), 'rb') as file:
+            return file.read()
+
+    @contextmanager
+    def writing(self, name: str) -> Iterator[str]:
+        path = self.local_path(name)
+        file_utils.mkdir(os.path.dirname(path))
+        with file_utils.atomic_path(path) as temp_filename:
+            yield temp_filename
+
+    def read_json(self, name: str) -> file_utils.JSONData:
+        return file_utils.load_json(self.local_path(name))
+
+    def write_json(self, name: str, data: file_utils.JSONData) -> None:
+        path = self.local_path(name)
+        file_utils.safe_jsonify(os.path.dirname(path), os.path.basename(path), data)
+
+    def delete(self, name: str) -> None:
+        file_utils.remove(self.local_path(name))
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.local_path(name))
+
+    def size(self, name: str) -> int:
+        return os.path.getsize(self.local_path(name))
+
+    def modified(self, name: str) -> float:
+        return os.path.getmtime(self.local_path(name))
+
+    def names(self, suffix: str = '') -> List[str]:
+        pattern = os.path.join(glob.escape(self.directory), f'*{glob.escape(suffix)}')
+        return sorted(os.path.basename(path) for path in glob.glob(pattern))
+
+    def tree(self, directory: str) -> List[str]:
+        names = []
+        for root, directories, filenames in os.walk(self.local_path(directory)):
+            directories[:] = [name for name in directories if not name.startswith('.')]
+            relative = os.path.relpath(root, self.directory).replace(os.sep, '/')
+            names += [posixpath.join(relative, filename) for filename in filenames if not filename.startswith('.')]
+        return sorted(names)
+
+    def move_in(self, name: str, filename: str) -> None:
+        path = self.local_path(name)
+        file_utils.mkdir(os.path.dirname(path))
+        try:
+            os.replace(filename, path)
+        except OSError as ex:
+            if ex.errno != errno.EXDEV:
+                raise
+            # On another filesystem, so it has to be copied
+            super().move_in(name, filename)
+
+    def move_out(self, name: str, filename: str) -> None:
+        try:
+            os.replace(self.local_path(name), filename)
+        except OSError as ex:
+            if ex.errno != errno.EXDEV:
+                raise
+            super().move_out(name, filename)
+
+
+class SharedStorage(LocalStorage):
+    '''
+    A directory shared between machines, e.g. over NFS, where another machine can replace or remove a file at any
+    moment.
+
+    Files are written under temporary names unique to the host and flushed to the server before they're renamed
+    into place, since the rename can otherwise reach the server (and other machines) before the content does.
+    Reading a file another machine just replaced can fail with a stale file handle, which is retried.
+    Locks on cached calls are kept in the shared directory, which needs NFSv4 (or lockd) for them to hold across
+    machines.
+    '''
+
+    RETRIES = 3
+    RETRY_DELAY = 0.05
+
+    def read(self, name: str) -> bytes:
+        return self._retry_stale(lambda: LocalStorage.read(self, name))
+
+    def read_json(self, name: str) -> file_utils.JSONData:
+        return self._retry_stale(lambda: LocalStorage.read_json(self, name))
+
+    @contextmanager
+    def writing(self, name: str) -> Iterator[str]:
+        path = self.local_path(name)
+        directory = os.path.dirname(path)
+        file_utils.mkdir(directory)
+        temp_filename = os.path.join(directory,
+                                     f'.{os.path.basename(path)}.{socket.gethostname()}.{uuid.uuid4().hex}.tmp')
+        try:
+            yield temp_filename
+            with open(temp_filename, 'rb+') as file:
+                os.fsync(file.fileno())
+            os.replace(temp_filename, path)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+            raise
+        self._sync_directory(directory)
+
+    def write_json(self, name: str, data: file_utils.JSONData) -> None:
+        Storage.write_json(self, name, data)
+
+    def delete(self, name: str) -> None:
+        try:
+            super().delete(name)
+        except OSError as ex:
+            # Another machine removed it first
+            if ex.errno == errno.ESTALE:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), name) from ex
+            raise
+
+    def size(self, name: str) -> int:
+        return self._retry_stale(lambda: LocalStorage.size(self, name))
+
+    def modified(self, name: str) -> float:
+        return self._retry_stale(lambda: LocalStorage.modified(self, name))
+
+    def move_in(self, name: str, filename: str) -> None:
+        # Copied, so it's flushed like any other write
+        Storage.move_in(self, name, filename)
+
+    def move_out(self, name: str, filename: str) -> None:
+        # Copied, so a stale handle on the file is retried like any other read
+        Storage.move_out(self, name, filename)
+
+    def _retry_stale(self, operation: Callable[[], _T]) -> _T:
+        for _ in range(self.RETRIES - 1):
+            try:
+                return operation()
+            except OSError as ex:
+                if ex.errno != errno.ESTALE:
+                    raise
+                time.sleep(self.RETRY_DELAY)
+        return operation()
+
+    @staticmethod
+    def _sync_directory(directory: str) -> None:
+        if not hasattr(os, 'O_DIRECTORY'):  # Windows
+            return
+        descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            # Not every filesystem can sync a directory; the rename has still happened
+            pass
+        finally:
+            os.close(descriptor)
+
+
+class HTTPStorage(Storage):
+    '''
+    An object store bucket at url, reached with plain HTTP requests: GET, PUT, HEAD and DELETE on url/name, and
+    S3 ListObjectsV2 listings. Pass a session to add authentication or retries.
+    '''
+
+    def __init__(self, url: str, session: Optional[requests.Session] = None, timeout: float = 60.0):
+        self.url = url.rstrip('/')
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def _request(self, method: str, name: str, **kwargs: Any) -> requests.Response:
+        response = self.session.request(method, f'{self.url}/{urllib.parse.quote(name)}', timeout=self.timeout,
+                                        **kwargs)
+        if response.status_code == 404:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), name)
+        response.raise_for_status()
+        return response
+
+    def read(self, name: str) -> bytes:
+        return self._request('GET', name).content
+
+    @contextmanager
+    def writing(self, name: str) -> Iterator[str]:
+        descriptor, temp_filename = tempfile.mkstemp(suffix='.tmp')
+        os.close(descriptor)
+        try:
+            yield temp_filename
+            # An object store replaces an object whole, so the upload is atomic
+            with open(temp_filename, 'rb') as file:
+                self._request('PUT', name, data=file)
+        finally:
+            os.remove(temp_filename)
+
+    def write(self, name: str, content: bytes) -> None:
+        self._request('PUT', name, data=content)
+
+    def delete(self, name: str) -> None:
+        self._request('DELETE', name)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self._request('HEAD', name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def size(self, name: str) -> int:
+        return int(self._request('HEAD', name).headers.get('Content-Length', 0))
+
+    def modified(self, name: str) -> float:
+        modified = self._request('HEAD', name).headers.get('Last-Modified')
+        return email.utils.parsedate_to_datetime(modified).timestamp() if modified else time.time()
+
+    def names(self, suffix: str = '') -> List[str]:
+        return sorted(name for name in self._list() if name.endswith(suffix) and '/' not in name)
+
+    def tree(self, directory: str) -> List[str]:
+        return sorted(name for name in self._list(directory.rstrip('/') + '/')
+                      if not any(part.startswith('.') for part in name.split('/')))
+
+    def _list(self, prefix: str = '') -> Iterator[str]:
+        params = {'list-type': '2'}
+        if prefix:
+            params['prefix'] = prefix
+        while True:
+            response = self.session.get(self.url + '/', params=params, timeout=self.timeout)
+            response.raise_for_status()
+            root = ElementTree.fromstring(response.content)
+            for contents in _children(root, 'Contents'):
+                for key in _children(contents, 'Key'):
+                    yield key.text or ''
+            token = next((element.text for element in _children(root, 'NextContinuationToken')), None)
+            truncated = next((element.text for element in _children(root, 'IsTruncated')), 'false')
+            if truncated != 'true' or not token:
+                return
+            params['continuation-token'] = token
+
+
+def _children(element: ElementTree.Element, tag: str) -> List[ElementTree.Element]:
+    # S3 listings are namespaced
+    return [child for child in element if child.tag.rsplit('}', 1)[-1] == tag]
+
+
+_STORAGES: Dict[Tuple[str, str], Storage] = {}
+
+
+def get_storage(storage_type: str, location: str) -> Storage:
+    ''' Get the storage of a type at a location (a directory, or a bucket URL for 'http'), reusing it if open '''
+    if (storage_type, location) not in _STORAGES:
+        if storage_type == 'local':
+            _STORAGES[(storage_type, location)] = LocalStorage(location)
+        elif storage_type == 'shared':
+            _STORAGES[(storage_type, location)] = SharedStorage(location)
+        elif storage_type == 'http':
+            _STORAGES[(storage_type, location)] = HTTPStorage(location)
+        else:
+            raise ValueError(f"Unknown storage_type: {storage_type}")
+    return _STORAGES[(storage_type, location)]
+
+
+def from_config(config: Any) -> Storage:
+    ''' Get the storage a cache config points to '''
+    return get_storage(config.storage_type, config.storage_location or config.cache_directory)
@@ -0,0 +1,101 @@
+import atexit
+import collections
+import os
+import threading
+import time
+from typing import Callable, Deque, Dict, Optional, Tuple, Union
+
+import polars as pl
+
+_Job = Tuple[str, pl.DataFrame, Callable[[], None]]
+
+
+class WriteBehind:
+    '''
+    Writes cached frames to disk on a background thread, so a call that missed the cache returns its frame without
+    waiting for it to be serialized.
+
+    Frames waiting to be written can still be looked up by key, so repeating a call before its write lands doesn't
+    fetch it again. At most max_queue writes wait at once; past that, submit() turns the write down and the caller
+    writes it itself. Whatever is queued is written before the interpreter exits.
+    '''
+
+    def __init__(self) -> None:
+        self._reset()
+
+    def _reset(self) -> None:
+        # Also run in a forked child, which has none of the parent's threads: the parent writes its own queue
+        self._jobs: Deque[_Job] = collections.deque()
+        self._pending: Dict[str, pl.DataFrame] = {}
+        self._outstanding = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Union[int, float]] = {
+            'writes': 0, 'failed': 0, 'inline': 0, 'max_queued': 0, 'write_seconds': 0.0, 'max_write_seconds': 0.0
+        }
+
+    def submit(self, key: str, frame: pl.DataFrame, write: Callable[[], None], max_queue: int) -> bool:
+        ''' Queue write (which saves frame under key), unless max_queue writes are waiting already '''
+        with self._condition:
+            if self._outstanding >= max_queue:
+                self._stats['inline'] += 1
+                return False
+            self._start()
+            self._jobs.append((key, frame, write))
+            self._pending[key] = frame
+            self._outstanding += 1
+            self._stats['max_queued'] = max(self._stats['max_queued'], self._outstanding)
+            self._condition.notify_all()
+        return True
+
+    def pending(self, key: str) -> Optional[pl.DataFrame]:
+        ''' Get the frame waiting to be written for key, if there is one '''
+        with self._condition:
+            frame = self._pending.get(key)
+        return frame.clone() if frame is not None else None
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        ''' Wait for every queued write to finish. Returns whether they all did within timeout. '''
+        with self._condition:
+            return self._condition.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._condition:
+            stats = dict(self._stats)
+            stats['queued'] = self._outstanding
+        return stats
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='pybaseball-cache-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: bool(self._jobs))
+                key, frame, write = self._jobs.popleft()
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                write()
+            except Exception:  # pylint: disable=broad-except
+                # The frame just isn't cached, as when a synchronous save fails
+                failed = True
+            elapsed = time.perf_counter() - start
+
+            with self._condition:
+                if self._pending.get(key) is frame:
+                    del self._pending[key]
+                self._outstanding -= 1
+                self._stats['failed' if failed else 'writes'] += 1
+                self._stats['write_seconds'] += elapsed
+                self._stats['max_write_seconds'] = max(self._stats['max_write_seconds'], elapsed)
+                self._condition.notify_all()
+
+
+writer = WriteBehind()
+atexit.register(writer.drain)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=writer._reset)  # pylint: disable=protected-access
@@ -1,10 +1,11 @@
 from abc import ABC
-from typing import Any, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import lxml
 import polars as pl
 
 from .. import cache
+from ..cache.func_utils import forwards_to
 from ..datahelpers.column_mapper import BattingStatsColumnMapper, ColumnListMapperFunction, GenericColumnMapper
 from ..enums.fangraphs import (FangraphsBattingStats, FangraphsFieldingStats, FangraphsLeague, FangraphsMonth,
                                FangraphsPitchingStats, FangraphsPositions, FangraphsStatColumn, FangraphsStatsCategory,
@@ -36,6 +37,11 @@ def team_row_id_func(self: Any, fg_row: lxml.etree.Element) -> Optional[int]:
 def player_row_id_func(self: Any, fg_row: lxml.etree.Element) -> Optional[int]:
     return extract_id_from_row(fg_row, 'playerid')
 
+def _default_end_season(arguments: Dict[str, Any]) -> None:
+    # fetch treats a missing end_season as start_season, so cache them as one
+    if arguments.get('end_season') is None:
+        arguments['end_season'] = arguments.get('start_season')
+
 class FangraphsDataTable(ABC):
     ROOT_URL: str = "https://www.fangraphs.com"
     TABLE_CLASS: str = "rgMasterTable"
@@ -171,7 +177,8 @@ class FangraphsBattingStatsTable(FangraphsDataTable):
     ROW_ID_FUNC: RowIdFunction = player_row_id_func
     ROW_ID_NAME = 'IDfg'
 
-    @cache.df_cache()
+    @cache.df_cache(policy='fangraphs', canonical=_default_end_season)
+    @forwards_to(FangraphsDataTable.fetch)
     def fetch(self, *args, **kwargs):
         return super().fetch(*args, **kwargs)
 
@@ -185,7 +192,8 @@ class FangraphsFieldingStatsTable(FangraphsDataTable):
     ROW_ID_FUNC: RowIdFunction = player_row_id_func
     ROW_ID_NAME = 'IDfg'
 
-    @cache.df_cache()
+    @cache.df_cache(policy='fangraphs', canonical=_default_end_season)
+    @forwards_to(FangraphsDataTable.fetch)
     def fetch(self, *args, **kwargs):
         return super().fetch(*args, **kwargs)
 
@@ -198,7 +206,8 @@ class FangraphsPitchingStatsTable(FangraphsDataTable):
     ROW_ID_FUNC: RowIdFunction = player_row_id_func
     ROW_ID_NAME = 'IDfg'
 
-    @cache.df_cache()
+    @cache.df_cache(policy='fangraphs', canonical=_default_end_season)
+    @forwards_to(FangraphsDataTable.fetch)
     def fetch(self, *args, **kwargs):
         return super().fetch(*args, **kwargs)
 
@@ -0,0 +1,73 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..datahelpers import singleton
+
+# Match the default worker count of concurrent.futures.ThreadPoolExecutor so every worker can keep a connection
+DEFAULT_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_TIMEOUT = (10, 300)  # seconds to connect, seconds to wait for a (potentially very large) response
+
+
+class SavantSession(singleton.Singleton):
+    """
+    A shared, pooled HTTP session for every Baseball Savant request.
+
+    Connections are kept alive and reused across requests (and across the threads of a parallel statcast call)
+    instead of paying for a new TLS handshake each time. The number of requests in flight to any one host is
+    capped at max_requests_per_host.
+
+    The session is only set up once; later calls to SavantSession() return the same session.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, max_requests_per_host: Optional[int] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT) -> None:
+        if getattr(self, 'session', None) is not None:
+            return
+
+        self.pool_size = pool_size
+        self.max_requests_per_host = max_requests_per_host or pool_size
+        self.timeout = timeout
+        self.requests = 0
+
+        self.session = requests.Session()
+        self.session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        self._lock = threading.Lock()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self._host_limits[host]
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        with self._host_limit(url):
+            response = self.session.get(url, **kwargs)
+        with self._lock:
+            self.requests += 1
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Report how well connections are being reused: the number of requests made,
+        the number of connections opened to make them, and how many requests reused an open connection.
+        """
+
+        pools = self.adapter.poolmanager.pools
+        connections = sum(pools[key].num_connections for key in list(pools.keys()))
+        return {
+            'requests': self.requests,
+            'connections': connections,
+            'reused': max(0, self.requests - connections),
+        }
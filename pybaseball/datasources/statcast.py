@@ -1,38 +1,73 @@
 import io
+import logging
 import os
+import re
 from datetime import datetime
-from typing import List, Union
+from typing import List, Optional, Union
 
 import numpy as np
 import polars as pl
-import requests
 
-from .. import cache
 from ..datahelpers import postprocessing
+from . import statcast_schema
+from .savant import SavantSession
 
 ROOT_URL = 'https://baseballsavant.mlb.com'
 
+session = SavantSession()
+
+# Savant writes missing values as empty fields, and occasionally as the string "null"
+_NULL_VALUES = ['', 'null']
+
+# With the cache, since a frame that doesn't fit the schema isn't cached
+logger = logging.getLogger('pybaseball.cache')
+
 
-@cache.df_cache()
 def get_statcast_data_from_csv_url(
     url: str,
     null_replacement: Union[str, int, float, datetime] = np.nan,
-    known_percentages: List[str] = []
+    known_percentages: List[str] = [],
+    schema: Optional[str] = None
 ) -> pl.DataFrame:
-    statcast_content = requests.get(ROOT_URL + url, timeout=None).content
+    statcast_content = session.get(ROOT_URL + url).content
     return get_statcast_data_from_csv(
-        statcast_content.decode('utf-8'),
+        statcast_content,
         null_replacement=null_replacement,
-        known_percentages=known_percentages
+        known_percentages=known_percentages,
+        schema=schema
     )
 
 
 def get_statcast_data_from_csv(
-        csv_content: str,
+        csv_content: Union[str, bytes],
         null_replacement: Union[str, int, float, datetime] = np.nan,
-        known_percentages: List[str] = []
+        known_percentages: List[str] = [],
+        schema: Optional[str] = None
     ) -> pl.DataFrame:
-    data = pl.read_csv(io.StringIO(csv_content))
+    if schema is not None:
+        # The column types are known, so parse the raw response bytes directly
+        # and skip the generic type sniffing in postprocessing
+        raw = csv_content.encode('utf-8') if isinstance(csv_content, str) else csv_content
+        try:
+            return pl.read_csv(
+                raw,
+                schema_overrides=statcast_schema.get_schema(schema),
+                null_values=_NULL_VALUES,
+                infer_schema_length=None,
+            )
+        except pl.exceptions.ComputeError as ex:
+            # Savant changed a column out from under the schema (e.g. a count that now has decimals).
+            # Fall back to inferring every type rather than failing the whole request. The Statcast store won't
+            # keep the result, since its types don't match the schema's.
+            column = re.search(r"at column '([^']*)'", str(ex))
+            logger.warning("Statcast data doesn't fit the %s schema (column %s), so its types were inferred and it "
+                           "won't be cached", schema, column.group(1) if column else 'unknown')
+            return pl.read_csv(raw, null_values=_NULL_VALUES, infer_schema_length=None)
+
+    if isinstance(csv_content, bytes):
+        data = pl.read_csv(io.BytesIO(csv_content))
+    else:
+        data = pl.read_csv(io.StringIO(csv_content))
     return postprocessing.try_parse_dataframe(
         data,
         parse_numerics=False,
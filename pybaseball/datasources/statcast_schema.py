@@ -0,0 +1,85 @@
+'''
+Column types for the Baseball Savant CSV endpoints, applied when the CSV is parsed.
+
+IDs and counts are stored as small integers and low-cardinality strings as categoricals, which roughly halves the
+memory a season of Statcast data takes compared to inferred 64 bit numbers and plain strings.
+Columns that are not listed (e.g. the all-null deprecated columns) are typed by the CSV reader.
+
+Each schema is versioned. Bump the version whenever a schema changes so that data cached with the old types is
+fetched again rather than mixed with the new.
+'''
+from typing import Dict, Optional, Tuple, Type, Union
+
+import polars as pl
+
+DataType = Union[Type[pl.DataType], pl.DataType]
+Schema = Dict[str, DataType]
+
+_IDS = [
+    'batter', 'pitcher', 'game_pk', 'on_1b', 'on_2b', 'on_3b',
+    'fielder_2', 'fielder_3', 'fielder_4', 'fielder_5', 'fielder_6', 'fielder_7', 'fielder_8', 'fielder_9',
+]
+
+_SMALL_INTS = [
+    'game_year', 'at_bat_number', 'pitch_number',
+    'home_score', 'away_score', 'bat_score', 'fld_score',
+    'post_home_score', 'post_away_score', 'post_bat_score', 'post_fld_score',
+    'home_score_diff', 'bat_score_diff',
+    'pitcher_days_since_prev_game', 'batter_days_since_prev_game',
+    'pitcher_days_until_next_game', 'batter_days_until_next_game',
+]
+
+_TINY_INTS = [
+    'zone', 'balls', 'strikes', 'outs_when_up', 'inning', 'hit_location', 'launch_speed_angle',
+    'woba_denom', 'babip_value', 'iso_value',
+    'age_pit', 'age_bat', 'age_pit_legacy', 'age_bat_legacy',
+    'n_thruorder_pitcher', 'n_priorpa_thisgame_player_at_bat',
+]
+
+_CATEGORIES = [
+    'pitch_type', 'pitch_name', 'events', 'description', 'game_type', 'stand', 'p_throws', 'home_team', 'away_team',
+    'type', 'bb_type', 'inning_topbot', 'if_fielding_alignment', 'of_fielding_alignment', 'player_name',
+]
+
+_STRINGS = ['des', 'sv_id']
+
+_MEASUREMENTS = [
+    'release_speed', 'release_pos_x', 'release_pos_y', 'release_pos_z', 'release_spin_rate', 'release_extension',
+    'effective_speed', 'spin_axis', 'pfx_x', 'pfx_z', 'plate_x', 'plate_z', 'sz_top', 'sz_bot',
+    'vx0', 'vy0', 'vz0', 'ax', 'ay', 'az', 'hc_x', 'hc_y', 'hit_distance_sc', 'launch_speed', 'launch_angle',
+    'estimated_ba_using_speedangle', 'estimated_woba_using_speedangle', 'estimated_slg_using_speedangle',
+    'woba_value', 'delta_home_win_exp', 'delta_run_exp', 'delta_pitcher_run_exp', 'home_win_exp', 'bat_win_exp',
+    'bat_speed', 'swing_length', 'hyper_speed', 'arm_angle', 'attack_angle', 'attack_direction', 'swing_path_tilt',
+    'api_break_z_with_gravity', 'api_break_x_arm', 'api_break_x_batter_in',
+    'intercept_ball_minus_batter_pos_x_inches', 'intercept_ball_minus_batter_pos_y_inches',
+]
+
+
+def _statcast_search(measurement_type: DataType) -> Schema:
+    schema: Schema = {'game_date': pl.Date}
+    schema.update({column: pl.Int32 for column in _IDS})
+    schema.update({column: pl.Int16 for column in _SMALL_INTS})
+    schema.update({column: pl.Int8 for column in _TINY_INTS})
+    schema.update({column: pl.Categorical for column in _CATEGORIES})
+    schema.update({column: pl.String for column in _STRINGS})
+    schema.update({column: measurement_type for column in _MEASUREMENTS})
+    return schema
+
+
+# (name, version) => schema
+REGISTRY: Dict[Tuple[str, int], Schema] = {
+    ('statcast_search', 1): _statcast_search(pl.Float64),
+    # Halves the size of the measurements again, at the cost of precision beyond ~7 significant digits
+    ('statcast_search_float32', 1): _statcast_search(pl.Float32),
+}
+
+LATEST_VERSIONS: Dict[str, int] = {}
+for _name, _version in REGISTRY:
+    LATEST_VERSIONS[_name] = max(_version, LATEST_VERSIONS.get(_name, _version))
+
+
+def get_schema(name: str, version: Optional[int] = None) -> Schema:
+    ''' Get a schema by name, at the latest version unless one is given '''
+    if name not in LATEST_VERSIONS:
+        raise ValueError(f"Unknown Savant schema: {name}")
+    return REGISTRY[(name, version if version is not None else LATEST_VERSIONS[name])]
@@ -73,7 +73,7 @@ def batting_stats_range(start_dt: Optional[str] = None, end_dt: Optional[str] =
     return table
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def batting_stats_bref(season: Optional[int] = None) -> pl.DataFrame:
     """
     Get all batting stats for a set season. If no argument is supplied, gives
@@ -86,7 +86,7 @@ def batting_stats_bref(season: Optional[int] = None) -> pl.DataFrame:
     return batting_stats_range(start_dt, end_dt)
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def bwar_bat(return_all: bool = False) -> pl.DataFrame:
     """
     Get data from war_daily_bat table. Returns WAR, its components, and a few other useful stats.
@@ -46,7 +46,7 @@ def get_table(soup: BeautifulSoup) -> pl.DataFrame:
     return data
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def pitching_stats_range(start_dt: Optional[str]=None, end_dt: Optional[str]=None) -> pl.DataFrame:
     """
     Get all pitching stats for a set time range. This can be the past week, the
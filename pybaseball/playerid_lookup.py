@@ -40,7 +40,7 @@ def _extract_people_table(zip_archive: zipfile.ZipFile) -> pl.DataFrame:
     return pl.concat(dfs, axis=0)
 
 
-@cache.df_cache()
+@cache.df_cache(policy='chadwick')
 def chadwick_register(save: bool = False) -> pl.DataFrame:
     ''' Get the Chadwick register Database '''
 
@@ -74,7 +74,7 @@ def get_tables(soup: BeautifulSoup, season: int) -> List[pl.DataFrame]:
     return datasets #returns a list of dataframes
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def standings(season:Optional[int] = None) -> pl.DataFrame:
     """
     Returns a pandas DataFrame of the standings for a given MLB season, or the most recent standings
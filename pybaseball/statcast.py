@@ -1,7 +1,12 @@
 import concurrent.futures
+import functools
+import heapq
+import os
+import time
 import warnings
-from datetime import date
-from typing import Optional, Union
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import polars as pl
 from tqdm import tqdm
@@ -9,40 +14,85 @@ from tqdm import tqdm
 import pybaseball.datasources.statcast as statcast_ds
 
 from . import cache
-from .utils import sanitize_date_range, statcast_date_range
+from .cache import statcast_jobs, statcast_store
+from .cache.cache import _evict_in_background, _storage
+from .utils import sanitize_date_range, statcast_adaptive_date_range, statcast_date_range
 
 _SC_SINGLE_GAME_REQUEST = "/statcast_search/csv?all=true&type=details&game_pk={game_pk}"
 # pylint: disable=line-too-long
 _SC_SMALL_REQUEST = "/statcast_search/csv?all=true&hfPT=&hfAB=&hfBBT=&hfPR=&hfZ=&stadium=&hfBBL=&hfNewZones=&hfGT=R%7CPO%7CS%7C=&hfSea=&hfSit=&player_type=pitcher&hfOuts=&opponent=&pitcher_throws=&batter_stands=&hfSA=&game_date_gt={start_dt}&game_date_lt={end_dt}&team={team}&position=&hfRO=&home_road=&hfFlag=&metric_1=&hfInn=&min_pitches=0&min_results=0&group_by=name&sort_col=pitches&player_event_sort=h_launch_speed&sort_order=desc&min_abs=0&type=details&"
-# _MAX_SC_RESULTS = 40000
+# Baseball Savant silently truncates any response at this many rows
+_MAX_SC_RESULTS = 25000
+
+_DateRange = Tuple[date, date]
+
+# Savant's own order: newest game first, then latest pitch first
+_SORT_COLUMNS = ['game_date', 'game_pk', 'at_bat_number', 'pitch_number']
 
 class StatcastException(Exception):
     pass
 
-@cache.df_cache(expires=365)
-def _small_request(start_dt: date, end_dt: date, team: Optional[str] = None) -> pl.DataFrame:
-    data = statcast_ds.get_statcast_data_from_csv_url(
-        _SC_SMALL_REQUEST.format(start_dt=str(start_dt), end_dt=str(end_dt), team=team if team else '')
-    )
-    if data is not None and not data.empty:
+def _search_schema(float32: bool = False) -> str:
+    """
+    Get the schema to parse search results with: measurements as 64 bit floats, or as 32 bit floats to halve them.
+    """
+
+    return 'statcast_search_float32' if float32 else statcast_store.SCHEMA
+
+
+def _small_request_url(start_dt: date, end_dt: date, team: Optional[str] = None) -> str:
+    return _SC_SMALL_REQUEST.format(start_dt=str(start_dt), end_dt=str(end_dt), team=team if team else '')
+
+
+def _split_truncated(data: pl.DataFrame, start_dt: date, end_dt: date) -> Optional[List[_DateRange]]:
+    """
+    If the response was truncated at the row cap, get the two halves of the window to request instead.
+    Each half comes back sorted newest first, so the later half goes first.
+    """
+
+    if data is None or len(data) < _MAX_SC_RESULTS or start_dt >= end_dt or 'error' in data.columns:
+        return None
+    middle = start_dt + (end_dt - start_dt) // 2
+    return [(middle + timedelta(days=1), end_dt), (start_dt, middle)]
+
+
+def _process_response(data: pl.DataFrame, start_dt: date) -> pl.DataFrame:
+    if data is not None and not data.is_empty():
         if 'error' in data.columns:
-            raise StatcastException(data['error'].values[0])
+            raise StatcastException(data['error'][0])
 
-        data = data.sort_values(
-            ['game_date', 'game_pk', 'at_bat_number', 'pitch_number'],
-            ascending=False
-        )
+        if len(data) >= _MAX_SC_RESULTS:
+            warnings.warn(f'Statcast returned {len(data)} rows for {start_dt}, which may have been truncated.')
+
+        data = data.sort(_SORT_COLUMNS, descending=True)
 
     return data
 
 
+def _fetch_request(start_dt: date, end_dt: date, team: Optional[str] = None,
+                   schema: str = statcast_store.SCHEMA) -> pl.DataFrame:
+    """
+    Request a window from Baseball Savant. Nothing is cached here: with the cache enabled, the day-partitioned
+    Statcast store is the one place search results are persisted.
+    """
+
+    data = statcast_ds.get_statcast_data_from_csv_url(_small_request_url(start_dt, end_dt, team), schema=schema)
+
+    halves = _split_truncated(data, start_dt, end_dt)
+    if halves is not None:
+        return pl.concat([_fetch_request(*half, team=team, schema=schema) for half in halves],
+                         how='diagonal_relaxed')
+
+    return _process_response(data, start_dt)
+
+
 _OVERSIZE_WARNING = '''
 That's a nice request you got there. It'd be a shame if something were to happen to it.
 We strongly recommend that you enable caching before running this. It's as simple as `pybaseball.cache.enable()`.
 Since the Statcast requests can take a *really* long time to run, if something were to happen, like: a disconnect;
 gremlins; computer repair by associates of Rudy Giuliani; electromagnetic interference from metal trash cans; etc.;
 you could lose a lot of progress. Enabling caching will allow you to immediately recover all the successful
-subqueries if that happens.'''
+subqueries if that happens, and giving the request a job_id lets you resume it without re-planning it.'''
 
 
 def _check_warning(start_dt: date, end_dt: date) -> None:
@@ -50,50 +100,302 @@ def _check_warning(start_dt: date, end_dt: date) -> None:
         warnings.warn(_OVERSIZE_WARNING)
 
 
-def _handle_request(start_dt: date, end_dt: date, step: int, verbose: bool,
-                    team: Optional[str] = None, parallel: bool = True) -> pl.DataFrame:
+def _request_ranges(date_range: List[_DateRange], request: Callable[..., pl.DataFrame],
+                    team: Optional[str] = None, parallel: bool = True,
+                    on_result: Optional[Callable[[_DateRange, pl.DataFrame], None]] = None) -> List[pl.DataFrame]:
     """
-    Fulfill the request in sensible increments.
+    Run request over each range in date_range, calling on_result as each range completes.
     """
 
-    _check_warning(start_dt, end_dt)
-
-    if verbose:
-        print("This is a large query, it may take a moment to complete", flush=True)
-
     dataframe_list = []
-    date_range = list(statcast_date_range(start_dt, end_dt, step, verbose))
 
     with tqdm(total=len(date_range)) as progress:
         if parallel:
             # Use ThreadPoolExecutor over ProcessPoolExecutor because ProcessPoolExecutor doesn't work with
             # notebooks and python command line due to the fact it won't have a `__main__` module.
             # See https://docs.python.org/3.7/library/concurrent.futures.html#processpoolexecutor
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                futures = {executor.submit(_small_request, subq_start, subq_end, team=team)
+            # Size the pool to the shared Savant session so every worker can hold a kept-alive connection.
+            with concurrent.futures.ThreadPoolExecutor(max_workers=statcast_ds.session.pool_size) as executor:
+                futures = {executor.submit(request, subq_start, subq_end, team=team): (subq_start, subq_end)
                         for subq_start, subq_end in date_range}
                 for future in concurrent.futures.as_completed(futures):
-                    dataframe_list.append(future.result())
+                    data = future.result()
+                    if on_result is not None:
+                        on_result(futures[future], data)
+                    dataframe_list.append(data)
                     progress.update(1)
         else:
             for subq_start, subq_end in date_range:
-                dataframe_list.append(_small_request(subq_start, subq_end, team=team))
+                data = request(subq_start, subq_end, team=team)
+                if on_result is not None:
+                    on_result((subq_start, subq_end), data)
+                dataframe_list.append(data)
                 progress.update(1)
 
-    # Concatenate all dataframes into final result set
-    if dataframe_list:
-        final_data = pl.concat(dataframe_list, axis=0).convert_dtypes(convert_string=False)
-        final_data = final_data.sort_values(
-            ['game_date', 'game_pk', 'at_bat_number', 'pitch_number'],
-            ascending=False
+    return dataframe_list
+
+
+def _days(start_dt: date, end_dt: date) -> List[date]:
+    return [start_dt + timedelta(days=offset) for offset in range((end_dt - start_dt).days + 1)]
+
+
+def _date_range(start_dt: date, end_dt: date, step: Optional[int], verbose: bool) -> List[_DateRange]:
+    """
+    Split the range into requests of step days, or size them adaptively from the expected rows if step is None.
+    """
+
+    if step is None:
+        return list(statcast_adaptive_date_range(start_dt, end_dt, _MAX_SC_RESULTS, verbose))
+    return list(statcast_date_range(start_dt, end_dt, step, verbose))
+
+
+def _missing_ranges(missing_days: List[date], step: Optional[int]) -> List[_DateRange]:
+    """
+    Group the missing days into contiguous ranges, split into requests as _date_range would.
+    """
+
+    runs: List[_DateRange] = []
+    for day in missing_days:
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return [subq for run_start, run_end in runs for subq in _date_range(run_start, run_end, step, False)]
+
+
+def _store_days(start_dt: date, end_dt: date, verbose: bool) -> List[date]:
+    return [day for subq_start, subq_end in statcast_date_range(start_dt, end_dt, 1, verbose)
+            for day in _days(subq_start, subq_end)]
+
+
+def _open_store(team: Optional[str] = None, schema: str = statcast_store.SCHEMA) -> statcast_store.StatcastStore:
+    return statcast_store.StatcastStore(cache.config.cache_directory, team,
+                                        parquet_options=cache.config.parquet_options(), schema=schema,
+                                        storage=_storage())
+
+
+def _fill_range(store: statcast_store.StatcastStore, start_dt: date, end_dt: date,
+                team: Optional[str] = None) -> pl.DataFrame:
+    """
+    Get a range from the store, fetching it and saving it to the store first if any of its days are missing.
+
+    The range's days are locked while they're checked and fetched, so another thread or process filling any of
+    them waits for this one and then finds them stored, rather than fetching them again.
+    """
+
+    days = _days(start_dt, end_dt)
+    with store.lock_days(days):
+        if store.missing_days(days):
+            data = _fetch_request(start_dt, end_dt, team=team, schema=store.schema)
+            store.save(data, days)
+            # The days count towards the cache's budget like its records do
+            _evict_in_background('statcast')
+            return data
+
+    frames = store.load(days)
+    return pl.concat(frames, how='diagonal_relaxed') if frames else pl.DataFrame()
+
+
+def _fill_store(store: statcast_store.StatcastStore, days: List[date], step: Optional[int],
+                team: Optional[str] = None, parallel: bool = True) -> Tuple[List[date], List[pl.DataFrame]]:
+    """
+    Fetch the days the store doesn't have yet, saving them to the store as each request completes.
+    Returns the days that were missing, and the data for them.
+    """
+
+    missing_days = store.missing_days(days)
+    return missing_days, _request_ranges(_missing_ranges(missing_days, step), functools.partial(_fill_range, store),
+                                         team=team, parallel=parallel)
+
+
+def _request_with_store(start_dt: date, end_dt: date, step: Optional[int], verbose: bool,
+                        team: Optional[str] = None, parallel: bool = True,
+                        schema: str = statcast_store.SCHEMA) -> List[pl.DataFrame]:
+    """
+    Assemble the range from the day-partitioned Statcast store, fetching only the days it doesn't have yet.
+    """
+
+    store = _open_store(team, schema)
+
+    days = _store_days(start_dt, end_dt, verbose)
+    fetched_days, fetched = _fill_store(store, days, step, team=team, parallel=parallel)
+
+    missing_days = set(fetched_days)
+    return store.load([day for day in days if day not in missing_days]) + fetched
+
+
+def _handle_request(start_dt: date, end_dt: date, step: Optional[int], verbose: bool,
+                    team: Optional[str] = None, parallel: bool = True,
+                    schema: str = statcast_store.SCHEMA) -> pl.DataFrame:
+    """
+    Fulfill the request in sensible increments: step days at a time, or sized adaptively if step is None.
+    """
+
+    _check_warning(start_dt, end_dt)
+
+    if verbose:
+        print("This is a large query, it may take a moment to complete", flush=True)
+
+    if cache.config.enabled:
+        dataframe_list = _request_with_store(start_dt, end_dt, step, verbose, team=team, parallel=parallel,
+                                             schema=schema)
+    else:
+        date_range = _date_range(start_dt, end_dt, step, verbose)
+        dataframe_list = _request_ranges(date_range, functools.partial(_fetch_request, schema=schema),
+                                         team=team, parallel=parallel)
+
+    return _combine(dataframe_list)
+
+
+# A job's failed chunk is retried this many times in a run, waiting _JOB_BACKOFF seconds before the first retry and
+# twice as long before each one after
+_JOB_RETRIES = 3
+_JOB_BACKOFF = 2.0
+
+
+def _request_job_chunks(job: statcast_jobs.StatcastJob, store: statcast_store.StatcastStore,
+                        chunks: List[_DateRange], team: Optional[str] = None, parallel: bool = True,
+                        done: int = 0) -> List[pl.DataFrame]:
+    """
+    Fill a job's chunks from the store, marking each completed or failed in the job as it finishes (a failed one
+    has no data here). Chunks reaching today stay planned, since today's games aren't stored and have to be fetched
+    again.
+
+    A failed chunk is retried with backoff, rescheduled from here once its wait is up rather than waited out in a
+    worker, so the other chunks carry on meanwhile. done is the number of chunks completed before, which the
+    progress bar starts from.
+    """
+
+    dataframe_list: List[pl.DataFrame] = []
+    # When each chunk waiting to be requested is due, and which attempt at it that is
+    waiting: List[Tuple[float, int, _DateRange]] = [(0.0, 0, chunk) for chunk in chunks]
+    heapq.heapify(waiting)
+
+    with tqdm(total=len(chunks) + done, initial=done) as progress:
+        def _finish(chunk: _DateRange, attempt: int, result: Callable[[], pl.DataFrame]) -> None:
+            try:
+                data = result()
+            except Exception as ex:  # pylint: disable=broad-except
+                if attempt < _JOB_RETRIES:
+                    heapq.heappush(waiting, (time.monotonic() + _JOB_BACKOFF * 2 ** attempt, attempt + 1, chunk))
+                    return
+                job.fail(chunk, ex, attempts=attempt + 1)
+            else:
+                if chunk[1] < date.today():
+                    job.complete(chunk, len(data), attempts=attempt + 1)
+                dataframe_list.append(data)
+            progress.update(1)
+
+        if parallel:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=statcast_ds.session.pool_size) as executor:
+                running: Dict[concurrent.futures.Future, Tuple[int, _DateRange]] = {}
+                while waiting or running:
+                    while waiting and waiting[0][0] <= time.monotonic():
+                        _, attempt, chunk = heapq.heappop(waiting)
+                        running[executor.submit(_fill_range, store, *chunk, team=team)] = (attempt, chunk)
+                    timeout = max(waiting[0][0] - time.monotonic(), 0.0) if waiting else None
+                    if not running:
+                        time.sleep(timeout or 0.0)
+                        continue
+                    finished, _ = concurrent.futures.wait(running, timeout=timeout,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in finished:
+                        attempt, chunk = running.pop(future)
+                        _finish(chunk, attempt, future.result)
+        else:
+            while waiting:
+                due, attempt, chunk = heapq.heappop(waiting)
+                wait = due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                _finish(chunk, attempt, functools.partial(_fill_range, store, *chunk, team=team))
+
+    return dataframe_list
+
+
+def _run_job(job_id: str, start_dt: date, end_dt: date, verbose: bool, team: Optional[str] = None,
+             parallel: bool = True, schema: str = statcast_store.SCHEMA) -> pl.DataFrame:
+    """
+    Run (or resume) the request as a job: plan its chunks once, and record each as it completes or fails, so a later
+    run skips the completed ones and retries the failed ones.
+    """
+
+    if not cache.config.enabled:
+        raise StatcastException("A statcast job keeps its progress in the cache. "
+                                "Enable it with `pybaseball.cache.enable()`.")
+
+    store = _open_store(team, schema)
+    days = _store_days(start_dt, end_dt, verbose)
+    job = statcast_jobs.StatcastJob(cache.config.cache_directory, job_id)
+    if not job.acquire():
+        raise StatcastException(f"Statcast job {job_id} is already running.")
+    try:
+        # The whole range is planned, so the job accounts for all of it, however much is stored already
+        job.start({'start_dt': str(start_dt), 'end_dt': str(end_dt), 'team': team, 'schema': schema},
+                  lambda: _missing_ranges(days, None))
+
+        # One read of the store's manifest: chunks whose days are all stored are completed without a request, and
+        # completed ones whose days have since been purged from it are planned again
+        stored = store.fetched_days()
+
+        def _is_stored(chunk: _DateRange) -> bool:
+            return chunk[1] < date.today() and all(day in stored for day in _days(*chunk))
+
+        job.reopen([chunk for chunk in job.chunks(statcast_jobs.COMPLETED) if not _is_stored(chunk)])
+        job.complete_stored({chunk: sum(stored[day] for day in _days(*chunk))
+                             for chunk in job.chunks(statcast_jobs.PLANNED, statcast_jobs.FAILED)
+                             if _is_stored(chunk)})
+
+        todo = job.chunks(statcast_jobs.PLANNED, statcast_jobs.FAILED)
+        done = len(job.chunks()) - len(todo)
+        if verbose and done:
+            print(f"Resuming statcast job {job_id}: {done} of {done + len(todo)} chunks already completed",
+                  flush=True)
+
+        fetched = _request_job_chunks(job, store, todo, team=team, parallel=parallel, done=done)
+        status = job.status()
+    finally:
+        job.release()
+
+    if status[statcast_jobs.FAILED]:
+        raise StatcastException(
+            f"{status[statcast_jobs.FAILED]} of statcast job {job_id}'s chunks failed (e.g. {status['errors'][0]}). "
+            f"Run it again with job_id='{job_id}' to retry them; the completed chunks are kept."
         )
+
+    fetched_days = {day for chunk in todo for day in _days(*chunk)}
+    return _combine(store.load([day for day in days if day not in fetched_days]) + fetched)
+
+
+def statcast_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Report the progress of a statcast job started with statcast(..., job_id=job_id): its chunks planned, completed
+    and failed, the rows fetched, the seconds spent on it so far and an estimate of the seconds left.
+    """
+
+    job = statcast_jobs.load_job(cache.config.cache_directory, job_id)
+    if job is None:
+        raise StatcastException(f"There's no statcast job {job_id} in the cache.")
+    return job.status()
+
+
+def _combine(dataframe_list: List[pl.DataFrame]) -> pl.DataFrame:
+    """
+    Concatenate all dataframes into final result set
+    """
+
+    if dataframe_list:
+        # Every frame was parsed with the Statcast schema, so the column types are already final
+        final_data = pl.concat(dataframe_list, how='diagonal_relaxed')
+        final_data = final_data.sort(_SORT_COLUMNS, descending=True)
     else:
         final_data = pl.DataFrame()
     return final_data
 
 
 def statcast(start_dt: str = None, end_dt: str = None, team: str = None,
-             verbose: bool = True, parallel: bool = True) -> pl.DataFrame:
+             verbose: bool = True, parallel: bool = True, float32: bool = False,
+             job_id: Optional[str] = None) -> pl.DataFrame:
     """
     Pulls statcast play-level data from Baseball Savant for a given date range.
 
@@ -103,6 +405,11 @@ def statcast(start_dt: str = None, end_dt: str = None, team: str = None,
     team: optional (defaults to None) : city abbreviation of the team you want data for (e.g. SEA or BOS)
     verbose: bool (defaults to True) : whether to print updates on query progress
     parallel: bool (defaults to True) : whether to parallelize HTTP requests in large queries
+    float32: bool (defaults to False) : whether to keep the measurements (speeds, spin, movement, coordinates...)
+        as 32 bit floats, which halves their memory at the cost of precision beyond ~7 significant digits
+    job_id: optional (defaults to None) : a name to record the request's progress under in the cache, so that if
+        it's interrupted, running it again with the same job_id skips the chunks already completed and retries the
+        ones that failed. Requires the cache to be enabled. See statcast_job_status for its progress.
 
     If no arguments are provided, this will return yesterday's statcast data.
     If one date is provided, it will return that date's statcast data.
@@ -110,30 +417,158 @@ def statcast(start_dt: str = None, end_dt: str = None, team: str = None,
 
     start_dt_date, end_dt_date = sanitize_date_range(start_dt, end_dt)
 
-    return _handle_request(start_dt_date, end_dt_date, 1, verbose=verbose,
-                           team=team, parallel=parallel)
+    if job_id is not None:
+        return _run_job(job_id, start_dt_date, end_dt_date, verbose, team=team, parallel=parallel,
+                        schema=_search_schema(float32))
 
+    return _handle_request(start_dt_date, end_dt_date, None, verbose=verbose,
+                           team=team, parallel=parallel, schema=_search_schema(float32))
 
-def statcast_single_game(game_pk: Union[str, int]) -> pl.DataFrame:
+
+def _request_chunk(start_dt: date, end_dt: date, team: Optional[str] = None,
+                   schema: str = statcast_store.SCHEMA) -> pl.DataFrame:
+    """
+    Fetch a single chunk, serving it from the day-partitioned store when the cache is enabled.
+    """
+
+    if not cache.config.enabled:
+        return _fetch_request(start_dt, end_dt, team=team, schema=schema)
+
+    return _fill_range(_open_store(team, schema), start_dt, end_dt, team=team)
+
+
+def statcast_iter(start_dt: str = None, end_dt: str = None, chunk_days: Optional[int] = 1, team: str = None,
+                  verbose: bool = True, max_in_flight: int = 4,
+                  parquet_dir: Optional[str] = None, float32: bool = False) -> Iterator[pl.DataFrame]:
+    """
+    Pulls statcast play-level data from Baseball Savant for a given date range, one chunk at a time.
+
+    Chunks are yielded in date order. At most max_in_flight chunks are requested or held at once, and the next
+    request is only made once the caller has consumed a chunk, so memory use stays flat however long the range is.
+    Chunks with no games are skipped.
+
+    INPUTS:
+    start_dt: YYYY-MM-DD : the first date for which you want statcast data
+    end_dt: YYYY-MM-DD : the last date for which you want statcast data
+    chunk_days: int (defaults to 1) : the number of days in each chunk, or None to size chunks adaptively
+    team: optional (defaults to None) : city abbreviation of the team you want data for (e.g. SEA or BOS)
+    verbose: bool (defaults to True) : whether to print updates on query progress
+    max_in_flight: int (defaults to 4) : the most chunks to request or hold at once
+    parquet_dir: optional (defaults to None) : a directory to also write each chunk to as
+        {start_dt}_{end_dt}.parquet, building a parquet dataset of the range
+    float32: bool (defaults to False) : whether to keep the measurements (speeds, spin, movement, coordinates...)
+        as 32 bit floats, which halves their memory at the cost of precision beyond ~7 significant digits
+    """
+
+    if (chunk_days is not None and chunk_days < 1) or max_in_flight < 1:
+        raise ValueError("chunk_days and max_in_flight must both be at least 1")
+
+    start_dt_date, end_dt_date = sanitize_date_range(start_dt, end_dt)
+    date_range = iter(_date_range(start_dt_date, end_dt_date, chunk_days, verbose))
+
+    if parquet_dir is not None:
+        os.makedirs(parquet_dir, exist_ok=True)
+
+    pending: Deque[Tuple[_DateRange, concurrent.futures.Future]] = deque()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        def _submit_next() -> None:
+            subq = next(date_range, None)
+            if subq is not None:
+                pending.append((subq, executor.submit(_request_chunk, subq[0], subq[1], team=team,
+                                                      schema=_search_schema(float32))))
+
+        try:
+            for _ in range(max_in_flight):
+                _submit_next()
+
+            while pending:
+                (subq_start, subq_end), future = pending.popleft()
+                data = future.result()
+
+                if verbose:
+                    print(f'Retrieved {subq_start} to {subq_end}', flush=True)
+
+                if data is not None and len(data) > 0:
+                    if parquet_dir is not None:
+                        data.write_parquet(os.path.join(parquet_dir, f'{subq_start}_{subq_end}.parquet'))
+                    yield data
+
+                # Only request the next chunk once this one has been consumed
+                _submit_next()
+        finally:
+            # If the caller stops iterating early, don't wait on requests nobody will consume
+            for _, future in pending:
+                future.cancel()
+
+
+def statcast_scan(start_dt: str = None, end_dt: str = None, columns: Optional[List[str]] = None,
+                  filters: Optional[Dict[str, Any]] = None, team: str = None,
+                  verbose: bool = True, parallel: bool = True, float32: bool = False) -> pl.LazyFrame:
+    """
+    Lazily scans cached statcast play-level data for a given date range.
+
+    Column selection and filters are pushed down to the cached parquet files, so only the requested columns
+    and the row groups that can match the filters are read. Requires the cache to be enabled.
+    Any days in the range that are not cached yet are fetched from Baseball Savant first.
+    Today's games are never cached, so they are not included.
+
+    INPUTS:
+    start_dt: YYYY-MM-DD : the first date for which you want statcast data
+    end_dt: YYYY-MM-DD : the last date for which you want statcast data
+    columns: optional (defaults to None) : the columns to read. All columns are read if None.
+    filters: optional (defaults to None) : a dict of column name to the value (or list of values) to keep,
+        e.g. {'pitcher': 543037, 'pitch_type': ['SL', 'CU']}
+    team: optional (defaults to None) : city abbreviation of the team you want data for (e.g. SEA or BOS)
+    verbose: bool (defaults to True) : whether to print updates on query progress
+    parallel: bool (defaults to True) : whether to parallelize HTTP requests for uncached days
+    float32: bool (defaults to False) : whether to keep the measurements (speeds, spin, movement, coordinates...)
+        as 32 bit floats, which halves their memory at the cost of precision beyond ~7 significant digits
+    """
+
+    if not cache.config.enabled:
+        raise StatcastException("statcast_scan reads from the cache. Enable it with `pybaseball.cache.enable()`.")
+
+    start_dt_date, end_dt_date = sanitize_date_range(start_dt, end_dt)
+
+    store = _open_store(team, _search_schema(float32))
+    days = _store_days(start_dt_date, end_dt_date, verbose)
+    _fill_store(store, days, None, team=team, parallel=parallel)
+
+    scan = store.scan(days)
+    for column, value in (filters or {}).items():
+        if isinstance(value, Iterable) and not isinstance(value, str):
+            scan = scan.filter(pl.col(column).is_in(list(value)))
+        else:
+            scan = scan.filter(pl.col(column) == value)
+
+    if columns is not None:
+        scan = scan.select(columns)
+
+    return scan
+
+
+@cache.df_cache(policy='statcast')
+def statcast_single_game(game_pk: Union[str, int], float32: bool = False) -> pl.DataFrame:
     """
     Pulls statcast play-level data from Baseball Savant for a single game,
     identified by its MLB game ID (game_pk in statcast data)
 
     INPUTS:
     game_pk : 6-digit integer MLB game ID to retrieve
+    float32: bool (defaults to False) : whether to keep the measurements (speeds, spin, movement, coordinates...)
+        as 32 bit floats, which halves their memory at the cost of precision beyond ~7 significant digits
     """
 
     data = statcast_ds.get_statcast_data_from_csv_url(
-        _SC_SINGLE_GAME_REQUEST.format(game_pk=game_pk)
+        _SC_SINGLE_GAME_REQUEST.format(game_pk=game_pk),
+        schema=_search_schema(float32)
     )
 
-    if data is None or data.empty:
+    if data is None or data.is_empty():
         return None
 
     if 'error' in data.columns:
-        raise StatcastException(data['error'].values[0])
+        raise StatcastException(data['error'][0])
 
-    return data.sort_values(
-        ['game_date', 'game_pk', 'at_bat_number', 'pitch_number'],
-        ascending=False
-    )
+    return data.sort(_SORT_COLUMNS, descending=True)
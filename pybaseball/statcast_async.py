@@ -0,0 +1,204 @@
+import asyncio
+import functools
+import threading
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+import polars as pl
+
+import pybaseball.datasources.statcast as statcast_ds
+
+from . import cache
+from .cache.file_utils import FileLock, FileLocks
+from .cache import statcast_store
+from .statcast import (_DateRange, _combine, _date_range, _days, _missing_ranges, _open_store, _process_response,
+                       _search_schema, _small_request_url, _split_truncated, _store_days)
+from .utils import sanitize_date_range
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # type: ignore
+
+_Fetch = Callable[[str], Awaitable[bytes]]
+
+
+@asynccontextmanager
+async def _open_fetcher(concurrency: int, timeout: float) -> AsyncIterator[_Fetch]:
+    """
+    Yield a function that fetches a url's content, with at most concurrency requests in flight.
+
+    Uses aiohttp when it is installed (`pip install pybaseball[async]`). Otherwise requests are made with the
+    shared Savant session on the event loop's default executor.
+    """
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    if aiohttp is None:
+        loop = asyncio.get_running_loop()
+
+        async def _fetch_in_executor(url: str) -> bytes:
+            async with semaphore:
+                get = functools.partial(statcast_ds.session.get, url, timeout=timeout)
+                response = await loop.run_in_executor(None, get)
+                return response.content
+
+        yield _fetch_in_executor
+        return
+
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as client:
+        async def _fetch(url: str) -> bytes:
+            async with semaphore:
+                async with client.get(url) as response:
+                    response.raise_for_status()
+                    return await response.read()
+
+        yield _fetch
+
+
+@asynccontextmanager
+async def _hold(lock: Union[FileLock, FileLocks]) -> AsyncIterator[None]:
+    """
+    Hold a file lock, acquiring it (which can block) off the event loop.
+
+    If the wait is cancelled, the executor thread still goes on to take the lock, so whichever side finds out last
+    releases it: the thread if it gets the lock after the cancellation, otherwise the coroutine.
+    """
+
+    state_lock = threading.Lock()
+    state = {'held': False, 'abandoned': False}
+
+    def _acquire() -> None:
+        lock.acquire()
+        with state_lock:
+            if state['abandoned']:
+                lock.release()
+            else:
+                state['held'] = True
+
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, _acquire)
+    except BaseException:
+        with state_lock:
+            state['abandoned'] = True
+            held = state['held']
+        if held:
+            lock.release()
+        raise
+
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+async def _fetch_request_async(fetch: _Fetch, start_dt: date, end_dt: date, team: Optional[str] = None,
+                               schema: str = statcast_store.SCHEMA) -> pl.DataFrame:
+    content = await fetch(statcast_ds.ROOT_URL + _small_request_url(start_dt, end_dt, team))
+
+    # Parsing is CPU bound, so keep it off the event loop
+    parse = functools.partial(statcast_ds.get_statcast_data_from_csv, content, schema=schema)
+    data = await asyncio.get_running_loop().run_in_executor(None, parse)
+
+    halves = _split_truncated(data, start_dt, end_dt)
+    if halves is not None:
+        frames = await asyncio.gather(*[_fetch_request_async(fetch, *half, team=team, schema=schema)
+                                        for half in halves])
+        return pl.concat(frames, how='diagonal_relaxed')
+
+    return _process_response(data, start_dt)
+
+
+async def _fill_range_async(fetch: _Fetch, store: statcast_store.StatcastStore, start_dt: date, end_dt: date,
+                            team: Optional[str] = None) -> pl.DataFrame:
+    """
+    Get a range from the store, fetching it and saving it to the store first if any of its days are missing.
+    The range's days are locked while they're checked and fetched, as statcast() does.
+    """
+
+    loop = asyncio.get_running_loop()
+    days = _days(start_dt, end_dt)
+    async with _hold(store.lock_days(days)):
+        if await loop.run_in_executor(None, store.missing_days, days):
+            data = await _fetch_request_async(fetch, start_dt, end_dt, team=team, schema=store.schema)
+            await loop.run_in_executor(None, store.save, data, days)
+            return data
+
+    frames = await loop.run_in_executor(None, store.load, days)
+    return pl.concat(frames, how='diagonal_relaxed') if frames else pl.DataFrame()
+
+
+async def _request_ranges_async(fetch: _Fetch, date_range: List[_DateRange], team: Optional[str] = None,
+                                on_result: Optional[Callable[[_DateRange, pl.DataFrame], None]] = None,
+                                schema: str = statcast_store.SCHEMA,
+                                store: Optional[statcast_store.StatcastStore] = None) -> List[pl.DataFrame]:
+    """
+    Run every request in date_range concurrently, calling on_result (off the event loop) as each one completes.
+    With a store, each range is served from it, and only fetched (and saved to it) if any of its days are missing.
+    """
+
+    async def _request(subq: _DateRange) -> pl.DataFrame:
+        if store is not None:
+            data = await _fill_range_async(fetch, store, subq[0], subq[1], team=team)
+        else:
+            data = await _fetch_request_async(fetch, subq[0], subq[1], team=team, schema=schema)
+        if on_result is not None:
+            await asyncio.get_running_loop().run_in_executor(None, on_result, subq, data)
+        return data
+
+    tasks = [asyncio.ensure_future(_request(subq)) for subq in date_range]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        # Don't leave the other requests running if one fails or the caller cancels
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+async def statcast_async(start_dt: Optional[str] = None, end_dt: Optional[str] = None, team: Optional[str] = None,
+                         concurrency: int = 32, timeout: float = 300.0, verbose: bool = False,
+                         float32: bool = False) -> pl.DataFrame:
+    """
+    Pulls statcast play-level data from Baseball Savant for a given date range, on an asyncio event loop.
+
+    This is a coroutine, so it can be awaited from inside an already running loop (e.g. a Jupyter notebook or an
+    async service), or run from synchronous code with `asyncio.run(statcast_async(...))`.
+    When the cache is enabled, it shares the day-partitioned Statcast cache with statcast().
+
+    INPUTS:
+    start_dt: YYYY-MM-DD : the first date for which you want statcast data
+    end_dt: YYYY-MM-DD : the last date for which you want statcast data
+    team: optional (defaults to None) : city abbreviation of the team you want data for (e.g. SEA or BOS)
+    concurrency: int (defaults to 32) : the most requests to have in flight at once
+    timeout: float (defaults to 300) : the number of seconds to allow each request
+    verbose: bool (defaults to False) : whether to print updates on query progress
+    float32: bool (defaults to False) : whether to keep the measurements (speeds, spin, movement, coordinates...)
+        as 32 bit floats, which halves their memory at the cost of precision beyond ~7 significant digits
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    start_dt_date, end_dt_date = sanitize_date_range(start_dt, end_dt)
+    schema = _search_schema(float32)
+
+    if not cache.config.enabled:
+        async with _open_fetcher(concurrency, timeout) as fetch:
+            return _combine(await _request_ranges_async(fetch, _date_range(start_dt_date, end_dt_date, None, verbose),
+                                                        team=team, schema=schema))
+
+    store = _open_store(team, schema)
+    days = _store_days(start_dt_date, end_dt_date, verbose)
+    loop = asyncio.get_running_loop()
+
+    missing_days = set(await loop.run_in_executor(None, store.missing_days, days))
+    async with _open_fetcher(concurrency, timeout) as fetch:
+        fetched = await _request_ranges_async(fetch, _missing_ranges(sorted(missing_days), None), team=team,
+                                              store=store)
+
+    cached = await loop.run_in_executor(None, store.load, [day for day in days if day not in missing_days])
+    return _combine(cached + fetched)
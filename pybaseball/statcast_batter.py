@@ -2,11 +2,13 @@ import io
 from typing import Optional, Union
 
 import polars as pl
-import requests
 
 from . import cache
+from .datasources.savant import SavantSession
 from .utils import sanitize_input, split_request, sanitize_statcast_columns
 
+session = SavantSession()
+
 
 def statcast_batter(start_dt: Optional[str] = None, end_dt: Optional[str] = None, player_id: Optional[int] = None) -> pl.DataFrame:
     """
@@ -29,7 +31,7 @@ def statcast_batter(start_dt: Optional[str] = None, end_dt: Optional[str] = None
     df = split_request(start_dt, end_dt, player_id, url)
     return df
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_batter_exitvelo_barrels(year: int, minBBE: Union[int, str] = "q") -> pl.DataFrame:
     """
     Retrieves batted ball data for all batters in a given year.
@@ -41,12 +43,12 @@ def statcast_batter_exitvelo_barrels(year: int, minBBE: Union[int, str] = "q") -
             only qualified batters will be returned.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/statcast?type=batter&year={year}&position=&team=&min={minBBE}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_batter_expected_stats(year: int, minPA: Union[int, str] = "q") -> pl.DataFrame:
     """
     Retrieves expected stats based on quality of batted ball contact in a given year.
@@ -57,12 +59,12 @@ def statcast_batter_expected_stats(year: int, minPA: Union[int, str] = "q") -> p
             they will be excluded from the results. If no value is specified, only qualified batters will be returned.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/expected_statistics?type=batter&year={year}&position=&team=&min={minPA}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_batter_percentile_ranks(year: int) -> pl.DataFrame:
     """
     Retrieves percentile ranks for each player in a given year, including batters with at least 2.1 PA per team 
@@ -72,12 +74,12 @@ def statcast_batter_percentile_ranks(year: int) -> pl.DataFrame:
         year: The year for which you wish to retrieve percentile data. Format: YYYY.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/percentile-rankings?type=batter&year={year}&position=&team=&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     # URL returns a null player with player id 999999, which we want to drop
     return data.loc[data.player_name.notna()].reset_index(drop=True)
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_batter_pitch_arsenal(year: int, minPA: int = 25) -> pl.DataFrame:
     """
     Retrieves outcome data for batters split by the pitch type in a given year.
@@ -88,11 +90,11 @@ def statcast_batter_pitch_arsenal(year: int, minPA: int = 25) -> pl.DataFrame:
             they will be excluded from the results. If no value is specified, the default number of plate appearances is 25.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/pitch-arsenal-stats?type=batter&pitchType=&year={year}&team=&min={minPA}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_batter_bat_tracking(year: int, minSwings: Union[int,str] = "q" ) -> pl.DataFrame:
     """
     Retrieves a player's bat tracking data for a given year.
@@ -104,7 +106,7 @@ def statcast_batter_bat_tracking(year: int, minSwings: Union[int,str] = "q" ) ->
             is qualified.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/bat-tracking?attackZone=&batSide=&contactType=&count=&dateStart={year}-01-01&dateEnd={year}-12-31&gameType=&isHardHit=&minSwings={minSwings}&minGroupSwings=1&pitchHand=&pitchType=&seasonStart=&seasonEnd=&team=&type=batter&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
@@ -2,12 +2,14 @@ import io
 from typing import Union
 
 import polars as pl
-import requests
 
 from . import cache
+from .datasources.savant import SavantSession
 from .utils import norm_positions, sanitize_statcast_columns
 
-@cache.df_cache()
+session = SavantSession()
+
+@cache.df_cache(policy='statcast')
 def statcast_outs_above_average(year: int, pos: Union[int, str], min_att: Union[int, str] = "q", view: str = "Fielder") -> pl.DataFrame:
 	"""Scrapes outs above average from baseball savant for a given year and position
 
@@ -31,12 +33,12 @@ def statcast_outs_above_average(year: int, pos: Union[int, str], min_att: Union[
 	if pos == "2":
 		raise ValueError("This particular leaderboard does not include catchers!")
 	url = f"https://baseballsavant.mlb.com/leaderboard/outs_above_average?type={view}&startYear={year}&endYear={year}&split=no&team=&range=year&min={min_att}&pos={pos}&roles=&viz=hide&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_fielding_run_value(year: int, pos: Union[int, str], min_inn: int = 100) -> pl.DataFrame:
 	"""Scrapes fielding run value from baseball savant for a given year and position
 
@@ -55,12 +57,12 @@ def statcast_fielding_run_value(year: int, pos: Union[int, str], min_inn: int =
 	"""
 	pos = norm_positions(pos)
 	url = f"https://baseballsavant.mlb.com/leaderboard/fielding-run-value?year={year}&min={min_inn}&pos={pos}&roles=&viz=show&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_outfield_directional_oaa(year: int, min_opp: Union[int, str] = "q") -> pl.DataFrame:
 	"""
 	Retrieves outfielders' directional OAA data for the given year and number of opportunities. The directions are 
@@ -72,12 +74,12 @@ def statcast_outfield_directional_oaa(year: int, min_opp: Union[int, str] = "q")
 		default is players with at least 1 fielding attempt per game.
 	"""
 	url = f"https://baseballsavant.mlb.com/directional_outs_above_average?year={year}&min={min_opp}&team=&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_outfield_catch_prob(year: int, min_opp: Union[int, str] = "q") -> pl.DataFrame:
 	"""
 	Retrieves aggregated data for outfielder performance on fielding attempt types, binned into five star categories, 
@@ -89,12 +91,12 @@ def statcast_outfield_catch_prob(year: int, min_opp: Union[int, str] = "q") -> p
 		default is players with at least 1 fielding attempt per game.
 	"""
 	url = f"https://baseballsavant.mlb.com/leaderboard/catch_probability?type=player&min={min_opp}&year={year}&total=&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_outfielder_jump(year: int, min_att: Union[int, str] = "q") -> pl.DataFrame:
 	"""
 	Retrieves data on outfielder's jump to the ball for the given year and number of attempts. Jump is calculated 
@@ -106,12 +108,12 @@ def statcast_outfielder_jump(year: int, min_att: Union[int, str] = "q") -> pl.Da
 			is players with at least 2 two star or harder fielding attempts per team game / 5.
 	"""
 	url = f"https://baseballsavant.mlb.com/leaderboard/outfield_jump?year={year}&min={min_att}&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_catcher_poptime(year: int, min_2b_att: int = 5, min_3b_att: int = 0) -> pl.DataFrame:
 	"""
 	Retrieves pop time data for catchers given year and minimum stolen base attempts for second and third base. 
@@ -125,11 +127,11 @@ def statcast_catcher_poptime(year: int, min_2b_att: int = 5, min_3b_att: int = 0
 	"""
 	# currently no 2020 data
 	url = f"https://baseballsavant.mlb.com/leaderboard/poptime?year={year}&team=&min2b={min_2b_att}&min3b={min_3b_att}&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_catcher_framing(year: int, min_called_p: Union[int, str] = "q") -> pl.DataFrame:
 	"""
 	Retrieves the catcher's framing results for the given year and minimum called pitches. It uses eight zones around 
@@ -141,7 +143,7 @@ def statcast_catcher_framing(year: int, min_called_p: Union[int, str] = "q") ->
 		is players with at least 6 called pitches in the shadow zone per team game.
 	"""
 	url = f"https://baseballsavant.mlb.com/catcher_framing?year={year}&team=&min={min_called_p}&sort=4,1&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	# CSV includes league average player, which we drop from the result
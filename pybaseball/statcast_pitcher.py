@@ -3,11 +3,13 @@ from typing import Optional, Union
 import warnings
 
 import polars as pl
-import requests
 
 from . import cache
+from .datasources.savant import SavantSession
 from .utils import norm_pitch_code, sanitize_input, split_request, sanitize_statcast_columns
 
+session = SavantSession()
+
 
 def statcast_pitcher(start_dt: Optional[str] = None, end_dt: Optional[str] = None, player_id: Optional[int] = None) -> pl.DataFrame:
     """
@@ -31,7 +33,7 @@ def statcast_pitcher(start_dt: Optional[str] = None, end_dt: Optional[str] = Non
 
     return df
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_exitvelo_barrels(year: int, minBBE: Union[int, str] = "q") -> pl.DataFrame:
     """
     Retrieves batted ball against data for all qualified pitchers in a given year.
@@ -43,12 +45,12 @@ def statcast_pitcher_exitvelo_barrels(year: int, minBBE: Union[int, str] = "q")
             will be returned.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/statcast?type=pitcher&year={year}&position=&team=&min={minBBE}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_expected_stats(year: int, minPA: Union[int, str] = "q") -> pl.DataFrame:
     """
     Retrieves expected stats based on quality of batted ball contact against in a given year.
@@ -59,12 +61,12 @@ def statcast_pitcher_expected_stats(year: int, minPA: Union[int, str] = "q") ->
             they will be excluded from the results. If no value is specified, only qualified pitchers will be returned.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/expected_statistics?type=pitcher&year={year}&position=&team=&min={minPA}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_pitch_arsenal(year: int, minP: int = 250, arsenal_type: str = "avg_speed") -> pl.DataFrame:
     """
     Retrieves high level stats on each pitcher's arsenal in a given year.
@@ -81,12 +83,12 @@ def statcast_pitcher_pitch_arsenal(year: int, minP: int = 250, arsenal_type: str
     if arsenal_type not in arsenals:
         raise ValueError(f"Not a valid arsenal_type. Must be one of {', '.join(arsenals)}.")
     url = f"https://baseballsavant.mlb.com/leaderboard/pitch-arsenals?year={year}&min={minP}&type={arsenal_type}&hand=&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_arsenal_stats(year: int, minPA: int = 25) -> pl.DataFrame:
     """
     Retrieves assorted basic and advanced outcome stats for pitchers' arsenals in a given year. Run value and 
@@ -99,12 +101,12 @@ def statcast_pitcher_arsenal_stats(year: int, minPA: int = 25) -> pl.DataFrame:
     """
     # test to see if pitch types needs to be implemented or if user can subset on their own
     url = f"https://baseballsavant.mlb.com/leaderboard/pitch-arsenal-stats?type=pitcher&pitchType=&year={year}&team=&min={minPA}&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_pitch_movement(year: int, minP: Union[int, str] = "q", pitch_type: str = "FF") -> pl.DataFrame:
     """
     Retrieves pitch movement stats for all qualified pitchers with a specified pitch type for a given year.
@@ -118,12 +120,12 @@ def statcast_pitcher_pitch_movement(year: int, minP: Union[int, str] = "q", pitc
     """
     pitch_type = norm_pitch_code(pitch_type)
     url = f"https://baseballsavant.mlb.com/leaderboard/pitch-movement?year={year}&team=&min={minP}&pitch_type={pitch_type}&hand=&x=pitcher_break_x_hidden&z=pitcher_break_z_hidden&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_active_spin(year: int, minP: int = 250, _type: str = 'spin-based') -> pl.DataFrame:
     """
     Retrieves active spin stats on all of a pitchers' pitches in a given year.
@@ -145,7 +147,7 @@ def statcast_pitcher_active_spin(year: int, minP: int = 250, _type: str = 'spin-
       (Label is "2020 - Observed" and can be read as "Active Spin using the Total Observed Movement method".)
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/active-spin?year={year}_{_type}&min={minP}&hand=&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     if res and '<html' in res.decode('utf-8'):
         # This did no go as planned. Statcast redirected us back to HTML :(
         if _type == 'spin-based':
@@ -162,7 +164,7 @@ def statcast_pitcher_active_spin(year: int, minP: int = 250, _type: str = 'spin-
     data = sanitize_statcast_columns(data)
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_percentile_ranks(year: int) -> pl.DataFrame:
     """
     Retrieves percentile ranks for each player in a given year, including batters with 2.1 PA per team game and 1.25 
@@ -172,12 +174,12 @@ def statcast_pitcher_percentile_ranks(year: int) -> pl.DataFrame:
         year: The year for which you wish to retrieve percentile data. Format: YYYY.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/percentile-rankings?type=pitcher&year={year}&position=&team=&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     # URL returns a null player with player id 999999, which we want to drop
     return data.loc[data.player_name.notna()].reset_index(drop=True)
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_spin_dir_comp(year: int, pitch_a: str = "FF", pitch_b: str = "CH", minP: int = 100, pitcher_pov: bool = True) -> pl.DataFrame:
     """
     Retrieves spin comparisons between two pitches for qualifying pitchers in a given year.
@@ -197,11 +199,11 @@ def statcast_pitcher_spin_dir_comp(year: int, pitch_a: str = "FF", pitch_b: str
     pitch_b = norm_pitch_code(pitch_b, to_word=True)
     pov = "Pit" if pitcher_pov else "Bat"
     url = f"https://baseballsavant.mlb.com/leaderboard/spin-direction-comparison?year={year}&type={pitch_a} / {pitch_b}&min={minP}&team=&pov={pov}&sort=11&sortDir=asc&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data    
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_pitcher_bat_tracking(year: int, minSwings: Union[int,str] = "q") -> pl.DataFrame:
     """
     Retrieves the bat tracking data against for pitchers.
@@ -212,7 +214,7 @@ def statcast_pitcher_bat_tracking(year: int, minSwings: Union[int,str] = "q") ->
         below the threshold, they will be excluded from the results. The default value is qualified.
     """
     url = f"https://baseballsavant.mlb.com/leaderboard/bat-tracking?attackZone=&batSide=&contactType=&count=&dateStart={year}-01-01&dateEnd={year}-12-31&gameType=&isHardHit=&minSwings={minSwings}&minGroupSwings=1&pitchHand=&pitchType=&seasonStart=&seasonEnd=&team=&type=pitcher&csv=true"
-    res = requests.get(url, timeout=None).content
+    res = session.get(url).content
     data = pl.read_csv(io.StringIO(res.decode('utf-8')))
     data = sanitize_statcast_columns(data)
     return data
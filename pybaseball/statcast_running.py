@@ -2,12 +2,14 @@ import io
 from typing import Optional, Union
 
 import polars as pl
-import requests
 
 from . import cache
+from .datasources.savant import SavantSession
 from .utils import sanitize_statcast_columns
 
-@cache.df_cache()
+session = SavantSession()
+
+@cache.df_cache(policy='statcast')
 def statcast_sprint_speed(year: int, min_opp: int = 10) -> pl.DataFrame:
 	"""
 	Returns each player's sprint speed for the given year and minimum number of opportunities. Sprint speed is 
@@ -21,12 +23,12 @@ def statcast_sprint_speed(year: int, min_opp: int = 10) -> pl.DataFrame:
 			Home to first on “topped” or “weakly hit” balls.
 	"""
 	url = f"https://baseballsavant.mlb.com/leaderboard/sprint_speed?year={year}&position=&team=&min={min_opp}&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def statcast_running_splits(year: int, min_opp: int = 5, raw_splits: bool = True) -> pl.DataFrame:
 	"""
 	Returns each player's 90 feet sprint splits at five foot intervals for the given year and minimum number of opportunities.
@@ -40,7 +42,7 @@ def statcast_running_splits(year: int, min_opp: int = 5, raw_splits: bool = True
 	"""
 	split_type = "raw" if raw_splits else "percent"
 	url = f"https://baseballsavant.mlb.com/running_splits?type={split_type}&bats=&year={year}&position=&team=&min={min_opp}&csv=true"
-	res = requests.get(url, timeout=None).content
+	res = session.get(url).content
 	data = pl.read_csv(io.StringIO(res.decode('utf-8')))
 	data = sanitize_statcast_columns(data)
 	return data
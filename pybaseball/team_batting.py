@@ -13,7 +13,7 @@ session = BRefSession()
 team_batting = fg_team_batting_data
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def team_batting_bref(team: str, start_season: int, end_season: Optional[int]=None) -> pl.DataFrame:
     """
     Get season-level Batting Statistics for Specific Team (from Baseball-Reference)
@@ -14,7 +14,7 @@ session = BRefSession()
 team_fielding = fg_team_fielding_data
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def team_fielding_bref(team: str, start_season: int, end_season: Optional[int]=None) -> pl.DataFrame:
     """
     Get season-level Fielding Statistics for Specific Team (from Baseball-Reference)
@@ -38,7 +38,7 @@ def postprocess(data: pl.DataFrame) -> pl.DataFrame:
     return data.reset_index(drop=True)
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def team_game_logs(season: int, team: str, log_type: str="batting") -> pl.DataFrame:
     """
     Get Baseball Reference batting or pitching game logs for a team-season.
@@ -13,7 +13,7 @@ session = BRefSession()
 team_pitching = fg_team_pitching_data 
 
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def team_pitching_bref(team: str, start_season: int, end_season: Optional[int]=None) -> pl.DataFrame:
     """
     Get season-level Pitching Statistics for Specific Team (from Baseball-Reference)
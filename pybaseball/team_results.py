@@ -101,7 +101,7 @@ def make_numeric(data: pl.DataFrame) -> pl.DataFrame:
     data[num_cols] = data[num_cols].astype(float) #not int because of NaNs
     return data
 
-@cache.df_cache()
+@cache.df_cache(policy='bref')
 def schedule_and_record(season: int, team: str) -> pl.DataFrame:
     """ 
     Retrieve a team's game-level results for a given season, including win/loss/tie result, score, attendance, 
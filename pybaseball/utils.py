@@ -9,9 +9,12 @@ import polars as pl
 import requests
 
 from . import cache
+from .datasources.savant import SavantSession
 
 DATE_FORMAT = "%Y-%m-%d"
 
+session = SavantSession()
+
 # dictionary containing team abbreviations and their first year in existance
 # https://www.baseball-reference.com/teams/
 # Nones mean that team only exists as an alias
@@ -218,6 +221,50 @@ def statcast_date_range(start: date, stop: date, step: int, verbose: bool = True
 		low += timedelta(days=step)
 
 
+def statcast_expected_rows(day: date) -> int:
+	'''
+	A rough estimate of the number of pitches Statcast records on a given day, used to size request windows.
+	Opening week and the postseason have far fewer games than a full regular season slate.
+	'''
+	season_start, season_end = STATCAST_VALID_DATES.get(
+		day.year, (date(day.year, 3, 28), date(day.year, 10, 31))
+	)
+	if day < season_start or day > season_end:
+		return 500  # the few spring training and exhibition games that are tracked
+	if day < season_start + timedelta(days=3):
+		return 2000  # opening days and international openers
+	if day > season_end - timedelta(days=27):
+		return 1000  # postseason
+	return 4500  # a full slate of about 15 games at about 300 pitches each
+
+
+def statcast_adaptive_date_range(start: date, stop: date, max_rows: int, verbose: bool = True,
+								 fill: float = 0.6) -> Iterator[Tuple[date, date]]:
+	'''
+	Iterate over dates like statcast_date_range, but size each segment from the expected rows per day.
+	Segments grow on light days and shrink on heavy ones, aiming for fill * max_rows rows per request
+	so that each response stays safely under the row cap.
+	Range is inclusive of the stop date.
+	'''
+	target = max(1, int(max_rows * fill))
+	low: Optional[date] = None
+	high: Optional[date] = None
+	rows = 0
+
+	for day, _ in statcast_date_range(start, stop, 1, verbose):
+		expected = statcast_expected_rows(day)
+		if low is not None and high is not None:
+			if high + timedelta(days=1) == day and rows + expected <= target:
+				high = day
+				rows += expected
+				continue
+			yield low, high
+		low, high, rows = day, day, expected
+
+	if low is not None and high is not None:
+		yield low, high
+
+
 def sanitize_statcast_columns(df: pl.DataFrame) -> pl.DataFrame:
 	'''
 	Creates uniform structure in Statcast column names
@@ -272,7 +319,7 @@ def sanitize_input(start_dt: Optional[str], end_dt: Optional[str], player_id: Op
 	return str(start_dt_date), str(end_dt_date), player_id_str
 
 
-@cache.df_cache()
+@cache.df_cache(policy='statcast')
 def split_request(start_dt: str, end_dt: str, player_id: int, url: str) -> pl.DataFrame:
 	"""
 	Splits Statcast queries to avoid request timeouts
@@ -291,7 +338,7 @@ def split_request(start_dt: str, end_dt: str, player_id: int, url: str) -> pl.Da
 		start_str = current_dt.strftime('%Y-%m-%d')
 		end_str = next_dt.strftime('%Y-%m-%d')
 		# retrieve data
-		data = requests.get(url.format(start_str, end_str, player_id_str))
+		data = session.get(url.format(start_str, end_str, player_id_str))
 		df = pl.read_csv(io.StringIO(data.text))
 		# add data to list and increment current dates
 		results.append(df)
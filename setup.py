@@ -101,6 +101,7 @@ setup(
     # $ pip install -e .[dev,test]
     extras_require={
     #    'dev': ['check-manifest'],
+        'async': ['aiohttp>=3.7.0'],
         'test': ['pytest>=6.0.2',
                  'mypy>=0.782',
                  'pytest-cov>=2.10.1',
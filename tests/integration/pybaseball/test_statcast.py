@@ -3,14 +3,14 @@ from datetime import date, timedelta
 import polars as pl
 import pytest
 
-from pybaseball.statcast import _handle_request, _small_request, statcast, statcast_single_game
+from pybaseball.statcast import _fetch_request, _handle_request, statcast, statcast_single_game
 from pybaseball.utils import sanitize_date_range
 from tests.conftest import CURRENT_SC_COLUMNS
 
 
-def test_small_request() -> None:
+def test_fetch_request() -> None:
     start_dt, end_dt = sanitize_date_range('2019-06-01', None)
-    result = _small_request(start_dt, end_dt)
+    result = _fetch_request(start_dt, end_dt)
 
     assert result is not None
     assert not result.empty
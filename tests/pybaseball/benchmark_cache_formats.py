@@ -0,0 +1,67 @@
+'''
+Benchmark the cache formats (cache_type) on a Statcast-sized frame.
+
+For each format, reports the file size, the time to save the frame and the time to load it back through
+the cache's own save_df/load_df, plus the time to load it and sum one column (which makes a memory-mapped load
+actually touch the data it maps). The frame is one game repeated, so the compressed formats come out far smaller
+than they would on a real season:
+
+    python -m tests.pybaseball.benchmark_cache_formats --rows 750000
+'''
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict
+
+import polars as pl
+
+from pybaseball.cache import dataframe_utils
+from pybaseball.datasources.statcast import get_statcast_data_from_csv
+
+ITERATIONS = 5
+CACHE_TYPES = ('csv', 'parquet', 'arrow', 'feather')
+
+
+def statcast_frame(rows: int) -> pl.DataFrame:
+    ''' Repeat the single game fixture until it is about rows long '''
+    this_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(this_dir, 'data', 'single_game_request_raw.csv'), 'rb') as _file:
+        game = get_statcast_data_from_csv(_file.read(), schema='statcast_search')
+    return pl.concat([game] * max(1, rows // len(game)))
+
+
+def timed(func: Callable[[], object], iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def benchmark(data: pl.DataFrame, iterations: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for cache_type in CACHE_TYPES:
+            filename = os.path.join(directory, f'frame.{cache_type}')
+            results[cache_type] = {
+                'save s': timed(lambda: dataframe_utils.save_df(data, filename), iterations),
+                'MB': os.path.getsize(filename) / 1024 ** 2,
+                'load s': timed(lambda: dataframe_utils.load_df(filename), iterations),
+                'load+sum s': timed(lambda: dataframe_utils.load_df(filename)['release_speed'].sum(), iterations),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default=750000, type=int, help='about a regular season of pitches by default')
+    parser.add_argument('--iterations', default=ITERATIONS, type=int)
+    args = parser.parse_args()
+
+    frame = statcast_frame(args.rows)
+    print(f'{len(frame)} rows x {len(frame.columns)} columns')
+    for name, result in benchmark(frame, args.iterations).items():
+        print(f'{name:>8}: ' + ', '.join(f'{key}={value:.3f}' for key, value in result.items()))
@@ -0,0 +1,106 @@
+'''
+Benchmark parquet codecs and row-group layouts for the day-partitioned Statcast cache.
+
+Builds --days days of Statcast data from the recorded small_request fixture (one day of eight games), stores them
+with each layout through StatcastStore, and reports the size on disk, the time to read every day, and the time to
+scan one game out of the whole range. The 'unsorted' layout writes each day in the order the rows arrived with
+polars' defaults, as the cache did before the layout was configurable:
+
+    python -m tests.pybaseball.benchmark_parquet_layout --days 60
+'''
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import polars as pl
+
+from pybaseball.cache import statcast_store
+from pybaseball.datasources.statcast import get_statcast_data_from_csv
+
+ITERATIONS = 5
+
+LAYOUTS: Dict[str, Optional[Dict[str, Any]]] = {
+    'unsorted': None,
+    'zstd': {'compression': 'zstd'},
+    'zstd-9': {'compression': 'zstd', 'compression_level': 9},
+    'lz4': {'compression': 'lz4'},
+    'snappy': {'compression': 'snappy'},
+    'uncompressed': {'compression': 'uncompressed'},
+    'zstd, 1024 rows': {'compression': 'zstd', 'row_group_size': 1024},
+}
+
+
+def recorded_days(days: int) -> pl.DataFrame:
+    ''' Repeat the recorded day of games, moving each copy to its own date with its own game_pks '''
+    this_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(this_dir, 'data', 'small_request_raw.csv'), 'rb') as _file:
+        day = get_statcast_data_from_csv(_file.read(), schema='statcast_search')
+
+    copies = []
+    for offset in range(days):
+        copies.append(day.with_columns(
+            pl.lit(date(2019, 4, 1) + timedelta(days=offset)).alias('game_date'),
+            (pl.col('game_pk') + offset * 100).alias('game_pk'),
+        ))
+    # Savant returns rows newest first, not grouped by game, so shuffle each day the same way
+    return pl.concat(copies).sample(fraction=1.0, shuffle=True, seed=0)
+
+
+def timed(func: Callable[[], object], iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def day_filename(directory: str, store: statcast_store.StatcastStore, day: date) -> str:
+    return os.path.join(directory, *store.day_name(day).split('/'))
+
+
+def write_unsorted(directory: str, store: statcast_store.StatcastStore, data: pl.DataFrame,
+                   days: List[date]) -> None:
+    os.makedirs(os.path.dirname(day_filename(directory, store, days[0])), exist_ok=True)
+    for day in days:
+        data.filter(pl.col('game_date') == day).write_parquet(day_filename(directory, store, day))
+
+
+def benchmark(data: pl.DataFrame, iterations: int) -> Dict[str, Dict[str, float]]:
+    days = sorted(data['game_date'].unique().to_list())
+    one_game = data['game_pk'].max()
+    results = {}
+
+    for name, options in LAYOUTS.items():
+        with tempfile.TemporaryDirectory() as directory:
+            store = statcast_store.StatcastStore(directory, parquet_options=options)
+            if options is None:
+                write_unsorted(directory, store, data, days)
+            else:
+                store.save(data, days)
+            filenames = [day_filename(directory, store, day) for day in days]
+
+            results[name] = {
+                'MB': sum(os.path.getsize(filename) for filename in filenames) / 1024 ** 2,
+                'read all s': timed(lambda: pl.read_parquet(filenames), iterations),
+                'scan game s': timed(
+                    lambda: pl.scan_parquet(filenames).filter(pl.col('game_pk') == one_game).collect(), iterations
+                ),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', default=60, type=int)
+    parser.add_argument('--iterations', default=ITERATIONS, type=int)
+    args = parser.parse_args()
+
+    frame = recorded_days(args.days)
+    print(f'{args.days} days, {len(frame)} rows x {len(frame.columns)} columns')
+    for layout, result in benchmark(frame, args.iterations).items():
+        print(f'{layout:>16}: ' + ', '.join(f'{key}={value:.3f}' for key, value in result.items()))
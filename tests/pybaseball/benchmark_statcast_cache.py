@@ -0,0 +1,132 @@
+'''
+Benchmark the Statcast cache on a season-long pull, against mocked Baseball Savant responses.
+
+Reports the files the cache writes, the index lookups it makes and the wall time for a cold pull (nothing cached)
+and a warm one (everything cached). Pass --legacy to also run with the URL level cache that used to sit under the
+day-partitioned store, which persisted every chunk a second time:
+
+    python -m tests.pybaseball.benchmark_statcast_cache --legacy
+'''
+import argparse
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+import pybaseball.datasources.statcast as statcast_ds
+from pybaseball import cache
+from pybaseball.cache import cache_index, file_utils
+from pybaseball.statcast import statcast
+
+SEASON = ('2019-03-28', '2019-09-29')
+
+
+def get_data_file_contents(filename: str) -> bytes:
+    this_dir = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(this_dir, 'data', filename), 'rb') as _file:
+        return _file.read()
+
+
+class DummyResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.status_code = 200
+
+
+@contextmanager
+def mock_savant() -> Iterator[None]:
+    ''' Answer every Statcast search with the single game fixture, moved to the first day of the request '''
+    game = get_data_file_contents('single_game_request_raw.csv')
+
+    def fake_get(url: str, **kwargs: Any) -> DummyResponse:
+        match = re.search(r'game_date_gt=(\d{4}-\d{2}-\d{2})', url)
+        assert match is not None
+        return DummyResponse(game.replace(b'2020-09-03', match.group(1).encode('utf-8')))
+
+    original = statcast_ds.session.get
+    statcast_ds.session.get = fake_get  # type: ignore
+    try:
+        yield
+    finally:
+        statcast_ds.session.get = original  # type: ignore
+
+
+@contextmanager
+def legacy_url_cache() -> Iterator[None]:
+    ''' Put back the URL level cache on get_statcast_data_from_csv_url '''
+    original = statcast_ds.get_statcast_data_from_csv_url
+    statcast_ds.get_statcast_data_from_csv_url = cache.df_cache()(original)  # type: ignore
+    try:
+        yield
+    finally:
+        statcast_ds.get_statcast_data_from_csv_url = original  # type: ignore
+
+
+@contextmanager
+def count_lookups(counts: Dict[str, int]) -> Iterator[None]:
+    original = cache_index.CacheIndex.get
+
+    def _get(self: cache_index.CacheIndex, key: str) -> Any:
+        counts['lookups'] += 1
+        return original(self, key)
+
+    cache_index.CacheIndex.get = _get  # type: ignore
+    try:
+        yield
+    finally:
+        cache_index.CacheIndex.get = original  # type: ignore
+
+
+def count_files(directory: str) -> int:
+    ''' Count the files the cache holds, leaving out the lock files taken while fetching '''
+    return sum(len(files) for root, _, files in os.walk(directory)
+               if file_utils.LOCK_DIRECTORY not in os.path.relpath(root, directory).split(os.sep))
+
+
+def run(legacy: bool) -> Dict[str, Dict[str, float]]:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, mock_savant():
+        cache.config.cache_directory = directory
+        cache.enable()
+        initial_files = count_files(directory)
+
+        for run_name in ('cold', 'warm'):
+            counts = {'lookups': 0}
+            with count_lookups(counts):
+                start = time.perf_counter()
+                if legacy:
+                    with legacy_url_cache():
+                        statcast(*SEASON, verbose=False)
+                else:
+                    statcast(*SEASON, verbose=False)
+                elapsed = time.perf_counter() - start
+            results[run_name] = {
+                'files written': count_files(directory) - initial_files,
+                'index lookups': counts['lookups'],
+                'seconds': round(elapsed, 2),
+            }
+            initial_files = count_files(directory)
+
+        cache.disable()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--legacy', action='store_true', default=False,
+                        help='also benchmark with the old URL level cache for comparison')
+    args = parser.parse_args()
+
+    original_directory = cache.config.cache_directory
+    try:
+        runs = {'layered': run(legacy=False)}
+        if args.legacy:
+            runs['legacy'] = run(legacy=True)
+    finally:
+        cache.config.cache_directory = original_directory
+
+    for name, results in runs.items():
+        for run_name, result in results.items():
+            print(f'{name:>8} {run_name:>5}: ' + ', '.join(f'{key}={value}' for key, value in result.items()))
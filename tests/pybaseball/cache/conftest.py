@@ -0,0 +1,20 @@
+import os
+import tempfile
+from typing import Generator
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from pybaseball.cache import file_utils
+
+
+@pytest.fixture(name='directory')
+def _directory(monkeypatch: MonkeyPatch) -> Generator[str, None, None]:
+    '''
+    A real temporary directory, for tests that need the cache to create directories and remove files (which the
+    autouse fixtures in tests/pybaseball/conftest.py otherwise mock out)
+    '''
+    monkeypatch.setattr(file_utils, 'mkdir', lambda directory: os.makedirs(directory, exist_ok=True))
+    monkeypatch.setattr(os, 'remove', os.unlink)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        yield temp_directory
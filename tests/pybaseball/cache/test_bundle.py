@@ -0,0 +1,134 @@
+import os
+import tarfile
+from datetime import date
+from typing import Any, Dict, Tuple
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from pybaseball.cache import bundle, cache_index, cache_record, dataframe_utils, file_utils, statcast_store
+from pybaseball.cache.storage import LocalStorage
+
+
+@pytest.fixture(name='cache_dirs')
+def _cache_dirs(directory: str) -> Tuple[str, str, str]:
+    source, target = os.path.join(directory, 'source'), os.path.join(directory, 'target')
+    os.makedirs(source)
+    os.makedirs(target)
+    return source, target, os.path.join(directory, 'cache.tar')
+
+
+def _save_record(directory: str, func: str, kwargs: Dict[str, Any], frame: pl.DataFrame,
+                 expires: str = '3000-01-01') -> Dict[str, Any]:
+    data: Dict[str, Any] = {'func': func, 'args': [], 'kwargs': kwargs, 'expires': expires}
+    base = os.path.join(directory, f'{func}-{len(os.listdir(directory))}')
+    if len(frame) > 0:
+        data['dataframe'] = base + '.parquet'
+        frame.write_parquet(data['dataframe'])
+    else:
+        data['empty_schema'] = dataframe_utils.serialize_schema(frame)
+    file_utils.safe_jsonify(directory, base + '.cache_record.json', data)
+    cache_index.get_index(directory).add(cache_index.record_key(data), func, base + '.cache_record.json', expires,
+                                         cache_index.record_size(base + '.cache_record.json', data))
+    return data
+
+
+def _load(directory: str, data: Dict[str, Any]) -> pl.DataFrame:
+    filename = cache_index.get_index(directory).get(cache_index.record_key(data))
+    assert filename is not None
+    return cache_record.CacheRecord(filename, storage=LocalStorage(directory)).load_df()
+
+
+def _statcast_days() -> pl.DataFrame:
+    return pl.DataFrame({'game_date': [date(2018, 9, 30), date(2019, 4, 1)], 'game_pk': [1, 2], 'pitch_number': [1, 1]},
+                        schema_overrides={'game_pk': pl.Int32, 'pitch_number': pl.Int16})
+
+
+def test_round_trip(cache_dirs: Tuple[str, str, str]) -> None:
+    source, target, path = cache_dirs
+    batting = _save_record(source, 'batting_stats', {'start_season': 2019, 'end_season': 2019},
+                           pl.DataFrame({'a': [1, 2]}))
+    tombstone = _save_record(source, 'schedule_and_record', {'season': 2019},
+                             pl.DataFrame({'a': pl.Series([], dtype=pl.Int64)}))
+    _save_record(source, 'pitching_stats', {'start_season': 2019}, pl.DataFrame({'a': [3]}), expires='2000-01-01')
+    days = [date(2018, 9, 30), date(2019, 4, 1), date(2019, 4, 2)]
+    statcast_store.StatcastStore(source).save(_statcast_days(), days)
+
+    assert bundle.export_bundle(source, path) == {'records': 2, 'statcast_days': 3}
+    assert bundle.import_bundle(target, path) == {'records': 2, 'statcast_days': 3}
+
+    assert_frame_equal(_load(target, batting), pl.DataFrame({'a': [1, 2]}))
+    assert_frame_equal(_load(target, tombstone), pl.DataFrame({'a': pl.Series([], dtype=pl.Int64)}))
+    filename = cache_index.get_index(target).get(cache_index.record_key(batting))
+    assert filename is not None
+    frame = cache_record.CacheRecord(filename, storage=LocalStorage(target)).data['dataframe']
+    assert os.path.isfile(os.path.join(target, filename)) and os.path.isfile(os.path.join(target, frame))
+
+    store = statcast_store.StatcastStore(target)
+    assert store.fetched_days() == {date(2018, 9, 30): 1, date(2019, 4, 1): 1, date(2019, 4, 2): 0}
+    assert len(store.load(days)) == 2
+    # Nothing is left staged
+    assert not [name for name in os.listdir(target) if name.startswith('.bundle-')]
+
+
+def test_bundle_paths_are_relative(cache_dirs: Tuple[str, str, str]) -> None:
+    source, _, path = cache_dirs
+    _save_record(source, 'batting_stats', {'start_season': 2019}, pl.DataFrame({'a': [1, 2]}))
+
+    bundle.export_bundle(source, path)
+
+    with tarfile.open(path) as archive:
+        names = archive.getnames()
+        record_name = next(name for name in names if name.endswith('.cache_record.json'))
+        record_file = archive.extractfile(record_name)
+        assert record_file is not None
+        assert record_file.read().decode('utf-8').count(source) == 0
+    assert all(not os.path.isabs(name) for name in names)
+
+
+def test_export_filters(cache_dirs: Tuple[str, str, str]) -> None:
+    source, _, path = cache_dirs
+    _save_record(source, 'batting_stats', {'start_season': 2017, 'end_season': 2019}, pl.DataFrame({'a': [1]}))
+    _save_record(source, 'batting_stats', {'start_season': 2019, 'end_season': 2019}, pl.DataFrame({'a': [2]}))
+    _save_record(source, 'pitching_stats', {'start_season': 2018}, pl.DataFrame({'a': [3]}))
+    _save_record(source, 'chadwick_register', {}, pl.DataFrame({'a': [4]}))
+    statcast_store.StatcastStore(source).save(_statcast_days(), [date(2018, 9, 30), date(2019, 4, 1)])
+
+    assert bundle.export_bundle(source, path, seasons=[2018]) == {'records': 2, 'statcast_days': 1}
+    assert bundle.export_bundle(source, path, funcs=['batting_stats'], seasons=[2018]) == \
+        {'records': 1, 'statcast_days': 0}
+    assert bundle.export_bundle(source, path, funcs=['statcast']) == {'records': 0, 'statcast_days': 2}
+
+
+def test_import_rejects_corrupt_bundle(cache_dirs: Tuple[str, str, str]) -> None:
+    source, target, path = cache_dirs
+    batting = _save_record(source, 'batting_stats', {'start_season': 2019}, pl.DataFrame({'a': [1, 2]}))
+    bundle.export_bundle(source, path)
+
+    # Flip a byte of the frame
+    with tarfile.open(path) as archive:
+        member = next(member for member in archive.getmembers() if member.name.endswith('.parquet'))
+    with open(path, 'r+b') as file:
+        file.seek(member.offset_data + 10)
+        byte = file.read(1)
+        file.seek(member.offset_data + 10)
+        file.write(bytes([byte[0] ^ 0xff]))
+
+    with pytest.raises(ValueError, match="checksum"):
+        bundle.import_bundle(target, path)
+
+    assert cache_index.get_index(target).get(cache_index.record_key(batting)) is None
+    assert not [name for name in os.listdir(target) if name.startswith('.bundle-')]
+
+
+def test_import_keeps_newer_statcast_days(cache_dirs: Tuple[str, str, str]) -> None:
+    source, target, path = cache_dirs
+    statcast_store.StatcastStore(source).save(_statcast_days(), [date(2019, 4, 1)])
+    bundle.export_bundle(source, path)
+
+    manifest = {'2019-04-01': {'rows': 0, 'fetched': '2999-01-01', 'schema': 'newer'}}
+    file_utils.safe_jsonify(os.path.join(target, 'statcast', 'all'), statcast_store.MANIFEST_FILENAME, manifest)
+
+    assert bundle.import_bundle(target, path) == {'records': 0, 'statcast_days': 0}
+    assert statcast_store.load_manifest(LocalStorage(target), 'statcast/all') == manifest
@@ -1,16 +1,24 @@
-from datetime import datetime, timedelta
-from typing import Callable
-from unittest.mock import MagicMock, patch
+import abc
+import contextlib
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from unittest.mock import ANY, MagicMock, patch
 
 import polars as pl
+from polars.testing import assert_frame_equal
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from pybaseball import cache
+from pybaseball.cache import statcast_store
 
 
 @pytest.fixture(name="mock_data_1")
 def _mock_data_1() -> pl.DataFrame:
-    return pl.DataFrame([1, 2], columns=['a'])
+    return pl.DataFrame({'a': [1, 2]})
 
 
 @pytest.fixture(name='empty_load_mock')
@@ -33,9 +41,17 @@ def _save_json_mock(monkeypatch: MonkeyPatch) -> MagicMock:
     return save_mock
 
 
+@pytest.fixture(name='index_mock')
+def _index_mock(monkeypatch: MonkeyPatch) -> MagicMock:
+    index_mock = MagicMock()
+    index_mock.get.return_value = None
+    monkeypatch.setattr(cache.cache_index, 'get_index', MagicMock(return_value=index_mock))
+    return index_mock
+
+
 @pytest.fixture(name='save_mock')
 def _save_mock(monkeypatch: MonkeyPatch) -> MagicMock:
-    save_mock = MagicMock()
+    save_mock = MagicMock(return_value=(100, 'sha256'))
     monkeypatch.setattr(cache.dataframe_utils, 'save_df', save_mock)
     return save_mock
 
@@ -56,7 +72,7 @@ def test_cache_disable() -> None:
 
 @patch('pybaseball.cache.config.enabled', False)
 def test_call_cache_disabled(load_mock: MagicMock, save_mock: MagicMock) -> None:
-    df_func = MagicMock(return_value=pl.DataFrame([1, 2], columns=['a']))
+    df_func = MagicMock(return_value=pl.DataFrame({'a': [1, 2]}))
     df_func.__name__ = "df_func"
 
     df_cache = cache.df_cache()
@@ -71,7 +87,6 @@ def test_call_cache_disabled(load_mock: MagicMock, save_mock: MagicMock) -> None
 
 
 @patch('pybaseball.cache.config.enabled', True)
-@patch('glob.glob', MagicMock(return_value=['1.cache_record.json']))
 @patch('pybaseball.cache.file_utils.load_json', MagicMock(
     return_value={
         'expires': '3000-01-01',
@@ -82,8 +97,9 @@ def test_call_cache_disabled(load_mock: MagicMock, save_mock: MagicMock) -> None
     }
 ))
 def test_call_cache_enabled_loads_cache(
-        mock_data_1: pl.DataFrame,
+        mock_data_1: pl.DataFrame, index_mock: MagicMock,
         load_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    index_mock.get.return_value = '1.cache_record.json'
     df_func = MagicMock()
     df_func.__name__ = "df_func"
 
@@ -99,17 +115,17 @@ def test_call_cache_enabled_loads_cache(
 
     assert isinstance(result, pl.DataFrame)
 
-    pl.testing.assert_frame_equal(result, mock_data_1)
+    assert_frame_equal(result, mock_data_1)
 
 
 @patch('pybaseball.cache.config.enabled', True)
-@patch('glob.glob', MagicMock(return_value=['1.cache_record.json']))
 @patch('pybaseball.cache.file_utils.load_json', MagicMock(
     return_value={'expires': '2020-01-01', 'filename': 'old_file.csv'}
 ))
 def test_call_cache_ignores_expired(
-        mock_data_1: pl.DataFrame, load_mock: MagicMock,
-        save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, load_mock: MagicMock,
+        save_mock: MagicMock, save_json_mock: MagicMock, remove: MagicMock) -> None:
+    index_mock.get.return_value = '1.cache_record.json'
     df_func = MagicMock(return_value=mock_data_1)
     df_func.__name__ = "df_func"
 
@@ -121,16 +137,18 @@ def test_call_cache_ignores_expired(
 
     df_func.assert_called_once_with(1, 2, val1='a')
     load_mock.assert_not_called()
+    index_mock.remove.assert_any_call('1.cache_record.json')
+    # Records are named relative to the storage, the cache directory here
+    remove.assert_any_call(os.path.join(cache.config.cache_directory, '1.cache_record.json'))
 
     save_mock.assert_called_once()
-    pl.testing.assert_frame_equal(mock_data_1, save_mock.call_args[0][0])
+    assert_frame_equal(mock_data_1, save_mock.call_args[0][0])
 
 
 @patch('pybaseball.cache.config.enabled', True)
-@patch('glob.glob', MagicMock(return_value=[]))
 @patch('os.path.exists', MagicMock(return_value=False))
 def test_call_cache_gets_uncached_data(
-        mock_data_1: pl.DataFrame, load_mock: MagicMock,
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, load_mock: MagicMock,
         save_mock: MagicMock, save_json_mock: MagicMock) -> None:
     df_func = MagicMock(return_value=mock_data_1)
     df_func.__name__ = "df_func"  # type: ignore
@@ -145,7 +163,9 @@ def test_call_cache_gets_uncached_data(
     load_mock.assert_not_called()
 
     save_mock.assert_called_once()
-    pl.testing.assert_frame_equal(mock_data_1, save_mock.call_args[0][0])
+    assert_frame_equal(mock_data_1, save_mock.call_args[0][0])
+    index_mock.add.assert_called_once()
+    assert index_mock.add.call_args[0][1] == 'df_func'
 
 
 @patch('pybaseball.cache.config.enabled', True)
@@ -166,14 +186,14 @@ def test_call_cache_get_func_data_fails_silently(
 
     assert isinstance(result, pl.DataFrame)
 
-    pl.testing.assert_frame_equal(result, mock_data_1)
+    assert_frame_equal(result, mock_data_1)
     load_mock.assert_not_called()
     save_mock.assert_not_called()
 
 
 @patch('pybaseball.cache.config.enabled', True)
 def test_call_cache_load_fails_silently(
-        mock_data_1: pl.DataFrame, thrower: Callable,
+        mock_data_1: pl.DataFrame, thrower: Callable, index_mock: MagicMock,
         load_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
     assert cache.config.enabled
     df_func = MagicMock(return_value=mock_data_1)
@@ -182,19 +202,18 @@ def test_call_cache_load_fails_silently(
     df_cache = cache.cache.df_cache()
     assert df_cache.cache_config.enabled
 
-    with patch('glob.glob', thrower):
+    with patch.object(index_mock, 'get', thrower):
         wrapper = df_cache.__call__(df_func)
         result = wrapper(*(1, 2), **{'val1': 'a'})
 
     assert isinstance(result, pl.DataFrame)
 
-    pl.testing.assert_frame_equal(result, mock_data_1)
+    assert_frame_equal(result, mock_data_1)
     load_mock.assert_not_called()
     save_mock.assert_called_once()
 
 
 @patch('pybaseball.cache.config.enabled', True)
-@patch('glob.glob', MagicMock(return_value=['1.cache_record.json']))
 @patch('pybaseball.cache.file_utils.load_json', MagicMock(
     return_value={
         'expires': '3000-01-01',
@@ -205,8 +224,9 @@ def test_call_cache_load_fails_silently(
     }
 ))
 def test_call_cache_save_fails_silently(
-        mock_data_1: pl.DataFrame, thrower: Callable,
+        mock_data_1: pl.DataFrame, thrower: Callable, index_mock: MagicMock,
         empty_load_mock: MagicMock, save_mock: MagicMock) -> None:
+    index_mock.get.return_value = '1.cache_record.json'
     assert cache.config.enabled
 
     df_func = MagicMock(return_value=mock_data_1)
@@ -221,41 +241,496 @@ def test_call_cache_save_fails_silently(
 
     assert isinstance(result, pl.DataFrame)
 
-    pl.testing.assert_frame_equal(result, mock_data_1)
+    assert_frame_equal(result, mock_data_1)
     empty_load_mock.assert_called_once()
+    # The frame is written before its record, and the call is only indexed once both are saved
+    save_mock.assert_called_once()
+    index_mock.add.assert_not_called()
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.config.empty_expiration', 2)
+def test_call_cache_saves_empty_result_as_tombstone(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    empty = pl.DataFrame({'a': pl.Series([], dtype=pl.Int64)})
+    df_func = MagicMock(return_value=empty)
+    df_func.__name__ = "df_func_empty"
+
+    result = cache.df_cache(expires=365).__call__(df_func)(2019)
+
+    assert_frame_equal(result, empty)
+    # No frame file, just the record, which expires sooner than data would
     save_mock.assert_not_called()
+    record_data = save_json_mock.call_args[0][2]
+    assert 'dataframe' not in record_data
+    assert record_data['expires'] == str(date.today() + timedelta(days=2))
+    index_mock.add.assert_called_once()
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.file_utils.load_json', MagicMock(
+    return_value={
+        'expires': '3000-01-01',
+        'func': 'df_func_empty',
+        'args': [2019],
+        'kwargs': {},
+        'empty_schema': cache.dataframe_utils.serialize_schema(pl.DataFrame({'a': pl.Series([], dtype=pl.Int64)})),
+    }
+))
+def test_call_cache_loads_tombstone(index_mock: MagicMock, load_mock: MagicMock) -> None:
+    index_mock.get.return_value = '1.cache_record.json'
+    df_func = MagicMock()
+    df_func.__name__ = "df_func_empty"
+
+    result = cache.df_cache().__call__(df_func)(2019)
+
+    df_func.assert_not_called()
+    load_mock.assert_not_called()
+    assert result.is_empty()
+    assert result.schema == pl.Schema({'a': pl.Int64})
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@pytest.mark.parametrize("frame", [pl.DataFrame({'a': [1, 2]}), pl.DataFrame({'a': pl.Series([], dtype=pl.Int64)})])
+def test_call_cache_expiry_policy(
+        frame: pl.DataFrame, index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    def df_func(year: int) -> pl.DataFrame:
+        return frame
+
+    policy = MagicMock(expires=MagicMock(return_value=cache.expiry.NEVER))
+    with patch.dict(cache.expiry.POLICIES, {'test': policy}):
+        cache.df_cache(policy='test').__call__(df_func)(2019)
+
+    policy.expires.assert_called_once_with({'year': 2019})
+    # A completed season never expires, even when it's empty
+    assert save_json_mock.call_args[0][2]['expires'] == '9999-12-31'
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_call_cache_expiry_policy_without_opinion(
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    def df_func(team: str) -> pl.DataFrame:
+        return mock_data_1
+
+    cache.df_cache(expires=3, policy='bref').__call__(df_func)('BOS')
+
+    assert save_json_mock.call_args[0][2]['expires'] == str(date.today() + timedelta(days=3))
 
 
-def test_purge(remove: MagicMock) -> None:
-    glob_result = ['1.cache_record.json', '2.cache_record.json']
-    glob_mock = MagicMock(return_value=glob_result)
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.config.write_behind', True)
+def test_call_cache_write_behind(
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+    save_mock.side_effect = lambda *args: release.wait(5) and (100, 'sha256')
+    df_func = MagicMock(return_value=mock_data_1)
+    df_func.__name__ = "df_func_write_behind"
+    wrapper = cache.df_cache().__call__(df_func)
+    before = cache.write_stats()
+
+    # The call returns while its frame is still waiting to be written, and repeating it gets the queued frame
+    assert_frame_equal(wrapper(1), mock_data_1)
+    assert_frame_equal(wrapper(1), mock_data_1)
+    df_func.assert_called_once_with(1)
+    index_mock.add.assert_not_called()
+
+    release.set()
+    assert cache.drain_writes(5)
+    save_mock.assert_called_once()
+    index_mock.add.assert_called_once()
+    assert cache.write_stats()['writes'] - before['writes'] == 1
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.config.write_behind', True)
+def test_write_behind_holds_the_call_lock_until_written(
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+    save_mock.side_effect = lambda *args: release.wait(5) and (100, 'sha256')
+    unlock = MagicMock()
+    func_data = {'func': 'df_func_lock', 'args': [1], 'kwargs': {}}
+
+    with contextlib.ExitStack() as stack:
+        stack.callback(unlock)
+        cache.df_cache()._safe_save_func_cache(func_data, mock_data_1, date.today(), stack)
+    unlock.assert_not_called()
+
+    release.set()
+    assert cache.drain_writes(5)
+    unlock.assert_called_once()
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.file_utils.FileLock', MagicMock())
+@patch('pybaseball.cache.config.memory_max_bytes', 1024 * 1024)
+def test_call_cache_stats(
+        mock_data_1: pl.DataFrame, index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    df_func = MagicMock(return_value=mock_data_1)
+    df_func.__name__ = "df_func_stats"
+    events: List[Tuple[str, str, Dict[str, Any]]] = []
+    listener: Callable[..., None] = lambda *event: events.append(event)
+    cache.add_listener(listener)
+
+    try:
+        wrapper = cache.df_cache().__call__(df_func)
+        wrapper(1)
+        wrapper(1)
+    finally:
+        cache.remove_listener(listener)
+        cache.cache._memory.clear()  # pylint: disable=protected-access
+
+    stats = cache.stats()['df_func_stats']
+    assert (stats['hits'], stats['misses'], stats['saves'], stats['errors']) == (1, 1, 1, 0)
+    assert stats['fetch_seconds'] >= 0
+    assert [(event, func) for event, func, _ in events] == [
+        ('miss', 'df_func_stats'), ('save', 'df_func_stats'), ('hit', 'df_func_stats')
+    ]
+    assert events[-1][2]['tier'] == 'memory'
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.file_utils.FileLock', MagicMock())
+def test_call_cache_counts_and_logs_errors(
+        mock_data_1: pl.DataFrame, thrower: Callable, index_mock: MagicMock, save_mock: MagicMock,
+        caplog: pytest.LogCaptureFixture) -> None:
+    df_func = MagicMock(return_value=mock_data_1)
+    df_func.__name__ = "df_func_errors"
+
+    with patch.object(cache.cache_record.CacheRecord, 'save', thrower), \
+            caplog.at_level(logging.WARNING, logger='pybaseball.cache'):
+        assert_frame_equal(cache.df_cache().__call__(df_func)(1), mock_data_1)
+
+    assert cache.stats()['df_func_errors']['errors'] == 1
+    assert 'Cache save failed for df_func_errors' in caplog.text
+
+
+def test_purge(remove: MagicMock, index_mock: MagicMock) -> None:
+    index_result = ['1.cache_record.json', '2.cache_record.json']
+    index_mock.filenames.return_value = index_result
 
     mock_cache_record = {'expires': '3000-01-01', 'filename': 'df_cache.parquet'}
     mock_load_json = MagicMock(return_value=mock_cache_record)
 
-    with patch('glob.glob', glob_mock):
-        with patch('pybaseball.cache.file_utils.load_json', mock_load_json):
-            cache.purge()
+    with patch('pybaseball.cache.file_utils.load_json', mock_load_json):
+        cache.purge()
 
-    assert glob_mock.called_once()
-    assert mock_load_json.call_count == len(glob_result)
-    assert remove.call_count == len(glob_result)
+    index_mock.filenames.assert_called_once_with()
+    assert mock_load_json.call_count == len(index_result)
+    assert remove.call_count == len(index_result)
+    assert index_mock.remove.call_count == len(index_result)
 
 
-def test_flush(remove: MagicMock) -> None:
-    glob_result = ['1.cache_record.json', '2.cache_record.json']
-    glob_mock = MagicMock(return_value=glob_result)
+def test_flush(remove: MagicMock, index_mock: MagicMock) -> None:
+    index_result = ['1.cache_record.json']
+    index_mock.filenames.return_value = index_result
 
     mock_cache_records = [
         {'expires': '2000-01-01', 'filename': 'df_cache.parquet'},
-        {'expires': '3000-01-01', 'filename': 'df_cache2.parquet'},
     ]
     mock_load_json = MagicMock(side_effect=mock_cache_records)
 
-    with patch('glob.glob', glob_mock):
-        with patch('pybaseball.cache.file_utils.load_json', mock_load_json):
-            cache.flush()
+    with patch('pybaseball.cache.file_utils.load_json', mock_load_json):
+        cache.flush()
 
-    assert glob_mock.called_once()
-    assert mock_load_json.call_count == len(glob_result)
+    index_mock.filenames.assert_called_once_with(expired_before=date.today())
+    assert mock_load_json.call_count == len(index_result)
     remove.assert_called_once()
+    index_mock.remove.assert_called_once_with('1.cache_record.json')
+
+
+def test_evict(remove: MagicMock, index_mock: MagicMock) -> None:
+    index_mock.usage.return_value = {'entries': 2, 'bytes': 1000, 'pinned_entries': 0, 'pinned_bytes': 0}
+    index_mock.lru_records.return_value = [('1.cache_record.json', 500, 1.0), ('2.cache_record.json', 500, 4.0)]
+    days = [statcast_store.StoredDay('statcast/all', '2019-04-01', 300, 2.0),
+            statcast_store.StoredDay('statcast/all', '2019-04-02', 300, 3.0)]
+    remove_days = MagicMock()
+
+    with patch('pybaseball.cache.config.max_bytes', 1000), patch('pybaseball.cache.config.max_entries', None):
+        with patch('pybaseball.cache.file_utils.load_json', MagicMock(return_value={'expires': '3000-01-01'})), \
+                patch('pybaseball.cache.statcast_store.stored_days', MagicMock(return_value=days)), \
+                patch('pybaseball.cache.statcast_store.remove_days', remove_days):
+            cache.evict()
+
+    # 600 bytes over, taken from whatever was used least recently: a record, then a Statcast day
+    index_mock.remove.assert_called_once_with('1.cache_record.json')
+    remove_days.assert_called_once_with(ANY, cache.config.cache_directory, 'statcast/all', ['2019-04-01'])
+
+
+def test_evict_within_budget(index_mock: MagicMock) -> None:
+    index_mock.usage.return_value = {'entries': 2, 'bytes': 200, 'pinned_entries': 0, 'pinned_bytes': 0}
+
+    with patch('pybaseball.cache.config.max_bytes', 1000), patch('pybaseball.cache.config.max_entries', 3), \
+            patch('pybaseball.cache.statcast_store.stored_days',
+                  MagicMock(return_value=[statcast_store.StoredDay('statcast/all', '2019-04-01', 300, 2.0)])):
+        cache.evict()
+
+    index_mock.lru_records.assert_not_called()
+
+
+def test_usage(index_mock: MagicMock) -> None:
+    index_mock.usage.return_value = {'entries': 2, 'bytes': 200, 'pinned_entries': 1, 'pinned_bytes': 100}
+    days = [statcast_store.StoredDay('statcast/all', '2019-04-01', 50, 1.0)]
+
+    with patch('pybaseball.cache.config.max_bytes', 1000), patch('pybaseball.cache.config.max_entries', None):
+        with patch('pybaseball.cache.statcast_store.stored_days', MagicMock(return_value=days)), \
+                patch('pybaseball.cache.file_utils.lock_filenames', MagicMock(return_value=['a.lock'])):
+            report = cache.usage()
+
+    assert report == {
+        'entries': 2, 'bytes': 200, 'pinned_entries': 1, 'pinned_bytes': 100,
+        'max_bytes': 1000, 'max_entries': None, 'statcast_days': 1, 'statcast_bytes': 50, 'lock_files': 1,
+    }
+
+
+def test_pin(index_mock: MagicMock) -> None:
+    def df_func(season: int) -> pl.DataFrame:
+        return pl.DataFrame()
+
+    cache.pin(df_func, 2019)
+    cache.unpin(df_func, 2019)
+
+    key = cache.cache_index.record_key({'func': 'df_func', 'args': [], 'kwargs': {'season': 2019}})
+    assert index_mock.pin.call_args_list[0][0] == (key,)
+    assert index_mock.pin.call_args_list[1] == ((key,), {'pinned': False})
+
+
+def test_func_data_is_canonical() -> None:
+    def df_func(start_season: int, end_season: Optional[int] = None, day: Optional[date] = None) -> pl.DataFrame:
+        return pl.DataFrame()
+
+    def _default_end_season(arguments: Dict[str, Any]) -> None:
+        arguments['end_season'] = arguments['end_season'] or arguments['start_season']
+
+    calls = [((2023,), {}), ((), {'start_season': 2023}), ((2023,), {'end_season': 2023})]
+    keys = {
+        cache.cache_index.record_key(cache.cache._func_data(df_func, args, kwargs, _default_end_season))
+        for args, kwargs in calls
+    }
+    assert len(keys) == 1
+
+    by_date = cache.cache._func_data(df_func, (2023,), {'day': date(2023, 4, 1)})
+    by_string = cache.cache._func_data(df_func, (2023, None, '2023-04-01'), {})
+    assert by_date == by_string == {
+        'func': 'df_func', 'args': [], 'kwargs': {'start_season': 2023, 'end_season': None, 'day': '2023-04-01'}
+    }
+
+
+def test_func_data_leaves_out_table_self() -> None:
+    class Table(abc.ABC):
+        def fetch(self, season: int) -> pl.DataFrame:
+            return pl.DataFrame()
+
+    func_data = cache.cache._func_data(Table.fetch, (Table(), 2019), {})
+
+    assert func_data == {'func': 'fetch', 'args': [], 'kwargs': {'season': 2019}}
+
+
+def test_func_data_call_not_matching_signature() -> None:
+    def df_func(season: int) -> pl.DataFrame:
+        return pl.DataFrame()
+
+    assert cache.cache._func_data(df_func, (2019, 2020), {}) == {'func': 'df_func', 'args': [2019, 2020], 'kwargs': {}}
+
+
+def test_memory_tier_lru() -> None:
+    memory = cache.cache._MemoryTier()  # pylint: disable=protected-access
+    frame = pl.DataFrame({'a': list(range(100))})
+    size = int(frame.estimated_size())
+    expires = date.today() + timedelta(days=1)
+
+    memory.put('first', frame, expires, size * 2)
+    memory.put('second', frame, expires, size * 2)
+    assert memory.get('first') is not None
+    memory.put('third', frame, expires, size * 2)
+
+    assert memory.get('second') is None
+    assert memory.get('first') is not None
+    assert memory.get('third') is not None
+    assert memory.usage() == {'entries': 2, 'bytes': size * 2}
+
+
+def test_memory_tier_skips_expired_and_oversized() -> None:
+    memory = cache.cache._MemoryTier()  # pylint: disable=protected-access
+    frame = pl.DataFrame({'a': list(range(100))})
+
+    size = int(frame.estimated_size())
+
+    memory.put('expired', frame, date.today() - timedelta(days=1), size)
+    memory.put('oversized', frame, date.today(), size - 1)
+    memory.put('disabled', frame, date.today(), None)
+
+    assert memory.get('expired') is None
+    assert memory.get('oversized') is None
+    assert memory.get('disabled') is None
+
+
+def test_memory_tier_returns_copies() -> None:
+    memory = cache.cache._MemoryTier()  # pylint: disable=protected-access
+    frame = pl.DataFrame({'a': [1, 2]})
+    memory.put('key', frame, date.today(), 1024)
+
+    memory.get('key').insert_column(1, pl.Series('b', [3, 4]))  # type: ignore
+
+    assert memory.get('key').columns == ['a']  # type: ignore
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.config.memory_max_bytes', 1024 * 1024)
+def test_call_cache_memory_tier_hit(index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    df_func = MagicMock(return_value=pl.DataFrame({'a': [1, 2]}))
+    df_func.__name__ = "df_func_memory"
+    before = cache.tier_stats()
+
+    wrapper = cache.df_cache().__call__(df_func)
+    first = wrapper(1)
+    second = wrapper(1)
+
+    df_func.assert_called_once_with(1)
+    index_mock.get.assert_called()
+    assert index_mock.get.call_count == 2  # the disk lookup on the first call and the stale check on its save
+    assert first.equals(second)
+
+    after = cache.tier_stats()
+    assert after['memory']['hits'] - before['memory']['hits'] == 1
+    assert after['memory']['misses'] - before['memory']['misses'] == 1
+    assert after['disk']['misses'] - before['disk']['misses'] == 1
+    index_mock.touch.assert_not_called()  # the save has just marked it used
+    cache.cache._memory.clear()  # pylint: disable=protected-access
+
+
+@patch('pybaseball.cache.config.enabled', True)
+@patch('pybaseball.cache.config.memory_max_bytes', 1024 * 1024)
+@patch('pybaseball.cache.cache._MemoryTier.TOUCH_INTERVAL', 0.0)
+def test_call_cache_memory_tier_hit_touches_index(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    df_func = MagicMock(return_value=pl.DataFrame({'a': [1, 2]}))
+    df_func.__name__ = "df_func_memory_touch"
+
+    wrapper = cache.df_cache().__call__(df_func)
+    wrapper(1)
+    wrapper(1)
+
+    key = cache.cache_index.record_key({'func': 'df_func_memory_touch', 'args': [1], 'kwargs': {}})
+    index_mock.touch.assert_called_once_with(key)
+    cache.cache._memory.clear()  # pylint: disable=protected-access
+
+
+def _call_concurrently(wrapper: Callable, calls: int, release: threading.Event, coalesced_before: int) -> list:
+    results: list = [None] * calls
+
+    def _call(i: int) -> None:
+        try:
+            results[i] = wrapper(1)
+        except BaseException as ex:  # pylint: disable=broad-except
+            results[i] = ex
+
+    threads = [threading.Thread(target=_call, args=(i,)) for i in range(calls)]
+    for thread in threads:
+        thread.start()
+    # Hold the first call in flight until every other one is waiting on it
+    deadline = time.monotonic() + 5
+    while cache.coalesced_calls() - coalesced_before < calls - 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_call_cache_coalesces_concurrent_calls(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+
+    def df_func(_: int) -> pl.DataFrame:
+        release.wait(5)
+        return pl.DataFrame({'a': [1, 2]})
+
+    df_func_mock = MagicMock(side_effect=df_func)
+    df_func_mock.__name__ = "df_func_coalesced"
+    before = cache.coalesced_calls()
+
+    results = _call_concurrently(cache.df_cache().__call__(df_func_mock), 5, release, before)
+
+    df_func_mock.assert_called_once_with(1)
+    save_mock.assert_called_once()
+    assert cache.coalesced_calls() - before == 4
+    assert all(result.equals(pl.DataFrame({'a': [1, 2]})) for result in results)
+    assert len({id(result) for result in results}) == 5  # each caller gets its own copy
+    assert not cache.cache._flights  # pylint: disable=protected-access
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_call_cache_coalesced_calls_share_errors(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+
+    def df_func(_: int) -> pl.DataFrame:
+        release.wait(5)
+        raise ValueError('fetch failed')
+
+    df_func_mock = MagicMock(side_effect=df_func)
+    df_func_mock.__name__ = "df_func_coalesced_error"
+    before = cache.coalesced_calls()
+
+    results = _call_concurrently(cache.df_cache().__call__(df_func_mock), 3, release, before)
+
+    df_func_mock.assert_called_once_with(1)
+    save_mock.assert_not_called()
+    assert all(isinstance(result, ValueError) for result in results)
+    # The waiting calls each raise their own error, chained to the one the first call raised
+    first = next(result for result in results if result.__cause__ is None)
+    assert all(result.__cause__ is first for result in results if result is not first)
+    assert not cache.cache._flights  # pylint: disable=protected-access
+
+
+class _FetchError(Exception):
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f'{url} returned {status}')
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_call_cache_coalesced_calls_chain_errors_they_cannot_copy(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+
+    def df_func(_: int) -> pl.DataFrame:
+        release.wait(5)
+        raise _FetchError('https://example.com', 500)
+
+    df_func_mock = MagicMock(side_effect=df_func)
+    df_func_mock.__name__ = "df_func_coalesced_uncopyable"
+
+    results = _call_concurrently(cache.df_cache().__call__(df_func_mock), 3, release, cache.coalesced_calls())
+
+    first = next(result for result in results if isinstance(result, _FetchError))
+    assert all(isinstance(result, RuntimeError) and result.__cause__ is first for result in results
+               if result is not first)
+
+
+class _Interrupted(BaseException):
+    pass
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_call_cache_coalesced_calls_retry_an_interrupted_call(
+        index_mock: MagicMock, save_mock: MagicMock, save_json_mock: MagicMock) -> None:
+    release = threading.Event()
+
+    def df_func(_: int) -> pl.DataFrame:
+        if df_func_mock.call_count == 1:
+            release.wait(5)
+            raise _Interrupted()
+        return pl.DataFrame({'a': [1, 2]})
+
+    df_func_mock = MagicMock(side_effect=df_func)
+    df_func_mock.__name__ = "df_func_coalesced_interrupted"
+
+    results = _call_concurrently(cache.df_cache().__call__(df_func_mock), 3, release, cache.coalesced_calls())
+
+    # The waiting calls make it again (together, unless one has already finished by the time the other wakes)
+    assert df_func_mock.call_count in (2, 3)
+    assert sum(isinstance(result, _Interrupted) for result in results) == 1
+    assert sum(isinstance(result, pl.DataFrame) and result.equals(pl.DataFrame({'a': [1, 2]}))
+               for result in results) == 2
+    assert not cache.cache._flights  # pylint: disable=protected-access
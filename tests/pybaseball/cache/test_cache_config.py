@@ -54,6 +54,23 @@ def test_expiration_set() -> None:
     assert config.default_expiration == my_expiration
 
 
+def test_empty_expiration() -> None:
+    assert cache.CacheConfig().empty_expiration == cache.CacheConfig.DEFAULT_EMPTY_EXPIRATION
+    assert cache.CacheConfig(empty_expiration=0).empty_expiration == 0
+    with pytest.raises(ValueError):
+        cache.CacheConfig(empty_expiration=-1)
+
+
+def test_storage() -> None:
+    assert cache.CacheConfig().storage_type == 'local'
+    assert cache.CacheConfig(storage_type='Shared', storage_location='/mnt/cache').storage_type == 'shared'
+    with pytest.raises(ValueError):
+        cache.CacheConfig(storage_type='ftp')
+    with pytest.raises(ValueError):
+        cache.CacheConfig(storage_type='http')
+    cache.CacheConfig()
+
+
 def test_cache_type_default() -> None:
     config = cache.CacheConfig()
     assert config.cache_type == cache.CacheConfig.DEFAULT_CACHE_TYPE
@@ -107,3 +124,68 @@ def test_autoload_cache() -> None:
     assert not cache.config.enabled
     assert cache.config.default_expiration == 363
     assert cache.config.cache_type == 'csv'
+
+
+def test_budget_default() -> None:
+    config = cache.CacheConfig()
+    assert config.max_bytes is None
+    assert config.max_entries is None
+
+
+def test_budget_invalid() -> None:
+    with pytest.raises(ValueError):
+        cache.CacheConfig(max_bytes=-1)
+
+
+@pytest.mark.parametrize("cache_type", ['arrow', 'feather', 'Arrow'])
+def test_cache_type_ipc(cache_type: str) -> None:
+    config = cache.CacheConfig(cache_type=cache_type)
+    assert config.cache_type == cache_type.lower()
+
+
+def test_parquet_options_default() -> None:
+    config = cache.CacheConfig()
+    assert config.parquet_options() == {'compression': 'zstd', 'statistics': True}
+
+
+def test_parquet_options_set() -> None:
+    config = cache.CacheConfig(parquet_compression='ZSTD', parquet_compression_level=9, parquet_row_group_size=1000)
+    assert config.parquet_options() == {
+        'compression': 'zstd', 'statistics': True, 'compression_level': 9, 'row_group_size': 1000
+    }
+    assert cache.CacheConfig(parquet_compression='none').parquet_compression == 'uncompressed'
+
+
+@pytest.mark.parametrize("options", [
+    {'parquet_compression': 'gzip2'},
+    {'parquet_compression': 'zstd', 'parquet_compression_level': 23},
+    {'parquet_row_group_size': 0},
+])
+def test_parquet_options_invalid(options: dict) -> None:
+    with pytest.raises(ValueError):
+        cache.CacheConfig(**options)
+
+
+def test_parquet_options_validated_on_assignment() -> None:
+    config = cache.CacheConfig()
+
+    config.parquet_compression = 'None'
+    assert config.parquet_compression == 'uncompressed'
+
+    for name, value in (('parquet_compression', 'gzip2'), ('parquet_compression_level', 0),
+                        ('parquet_row_group_size', 0)):
+        with pytest.raises(ValueError):
+            setattr(config, name, value)
+    assert config.parquet_options() == {'compression': 'uncompressed', 'statistics': True}
+
+
+def test_parquet_compression_level_only_applies_to_zstd() -> None:
+    config = cache.CacheConfig(parquet_compression='zstd', parquet_compression_level=9)
+
+    config.parquet_compression = 'lz4'
+    assert config.parquet_options() == {'compression': 'lz4', 'statistics': True}
+    # A saved config like this one still loads
+    assert cache.CacheConfig(parquet_compression='lz4', parquet_compression_level=9).parquet_compression == 'lz4'
+
+    config.parquet_compression = 'zstd'
+    assert config.parquet_options() == {'compression': 'zstd', 'statistics': True, 'compression_level': 9}
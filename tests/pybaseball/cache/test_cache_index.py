@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import date
+from typing import Generator
+
+import pytest
+
+from pybaseball.cache import cache_index
+
+
+@pytest.fixture(name='index_dir')
+def _index_dir() -> Generator[str, None, None]:
+    with tempfile.TemporaryDirectory() as directory:
+        yield directory
+
+
+def test_record_key_ignores_record_metadata() -> None:
+    func_data = {'func': '_test_func', 'args': [1, 2, 3], 'kwargs': {'named_param': True}}
+    saved_data = dict(func_data, expires='3000-01-01', dataframe='file.parquet')
+
+    assert cache_index.record_key(func_data) == cache_index.record_key(saved_data)
+
+
+def test_record_key_kwarg_order_insensitive() -> None:
+    first = {'func': '_test_func', 'args': [], 'kwargs': {'a': 1, 'b': 2}}
+    second = {'func': '_test_func', 'args': [], 'kwargs': {'b': 2, 'a': 1}}
+
+    assert cache_index.record_key(first) == cache_index.record_key(second)
+
+
+def test_record_key_differs_by_args() -> None:
+    first = {'func': '_test_func', 'args': [1], 'kwargs': {}}
+    second = {'func': '_test_func', 'args': [2], 'kwargs': {}}
+
+    assert cache_index.record_key(first) != cache_index.record_key(second)
+
+
+def test_add_get_remove(index_dir: str) -> None:
+    index = cache_index.CacheIndex(index_dir)
+
+    index.add('key1', '_test_func', 'record1.cache_record.json', '3000-01-01')
+
+    assert index.get('key1') == 'record1.cache_record.json'
+    assert index.get('key2') is None
+
+    index.remove('record1.cache_record.json')
+
+    assert index.get('key1') is None
+
+
+def test_filenames_expired_before(index_dir: str) -> None:
+    index = cache_index.CacheIndex(index_dir)
+
+    index.add('key1', '_test_func', 'old.cache_record.json', '2000-01-01')
+    index.add('key2', '_test_func', 'new.cache_record.json', '3000-01-01')
+
+    assert sorted(index.filenames()) == ['new.cache_record.json', 'old.cache_record.json']
+    assert index.filenames(expired_before=date.today()) == ['old.cache_record.json']
+
+
+def test_migrates_existing_records(index_dir: str) -> None:
+    func_data = {'func': '_test_func', 'args': [1], 'kwargs': {}, 'expires': '3000-01-01', 'dataframe': 'x.parquet'}
+    record_file = os.path.join(index_dir, '_test_func1.cache_record.json')
+    with open(record_file, 'w') as json_file:
+        json.dump(func_data, json_file)
+
+    with open(os.path.join(index_dir, 'broken.cache_record.json'), 'w') as json_file:
+        json_file.write('{not json')
+
+    index = cache_index.CacheIndex(index_dir)
+
+    # Named relative to the cache directory
+    assert index.get(cache_index.record_key(func_data)) == '_test_func1.cache_record.json'
+    assert index.filenames() == ['_test_func1.cache_record.json']
+
+
+def test_lru_filenames_oldest_first(index_dir: str) -> None:
+    index = cache_index.CacheIndex(index_dir)
+    index.add('key1', '_test_func', 'first.cache_record.json', '3000-01-01', size=100)
+    index.add('key2', '_test_func', 'second.cache_record.json', '3000-01-01', size=100)
+    index.add('key3', '_test_func', 'third.cache_record.json', '3000-01-01', size=100)
+    index.touch('key1')
+
+    assert index.lru_filenames() == []
+    assert index.lru_filenames(max_bytes=300) == []
+    assert index.lru_filenames(max_bytes=150) == ['second.cache_record.json', 'third.cache_record.json']
+    assert index.lru_filenames(max_entries=2) == ['second.cache_record.json']
+
+
+def test_lru_filenames_skips_pinned(index_dir: str) -> None:
+    index = cache_index.CacheIndex(index_dir)
+    index.pin('key1')
+    index.add('key1', '_test_func', 'pinned.cache_record.json', '3000-01-01', size=100)
+    index.add('key2', '_test_func', 'unpinned.cache_record.json', '3000-01-01', size=100)
+
+    assert index.lru_filenames(max_entries=0) == ['unpinned.cache_record.json']
+    assert index.usage() == {'entries': 2, 'bytes': 200, 'pinned_entries': 1, 'pinned_bytes': 100}
+
+    index.pin('key1', pinned=False)
+
+    assert index.lru_filenames(max_entries=0) == ['pinned.cache_record.json', 'unpinned.cache_record.json']
+
+
+def test_adds_eviction_columns_to_old_index(index_dir: str) -> None:
+    with closing(sqlite3.connect(os.path.join(index_dir, cache_index.INDEX_FILENAME))) as conn, conn:
+        conn.execute('CREATE TABLE records (key TEXT PRIMARY KEY, func TEXT NOT NULL, '
+                     'filename TEXT NOT NULL, expires TEXT NOT NULL)')
+
+    index = cache_index.CacheIndex(index_dir)
+    index.add('key1', '_test_func', 'record1.cache_record.json', '3000-01-01', size=10)
+
+    assert index.usage()['bytes'] == 10
@@ -1,5 +1,9 @@
 import copy
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
 
+import polars as pl
+from polars.testing import assert_frame_equal
 import pytest
 from pybaseball.cache import cache_record
 
@@ -38,3 +42,18 @@ def test_supports_extra_attribute_ignored() -> None:
     bad_func_data['extra'] = {'extra_data': True}
 
     assert record.supports(bad_func_data)
+
+
+def test_empty_frame_saved_as_tombstone() -> None:
+    func_data = {'func': '_test_func', 'args': [2019], 'kwargs': {}}
+    empty = pl.DataFrame({'a': pl.Series([], dtype=pl.Int32), 'b': pl.Series([], dtype=pl.Date)})
+
+    record = cache_record.CacheRecord(data=func_data, expires=1)
+    with patch('pybaseball.cache.dataframe_utils.save_df', MagicMock()) as save_df:
+        record.save_df(empty)
+
+    save_df.assert_not_called()
+    assert record.empty
+    assert 'dataframe' not in record.data
+    assert record.expiration_date == date.today() + timedelta(days=1)
+    assert_frame_equal(record.load_df(), empty)
@@ -1,3 +1,7 @@
+import os
+import sys
+import tempfile
+from datetime import date
 from unittest.mock import MagicMock
 
 import polars as pl
@@ -8,17 +12,18 @@ from pybaseball import cache
 
 @pytest.fixture(name="mock_data_1")
 def _mock_data_1() -> pl.DataFrame:
-    return pl.DataFrame([1, 2], columns=['a'])
+    return pl.DataFrame({'a': [1, 2]})
 
 @pytest.mark.parametrize(
     "cache_type, method", [
         ('csv', 'read_csv'),
         ('parquet', 'read_parquet'),
+        ('feather', 'read_ipc'),
     ]
 )
 def test_load(monkeypatch: MonkeyPatch, cache_type: str, method: str) -> None:
     read_mock = MagicMock()
-    monkeypatch.setattr(pd, method, read_mock)
+    monkeypatch.setattr(pl, method, read_mock)
     monkeypatch.setattr(cache.config, 'cache_type', cache_type)
 
     test_filename = f'test.{cache_type}'
@@ -35,19 +40,63 @@ def test_load_invalid_cache_type() -> None:
 
 @pytest.mark.parametrize(
     "cache_type, method", [
-        ('csv', 'to_csv'),
-        ('parquet', 'to_parquet'),
+        ('csv', 'write_csv'),
+        ('parquet', 'write_parquet'),
+        ('arrow', 'write_ipc'),
+        ('feather', 'write_ipc'),
     ]
 )
 def test_save(monkeypatch: MonkeyPatch, mock_data_1: pl.DataFrame, cache_type: str, method: str) -> None:
     to_method = MagicMock()
     monkeypatch.setattr(mock_data_1, method, to_method)
 
-    test_filename = f'test.{cache_type}'
+    with tempfile.TemporaryDirectory() as directory:
+        test_filename = os.path.join(directory, f'test.{cache_type}')
+
+        cache.dataframe_utils.save_df(mock_data_1, test_filename)
+
+        # Written to a temporary file in the same directory, then renamed into place
+        temp_filename = to_method.call_args[0][0]
+        assert os.path.dirname(temp_filename) == directory
+        assert temp_filename != test_filename
+        assert os.path.exists(test_filename)
+
+
+@pytest.mark.parametrize("cache_type", ['csv', 'parquet', 'arrow', 'feather'])
+def test_round_trip(cache_type: str) -> None:
+    data = pl.DataFrame({'a': [1, 2], 'b': ['x', None], 'game_date': [date(2019, 4, 1), date(2019, 4, 2)]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        test_filename = os.path.join(directory, f'test.{cache_type}')
+        cache.dataframe_utils.save_df(data, test_filename)
+
+        assert cache.dataframe_utils.load_df(test_filename).equals(data)
+
+
+def _mapped_from(filename: str, address: int) -> bool:
+    with open('/proc/self/maps') as maps:
+        for line in maps:
+            fields = line.split()
+            if len(fields) >= 6 and fields[5] == filename:
+                start, end = (int(bound, 16) for bound in fields[0].split('-'))
+                if start <= address < end:
+                    return True
+    return False
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads the mappings from /proc/self/maps')
+def test_load_arrow_maps_the_file() -> None:
+    data = pl.DataFrame({'release_speed': [float(speed) for speed in range(100_000)]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        test_filename = os.path.realpath(os.path.join(directory, 'test.arrow'))
+        cache.dataframe_utils.save_df(data, test_filename)
 
-    cache.dataframe_utils.save_df(mock_data_1, test_filename)
+        loaded = cache.dataframe_utils.load_df(test_filename)
 
-    assert to_method.called_once_with(test_filename)
+        # The column's values are the file's own pages, not a copy read into memory
+        assert _mapped_from(test_filename, loaded['release_speed']._s.as_single_ptr())
+        assert loaded.equals(data)
 
 
 def test_save_invalid_cache_type(mock_data_1: pl.DataFrame) -> None:
@@ -55,3 +104,46 @@ def test_save_invalid_cache_type(mock_data_1: pl.DataFrame) -> None:
 
     with pytest.raises(ValueError):
         cache.dataframe_utils.save_df(mock_data_1, test_filename)
+
+
+def test_save_parquet_options(monkeypatch: MonkeyPatch, mock_data_1: pl.DataFrame) -> None:
+    write_parquet = MagicMock()
+    monkeypatch.setattr(mock_data_1, 'write_parquet', write_parquet)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache.dataframe_utils.save_df(mock_data_1, os.path.join(directory, 'test.parquet'),
+                                      {'compression': 'lz4', 'row_group_size': 10})
+
+    assert write_parquet.call_args[1] == {'compression': 'lz4', 'row_group_size': 10}
+
+
+def test_save_failure_leaves_nothing_behind(monkeypatch: MonkeyPatch, mock_data_1: pl.DataFrame) -> None:
+    monkeypatch.setattr(mock_data_1, 'write_parquet', MagicMock(side_effect=IOError('disk full')))
+    # The failed write's temporary file has to really be removed
+    monkeypatch.setattr(os, 'remove', os.unlink)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with pytest.raises(IOError):
+            cache.dataframe_utils.save_df(mock_data_1, os.path.join(directory, 'test.parquet'))
+
+        assert os.listdir(directory) == []
+
+
+@pytest.mark.parametrize("cache_type", ['parquet', 'arrow', 'feather'])
+def test_load_checks_frame(mock_data_1: pl.DataFrame, cache_type: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        test_filename = os.path.join(directory, f'test.{cache_type}')
+        size, sha256 = cache.dataframe_utils.save_df(mock_data_1, test_filename)
+
+        assert size == os.path.getsize(test_filename)
+        cache.dataframe_utils.check_frame(test_filename, size=size, sha256=sha256)
+        with pytest.raises(cache.dataframe_utils.CorruptFrameError):
+            cache.dataframe_utils.check_frame(test_filename, size=size, sha256='0' * 64)
+
+        # Cut short, as by a process killed mid-write
+        with open(test_filename, 'r+b') as file:
+            file.truncate(size - 1)
+        with pytest.raises(cache.dataframe_utils.CorruptFrameError):
+            cache.dataframe_utils.load_df(test_filename, size=size)
+        with pytest.raises(cache.dataframe_utils.CorruptFrameError):
+            cache.dataframe_utils.check_frame(test_filename)
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from pybaseball.cache import expiry
+
+
+class _July2023(date):
+    @classmethod
+    def today(cls) -> Any:
+        return cls(2023, 7, 1)
+
+
+@pytest.mark.parametrize(
+    "expires", [date(2019, 4, 1), datetime(2019, 4, 1, 10, tzinfo=timezone.utc), expiry.NEVER]
+)
+def test_serialize_round_trip(expires: expiry.Expiry) -> None:
+    assert expiry.parse(expiry.serialize(expires)) == expires
+
+
+def test_expired() -> None:
+    now = datetime.now(timezone.utc)
+
+    assert expiry.expired(date.today() - timedelta(days=1))
+    assert not expiry.expired(date.today())
+    assert expiry.expired(now - timedelta(minutes=1))
+    assert not expiry.expired(now + timedelta(minutes=1))
+    assert not expiry.expired(expiry.NEVER)
+
+
+@pytest.mark.parametrize(
+    "now, refresh", [
+        # 8am and 5am EDT
+        (datetime(2023, 7, 1, 12, tzinfo=timezone.utc), datetime(2023, 7, 2, 10, tzinfo=timezone.utc)),
+        (datetime(2023, 7, 1, 9, tzinfo=timezone.utc), datetime(2023, 7, 1, 10, tzinfo=timezone.utc)),
+        # 7am EST
+        (datetime(2023, 1, 10, 12, tzinfo=timezone.utc), datetime(2023, 1, 11, 11, tzinfo=timezone.utc)),
+        # 7am EST, the day before daylight saving time starts
+        (datetime(2023, 3, 11, 12, tzinfo=timezone.utc), datetime(2023, 3, 12, 10, tzinfo=timezone.utc)),
+    ]
+)
+def test_next_refresh(now: datetime, refresh: datetime) -> None:
+    assert expiry.next_refresh(now) == refresh
+
+
+def test_last_completed_season() -> None:
+    assert expiry.last_completed_season(date(2023, 7, 1)) == 2022
+    assert expiry.last_completed_season(date(2023, 12, 1)) == 2023
+
+
+@pytest.mark.parametrize(
+    "arguments, expected", [
+        ({'year': 2022}, expiry.NEVER),
+        ({'start_season': 2019, 'end_season': None}, expiry.NEVER),
+        ({'start_dt': '2022-04-01', 'end_dt': '2022-04-30'}, expiry.NEVER),
+        ({'start_dt': '2023-06-01', 'end_dt': '2023-06-30'}, date(2023, 7, 2)),
+        ({'team': 'BOS'}, None),
+    ]
+)
+def test_seasonal_expiry(monkeypatch: MonkeyPatch, arguments: dict, expected: Any) -> None:
+    monkeypatch.setattr(expiry, 'date', _July2023)
+
+    assert expiry.SeasonalExpiry(days=1).expires(arguments) == expected
+
+
+@pytest.mark.parametrize(
+    "arguments", [{'year': 2023}, {'season': None}, {'start_dt': '2023-06-01', 'end_dt': '2023-07-01'}]
+)
+def test_seasonal_expiry_current(monkeypatch: MonkeyPatch, arguments: dict) -> None:
+    monkeypatch.setattr(expiry, 'date', _July2023)
+    monkeypatch.setattr(expiry, 'next_refresh', lambda: datetime(2023, 7, 2, 10, tzinfo=timezone.utc))
+
+    assert expiry.SeasonalExpiry().expires(arguments) == datetime(2023, 7, 2, 10, tzinfo=timezone.utc)
+
+
+def test_set_policy(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(expiry, 'POLICIES', dict(expiry.POLICIES))
+    policy = expiry.FixedExpiry(30)
+
+    expiry.set_policy('fangraphs', policy)
+
+    assert expiry.get_policy('fangraphs') is policy
+    with pytest.raises(ValueError):
+        expiry.get_policy('unknown')
+
+
+def test_policy_must_implement_expires() -> None:
+    class _Incomplete(expiry.ExpiryPolicy):  # pylint: disable=abstract-method
+        pass
+
+    with pytest.raises(TypeError):
+        _Incomplete()  # type: ignore
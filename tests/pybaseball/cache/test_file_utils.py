@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import polars as pl
+import pytest
+
+from pybaseball import cache
+from pybaseball.cache import file_utils
+
+
+def test_atomic_path(directory: str) -> None:
+    filename = os.path.join(directory, 'data.json')
+    with open(filename, 'w') as old_file:
+        old_file.write('old')
+
+    with file_utils.atomic_path(filename) as temp_filename:
+        with open(temp_filename, 'w') as new_file:
+            new_file.write('new')
+        with open(filename) as current_file:
+            assert current_file.read() == 'old'
+
+    with open(filename) as current_file:
+        assert current_file.read() == 'new'
+    assert os.listdir(directory) == ['data.json']
+
+
+def test_atomic_path_failure(directory: str) -> None:
+    filename = os.path.join(directory, 'data.json')
+
+    with pytest.raises(RuntimeError):
+        with file_utils.atomic_path(filename) as temp_filename:
+            with open(temp_filename, 'w') as new_file:
+                new_file.write('partial')
+            raise RuntimeError()
+
+    assert os.listdir(directory) == []
+
+
+def _increment(counter_filename: str) -> None:
+    with file_utils.FileLock(file_utils.lock_filename(os.path.dirname(counter_filename), 'counter')):
+        with open(counter_filename) as counter_file:
+            count = int(counter_file.read())
+        time.sleep(0.05)
+        with open(counter_filename, 'w') as counter_file:
+            counter_file.write(str(count + 1))
+
+
+# Children are spawned rather than forked: forking a process that already runs threads (e.g. polars' pool) can
+# deadlock the child. So they only get what's passed to them, and need module level targets.
+def test_file_lock_across_processes(directory: str) -> None:
+    counter_filename = os.path.join(directory, 'counter')
+    with open(counter_filename, 'w') as counter_file:
+        counter_file.write('0')
+
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_increment, args=(counter_filename,)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(counter_filename) as counter_file:
+        assert counter_file.read() == '4'
+    assert file_utils.lock_filenames(directory) == []
+
+
+@cache.df_cache()
+def _slow_fetch(season: int, fetch_log: str) -> pl.DataFrame:
+    with open(fetch_log, 'a') as log:
+        log.write(f'{os.getpid()}\n')
+    time.sleep(0.2)
+    return pl.DataFrame({'season': [season] * 100})
+
+
+def _warm(directory: str, fetch_log: str) -> None:
+    cache.config.enabled = True
+    cache.config.cache_directory = directory
+    cache.config.cache_type = 'parquet'
+    assert len(_slow_fetch(2019, fetch_log)) == 100
+
+
+def test_processes_warm_shared_cache_once(directory: str) -> None:
+    fetch_log = os.path.join(directory, 'fetches.log')
+
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_warm, args=(directory, fetch_log)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert all(process.exitcode == 0 for process in processes)
+    with open(fetch_log) as log:
+        assert len(log.readlines()) == 1
+
+
+def test_file_lock_removed_on_release(directory: str) -> None:
+    filename = file_utils.lock_filename(directory, 'call')
+
+    with file_utils.FileLock(filename):
+        assert file_utils.lock_filenames(directory) == [filename]
+
+    assert file_utils.lock_filenames(directory) == []
+
+
+def test_file_lock_not_blocking(directory: str) -> None:
+    filename = file_utils.lock_filename(directory, 'call')
+
+    with file_utils.FileLock(filename):
+        assert not file_utils.FileLock(filename).acquire(blocking=False)
+
+    lock = file_utils.FileLock(filename)
+    assert lock.acquire(blocking=False)
+    lock.release()
+
+
+def test_waiter_takes_the_new_lock_file(directory: str) -> None:
+    filename = file_utils.lock_filename(directory, 'call')
+    holder = file_utils.FileLock(filename)
+    holder.acquire()
+    acquired = threading.Event()
+
+    def _wait() -> None:
+        with file_utils.FileLock(filename):
+            acquired.set()
+            time.sleep(0.1)
+
+    waiter = threading.Thread(target=_wait)
+    waiter.start()
+    time.sleep(0.1)
+    holder.release()
+    assert acquired.wait(5)
+
+    # The waiter holds the lock file that's in place now, not the one the holder removed
+    assert not file_utils.FileLock(filename).acquire(blocking=False)
+    waiter.join()
+
+
+def test_file_locks_disjoint_sets_dont_wait(directory: str) -> None:
+    first = file_utils.FileLocks([file_utils.lock_filename(directory, day) for day in ['2019-04-02', '2019-04-01']])
+    second = file_utils.FileLocks([file_utils.lock_filename(directory, day) for day in ['2019-04-03']])
+
+    assert [os.path.basename(lock.filename) for lock in first.locks] == ['2019-04-01.lock', '2019-04-02.lock']
+    with first:
+        with second:
+            assert len(file_utils.lock_filenames(directory)) == 3
+        assert not file_utils.FileLock(file_utils.lock_filename(directory, '2019-04-01')).acquire(blocking=False)
+
+    assert file_utils.lock_filenames(directory) == []
+
+
+def test_file_locks_released_if_acquire_fails(directory: str) -> None:
+    held = file_utils.FileLock(file_utils.lock_filename(directory, '2019-04-02'))
+    held.acquire()
+    locks = file_utils.FileLocks([file_utils.lock_filename(directory, day) for day in ['2019-04-01', '2019-04-02']])
+    # Interrupted while waiting on the second day
+    with patch.object(locks.locks[1], 'acquire', MagicMock(side_effect=KeyboardInterrupt)):
+        with pytest.raises(KeyboardInterrupt):
+            locks.acquire()
+
+    assert file_utils.lock_filenames(directory) == [held.filename]
+    held.release()
+
+
+def test_remove_stale_locks(directory: str) -> None:
+    stale = file_utils.lock_filename(directory, 'stale')
+    os.makedirs(os.path.dirname(stale))
+    open(stale, 'w').close()
+    held = file_utils.FileLock(file_utils.lock_filename(directory, 'held'))
+    held.acquire()
+
+    file_utils.remove_stale_locks(directory)
+
+    assert file_utils.lock_filenames(directory) == [held.filename]
+    held.release()
@@ -1,3 +1,9 @@
+import enum
+from datetime import date, datetime
+from typing import Any
+
+import pytest
+
 from pybaseball.cache import func_utils
 
 
@@ -15,3 +21,51 @@ def test_get_func_name_class_method() -> None:
             pass
 
     assert func_utils.get_func_name(TestClass().test_func) == "TestClass.test_func"
+
+
+def test_bind_arguments() -> None:
+    def test_func(season: int, league: str = 'ALL', **kwargs: int) -> None:
+        pass
+
+    expected = {'season': 2019, 'league': 'ALL', 'qual': 50}
+    assert func_utils.bind_arguments(test_func, (2019,), {'qual': 50}) == expected
+    assert func_utils.bind_arguments(test_func, (), {'season': 2019, 'qual': 50}) == expected
+
+
+def test_forwards_to() -> None:
+    def target(start_season: int, end_season: int = 0) -> None:
+        pass
+
+    @func_utils.forwards_to(target)
+    def forwarder(*args: int, **kwargs: int) -> None:
+        pass
+
+    assert func_utils.bind_arguments(forwarder, (2019,), {}) == {'start_season': 2019, 'end_season': 0}
+
+
+def test_canonical_arguments() -> None:
+    def test_func(season: int, *teams: str, league: str = 'ALL', **kwargs: int) -> None:
+        pass
+
+    assert func_utils.canonical_arguments(test_func, (2019, 'BOS', 'NYY'), {'qual': 50}) == (
+        ['BOS', 'NYY'], {'season': 2019, 'league': 'ALL', 'qual': 50}
+    )
+
+
+class _League(enum.Enum):
+    AL = 'al'
+
+
+@pytest.mark.parametrize(
+    "value, normalized", [
+        (date(2019, 4, 1), '2019-04-01'),
+        (datetime(2019, 4, 1, 12), '2019-04-01T12:00:00'),
+        (_League.AL, 'al'),
+        ((1, 2), [1, 2]),
+        ({'b', 'a'}, ['a', 'b']),
+        ({'teams': ('BOS',)}, {'teams': ['BOS']}),
+        (None, None),
+    ]
+)
+def test_normalize(value: Any, normalized: Any) -> None:
+    assert func_utils.normalize(value) == normalized
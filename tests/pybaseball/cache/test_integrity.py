@@ -0,0 +1,158 @@
+import os
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from pybaseball import cache
+from pybaseball.cache import cache_index, cache_record, integrity
+from pybaseball.cache.storage import LocalStorage
+
+
+def _save(directory: str, year: int, frame: pl.DataFrame, indexed: bool = True) -> Dict[str, Any]:
+    record = cache_record.CacheRecord(data={'func': 'df_func', 'args': [year], 'kwargs': {}}, expires=30,
+                                      storage=LocalStorage(directory))
+    record.save_df(frame)
+    record.save()
+    if indexed:
+        cache_index.get_index(directory).add(cache_index.record_key(record.data), 'df_func', record.filename,
+                                             record.data['expires'],
+                                             cache_index.record_size(record.filename, record.data, record.storage))
+    return record.data
+
+
+def _frame(directory: str, data: Dict[str, Any]) -> str:
+    return os.path.join(directory, data['dataframe'])
+
+
+def _quarantined(directory: str) -> Dict[str, int]:
+    # The kinds of file quarantined, by how many of each
+    counts: Dict[str, int] = {}
+    for name in os.listdir(os.path.join(directory, integrity.QUARANTINE_DIRECTORY)):
+        kind = name.rsplit('.', 1)[-1]
+        counts[kind] = counts.get(kind, 0) + 1
+    return counts
+
+
+def test_record_stores_frame_checksum(directory: str) -> None:
+    data = _save(directory, 2019, pl.DataFrame({'a': [1, 2]}))
+
+    with open(_frame(directory, data), 'rb') as file:
+        content = file.read()
+    assert data['dataframe_size'] == len(content)
+    assert len(data['dataframe_sha256']) == 64
+
+
+def test_verify(directory: str) -> None:
+    frame = pl.DataFrame({'a': list(range(100))})
+    good = _save(directory, 2015, frame)
+    truncated = _save(directory, 2016, frame)
+    changed = _save(directory, 2017, frame)
+    missing = _save(directory, 2018, frame)
+    unindexed = _save(directory, 2019, frame, indexed=False)
+    tombstone = _save(directory, 2020, frame.head(0))
+    index = cache_index.get_index(directory)
+    index.add('gone', 'df_func', 'gone.cache_record.json', '3000-01-01')
+
+    with open(_frame(directory, truncated), 'r+b') as file:
+        file.truncate(truncated['dataframe_size'] // 2)
+    # The same size, so only the checksum tells
+    with open(_frame(directory, changed), 'r+b') as file:
+        file.seek(changed['dataframe_size'] // 2)
+        byte = file.read(1)
+        file.seek(changed['dataframe_size'] // 2)
+        file.write(bytes([byte[0] ^ 0xff]))
+    os.unlink(_frame(directory, missing))
+
+    assert integrity.verify(directory, workers=4) == {'records': 6, 'quarantined': 3, 'reindexed': 1, 'removed': 1}
+
+    entries = index.entries()
+    assert set(entries) == {cache_index.record_key(data) for data in (good, unindexed, tombstone)}
+    # Records and frames both, except the frame that was missing
+    assert _quarantined(directory) == {'json': 3, 'parquet': 2}
+    assert not os.path.exists(_frame(directory, truncated))
+
+    # Nothing's left to repair
+    assert integrity.verify(directory) == {'records': 3, 'quarantined': 0, 'reindexed': 0, 'removed': 0}
+
+    integrity.purge(directory)
+    assert not os.path.exists(os.path.join(directory, integrity.QUARANTINE_DIRECTORY))
+
+
+def test_quarantine_skips_replaced_record(directory: str) -> None:
+    data = _save(directory, 2019, pl.DataFrame({'a': [1, 2]}))
+    filename = cache_record.record_filename(data)
+    stale = dict(data, dataframe='df_func-replaced.parquet')
+
+    assert not integrity.quarantine(directory, LocalStorage(directory), cache_index.get_index(directory), filename,
+                                    stale, 'missing frame')
+
+    assert os.path.exists(os.path.join(directory, filename))
+    assert cache_index.get_index(directory).get(cache_index.record_key(data)) == filename
+
+
+def test_quarantine_unreadable_record(directory: str) -> None:
+    with open(os.path.join(directory, 'df_func-0.cache_record.json'), 'w') as file:
+        file.write('{"func": "df_f')
+
+    assert integrity.verify(directory) == {'records': 1, 'quarantined': 1, 'reindexed': 0, 'removed': 0}
+    assert _quarantined(directory) == {'json': 1}
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_df_cache_quarantines_truncated_frame(directory: str) -> None:
+    df_func = MagicMock(return_value=pl.DataFrame({'a': list(range(100))}))
+    df_func.__name__ = 'df_func_truncated'
+    wrapper = cache.df_cache().__call__(df_func)
+
+    with patch('pybaseball.cache.config.cache_directory', directory):
+        wrapper(2019)
+        filename = cache_index.get_index(directory).get(cache_index.record_key(
+            {'func': 'df_func_truncated', 'args': [2019], 'kwargs': {}}
+        ))
+        assert filename is not None
+        data = cache_record.CacheRecord(filename, storage=LocalStorage(directory)).data
+        with open(_frame(directory, data), 'r+b') as file:
+            file.truncate(100)
+
+        # Caught before it's decoded, set aside, and fetched again
+        assert_frame_equal(wrapper(2019), pl.DataFrame({'a': list(range(100))}))
+        assert_frame_equal(wrapper(2019), pl.DataFrame({'a': list(range(100))}))
+
+    assert df_func.call_count == 2
+    assert _quarantined(directory) == {'json': 1, 'parquet': 1}
+    # Quarantining it is how the cache recovers, so it's a miss rather than an error
+    assert cache.stats()['df_func_truncated']['errors'] == 0
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_df_cache_loads_replaced_record(directory: str) -> None:
+    df_func = MagicMock(return_value=pl.DataFrame({'a': list(range(100))}))
+    df_func.__name__ = 'df_func_replaced'
+    wrapper = cache.df_cache().__call__(df_func)
+
+    with patch('pybaseball.cache.config.cache_directory', directory):
+        wrapper(2019)
+        filename = cache_index.get_index(directory).get(cache_index.record_key(
+            {'func': 'df_func_replaced', 'args': [2019], 'kwargs': {}}
+        ))
+        assert filename is not None
+        frame = _frame(directory, cache_record.CacheRecord(filename, storage=LocalStorage(directory)).data)
+        with open(frame, 'rb') as original:
+            content = original.read()
+        with open(frame, 'r+b') as file:
+            file.truncate(100)
+
+        def _replace(*args: Any) -> bool:
+            # Another process saves the call again before the broken record can be quarantined
+            with open(frame, 'wb') as replaced:
+                replaced.write(content)
+            return False
+
+        with patch.object(integrity, 'quarantine', MagicMock(side_effect=_replace)) as quarantine:
+            assert_frame_equal(wrapper(2019), pl.DataFrame({'a': list(range(100))}))
+
+    quarantine.assert_called_once()
+    df_func.assert_called_once_with(2019)
+    assert cache.stats()['df_func_replaced']['errors'] == 0
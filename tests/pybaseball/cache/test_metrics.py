@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from pybaseball.cache.metrics import Metrics
+
+
+def test_record() -> None:
+    metrics = Metrics()
+
+    metrics.record('miss', 'batting_stats', fetch_seconds=2.0)
+    metrics.record('save', 'batting_stats', bytes_written=100, save_seconds=0.5)
+    metrics.record('hit', 'batting_stats', tier='disk', bytes_read=100, load_seconds=0.25)
+    metrics.record('hit', 'batting_stats', tier='memory')
+
+    stats = metrics.stats()['batting_stats']
+    assert (stats['hits'], stats['misses'], stats['saves'], stats['errors']) == (2, 1, 1, 0)
+    assert (stats['bytes_read'], stats['bytes_written']) == (100, 100)
+    assert (stats['fetch_seconds'], stats['load_seconds'], stats['save_seconds']) == (2.0, 0.25, 0.5)
+
+    metrics.reset()
+    assert metrics.stats() == {}
+
+
+def test_error_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    metrics = Metrics()
+
+    with caplog.at_level(logging.WARNING, logger='pybaseball.cache'):
+        metrics.error('batting_stats', 'save', OSError('disk full'))
+
+    assert metrics.stats()['batting_stats']['errors'] == 1
+    assert 'Cache save failed for batting_stats' in caplog.text
+    assert 'disk full' in caplog.text
+
+
+def test_listeners(caplog: pytest.LogCaptureFixture) -> None:
+    metrics = Metrics()
+    events: List[Tuple[str, str, Dict[str, Any]]] = []
+
+    def _failing_listener(event: str, func: str, details: Dict[str, Any]) -> None:
+        raise ValueError('listener bug')
+
+    metrics.add_listener(_failing_listener)
+    metrics.add_listener(lambda *event: events.append(event))
+    with caplog.at_level(logging.ERROR, logger='pybaseball.cache'):
+        metrics.record('hit', 'batting_stats', tier='memory')
+
+    # A failing listener is logged, and doesn't keep the others from hearing about the event
+    assert events == [('hit', 'batting_stats', {'tier': 'memory'})]
+    assert 'listener bug' in caplog.text
+
+    metrics.remove_listener(_failing_listener)
+    metrics.record('miss', 'batting_stats')
+    assert len(events) == 2
@@ -0,0 +1,60 @@
+from datetime import date
+
+import pytest
+
+from pybaseball.cache import statcast_jobs
+
+_CHUNKS = [(date(2019, 4, 1), date(2019, 4, 2)), (date(2019, 4, 3), date(2019, 4, 3)),
+           (date(2019, 4, 4), date(2019, 4, 6))]
+_REQUEST = {'start_dt': '2019-04-01', 'end_dt': '2019-04-06', 'team': None, 'schema': 'statcast_search'}
+
+
+def test_job_is_saved_as_chunks_finish(directory: str) -> None:
+    job = statcast_jobs.StatcastJob(directory, 'backfill-2019')
+    assert not job.exists
+    job.start(_REQUEST, lambda: _CHUNKS)
+
+    job.complete(_CHUNKS[0], 100)
+    job.fail(_CHUNKS[1], ConnectionError('reset'), attempts=4)
+
+    resumed = statcast_jobs.load_job(directory, 'backfill-2019')
+    assert resumed is not None
+    # Planned once, however often it's started
+    resumed.start(_REQUEST, lambda: pytest.fail('the job was planned again'))
+    assert resumed.chunks(statcast_jobs.COMPLETED) == [_CHUNKS[0]]
+    assert resumed.chunks(statcast_jobs.PLANNED, statcast_jobs.FAILED) == _CHUNKS[1:]
+
+    status = resumed.status()
+    assert {key: status[key] for key in ('chunks', 'planned', 'completed', 'failed', 'rows')} == \
+        {'chunks': 3, 'planned': 1, 'completed': 1, 'failed': 1, 'rows': 100}
+    assert status['errors'] == ["ConnectionError('reset')"]
+    # Two chunks left, each at the rate the first one took
+    assert status['eta_seconds'] == pytest.approx(2 * status['elapsed_seconds'])
+
+    resumed.reopen([_CHUNKS[0]])
+    assert resumed.chunks(statcast_jobs.PLANNED) == [_CHUNKS[0], _CHUNKS[2]]
+
+
+def test_job_keeps_its_request(directory: str) -> None:
+    statcast_jobs.StatcastJob(directory, 'backfill').start(_REQUEST, lambda: _CHUNKS)
+
+    with pytest.raises(ValueError):
+        statcast_jobs.StatcastJob(directory, 'backfill').start(dict(_REQUEST, team='BOS'), lambda: _CHUNKS)
+
+
+def test_job_lock(directory: str) -> None:
+    first = statcast_jobs.StatcastJob(directory, 'backfill')
+    second = statcast_jobs.StatcastJob(directory, 'backfill')
+
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+@pytest.mark.parametrize('job_id', ['', '../escape', '.hidden', 'a/b'])
+def test_invalid_job_id(directory: str, job_id: str) -> None:
+    with pytest.raises(ValueError):
+        statcast_jobs.StatcastJob(directory, job_id)
+    assert statcast_jobs.load_job(directory, 'missing') is None
@@ -0,0 +1,212 @@
+import os
+from datetime import date, timedelta
+
+import polars as pl
+import pyarrow.parquet as pq
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from pybaseball.cache import expiry, statcast_store
+
+
+def _day_file(directory: str, store: statcast_store.StatcastStore, day: date) -> str:
+    return os.path.join(directory, *store.day_name(day).split('/'))
+
+
+_TYPES = {'game_pk': pl.Int32, 'at_bat_number': pl.Int16, 'pitch_number': pl.Int16}
+
+
+@pytest.fixture(name='two_days')
+def _two_days() -> pl.DataFrame:
+    # Typed as the statcast_search schema parses them
+    return pl.DataFrame({
+        'game_date': [date(2019, 4, 1), date(2019, 4, 1), date(2019, 4, 2)],
+        'game_pk': [1, 1, 2],
+        'pitch_number': [1, 2, 1],
+    }, schema_overrides=_TYPES)
+
+
+def test_save_partitions_by_day(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+
+    store.save(two_days, [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)])
+
+    assert os.path.isfile(_day_file(directory, store, date(2019, 4, 1)))
+    assert os.path.isfile(_day_file(directory, store, date(2019, 4, 2)))
+    assert not os.path.isfile(_day_file(directory, store, date(2019, 4, 3)))
+    assert store.fetched_days() == {date(2019, 4, 1): 2, date(2019, 4, 2): 1, date(2019, 4, 3): 0}
+
+
+def test_missing_days(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1), date(2019, 4, 2)])
+
+    assert store.missing_days([date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)]) == [date(2019, 4, 3)]
+
+
+def test_load_composes_days(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)])
+
+    frames = store.load([date(2019, 4, 2), date(2019, 4, 3)])
+
+    assert len(frames) == 1
+    assert frames[0]['game_pk'].to_list() == [2]
+
+
+def test_save_skips_today(directory: str) -> None:
+    store = statcast_store.StatcastStore(directory)
+    today = date.today()
+    data = pl.DataFrame({'game_date': [today], 'game_pk': [1]}, schema_overrides=_TYPES)
+
+    store.save(data, [today])
+
+    assert store.missing_days([today]) == [today]
+
+
+def test_save_skips_data_that_does_not_fit_schema(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    # Typed by inference, as when Savant changes a column out from under the schema
+    inferred = two_days.with_columns(pl.col('game_date').cast(pl.String), pl.col('game_pk').cast(pl.Float64))
+
+    store.save(inferred, [date(2019, 4, 1), date(2019, 4, 2)])
+
+    assert store.missing_days([date(2019, 4, 1), date(2019, 4, 2)]) == [date(2019, 4, 1), date(2019, 4, 2)]
+
+
+def test_expired_days_are_missing(directory: str, two_days: pl.DataFrame, monkeypatch: MonkeyPatch) -> None:
+    store = statcast_store.StatcastStore(directory)
+    monkeypatch.setitem(expiry.POLICIES, 'statcast', expiry.FixedExpiry(-1))
+    store.save(two_days, [date(2019, 4, 1)])
+
+    assert store.missing_days([date(2019, 4, 1)]) == [date(2019, 4, 1)]
+
+
+def test_days_expire_by_statcast_policy(directory: str, two_days: pl.DataFrame, monkeypatch: MonkeyPatch) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1)])
+    monkeypatch.setitem(expiry.POLICIES, 'statcast', expiry.FixedExpiry(30))
+    store.save(two_days, [date(2019, 4, 2)])
+
+    manifest = statcast_store.load_manifest(store.storage, store.name)
+    # A completed season never changes
+    assert manifest['2019-04-01']['expires'] == expiry.serialize(expiry.NEVER)
+    assert manifest['2019-04-02']['expires'] == expiry.serialize(date.today() + timedelta(days=30))
+
+
+def test_stores_are_separate_per_team(directory: str, two_days: pl.DataFrame) -> None:
+    statcast_store.StatcastStore(directory, 'BOS').save(two_days, [date(2019, 4, 1)])
+
+    assert statcast_store.StatcastStore(directory, 'bos').missing_days([date(2019, 4, 1)]) == []
+    assert statcast_store.StatcastStore(directory).missing_days([date(2019, 4, 1)]) == [date(2019, 4, 1)]
+
+
+def test_lock_days_only_blocks_overlapping_days(directory: str) -> None:
+    store = statcast_store.StatcastStore(directory)
+
+    with store.lock_days([date(2019, 4, 1), date(2019, 4, 2)]):
+        # Another team's store, or disjoint days in this one, go ahead
+        with statcast_store.StatcastStore(directory, 'BOS').lock_days([date(2019, 4, 1)]):
+            pass
+        with store.lock_days([date(2019, 4, 3)]):
+            pass
+        assert not store.lock_days([date(2019, 4, 2)]).locks[0].acquire(blocking=False)
+
+    assert not os.listdir(os.path.join(store.lock_directory, statcast_store.file_utils.LOCK_DIRECTORY))
+
+
+def test_evicting_days(directory: str, two_days: pl.DataFrame, monkeypatch: MonkeyPatch) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)])
+    monkeypatch.setattr(statcast_store.time, 'time', lambda: 4102444800.0)
+    store.load([date(2019, 4, 2)])
+
+    # Only days with games take space, and the one just loaded was used last
+    days = sorted(statcast_store.stored_days(store.storage), key=lambda day: day.accessed)
+    assert [day.day for day in days] == ['2019-04-01', '2019-04-02']
+    assert days[0].size == os.path.getsize(_day_file(directory, store, date(2019, 4, 1)))
+    assert days[1].accessed == 4102444800.0
+
+    statcast_store.remove_days(store.storage, directory, days[0].store, [days[0].day])
+
+    assert not os.path.exists(_day_file(directory, store, date(2019, 4, 1)))
+    assert store.missing_days([date(2019, 4, 1), date(2019, 4, 2)]) == [date(2019, 4, 1)]
+
+
+def test_purge(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1)])
+
+    statcast_store.purge(store.storage)
+
+    assert not os.path.exists(os.path.join(directory, statcast_store.STORE_DIRECTORY))
+
+
+def test_scan_filters_and_selects(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)])
+
+    scan = store.scan([date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)])
+    result = scan.filter(pl.col('pitch_number') == 1).select(['game_pk']).collect()
+
+    assert isinstance(scan, pl.LazyFrame)
+    assert result.columns == ['game_pk']
+    assert sorted(result['game_pk'].to_list()) == [1, 2]
+
+
+def test_scan_empty(directory: str) -> None:
+    store = statcast_store.StatcastStore(directory)
+
+    assert len(store.scan([date(2019, 4, 1)]).collect()) == 0
+
+
+def test_scan_empty_keeps_schema(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    # A day with no games is stored without a file
+    store.save(two_days, [date(2019, 4, 3)])
+
+    result = store.scan([date(2019, 4, 3)]).filter(pl.col('pitcher') == 543037).select(['game_pk', 'pitcher'])
+
+    assert result.collect().columns == ['game_pk', 'pitcher']
+    assert len(result.collect()) == 0
+
+
+def test_days_from_older_schema_are_missing(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    store.save(two_days, [date(2019, 4, 1)])
+
+    store.schema_version += 1
+
+    assert store.missing_days([date(2019, 4, 1)]) == [date(2019, 4, 1)]
+
+
+def test_save_sorts_and_row_groups_days(directory: str) -> None:
+    store = statcast_store.StatcastStore(directory, parquet_options={'row_group_size': 2})
+    data = pl.DataFrame({
+        'game_date': [date(2019, 4, 1)] * 4,
+        'game_pk': [2, 1, 2, 1],
+        'at_bat_number': [1, 1, 1, 1],
+        'pitch_number': [2, 2, 1, 1],
+    }, schema_overrides=_TYPES)
+
+    store.save(data, [date(2019, 4, 1)])
+
+    stored = pl.read_parquet(_day_file(directory, store, date(2019, 4, 1)))
+    assert stored['game_pk'].to_list() == [1, 1, 2, 2]
+    assert stored['pitch_number'].to_list() == [1, 2, 1, 2]
+
+    metadata = pq.ParquetFile(_day_file(directory, store, date(2019, 4, 1))).metadata
+    assert metadata.num_row_groups == 2
+    game_pk = metadata.schema.names.index('game_pk')
+    statistics = metadata.row_group(1).column(game_pk).statistics
+    assert (statistics.min, statistics.max) == (2, 2)
+
+
+def test_stores_are_separate_per_schema(directory: str, two_days: pl.DataFrame) -> None:
+    store = statcast_store.StatcastStore(directory)
+    float32_store = statcast_store.StatcastStore(directory, schema='statcast_search_float32')
+    store.save(two_days, [date(2019, 4, 1)])
+
+    assert float32_store.name != store.name
+    assert float32_store.missing_days([date(2019, 4, 1)]) == [date(2019, 4, 1)]
+    assert float32_store.scan([date(2019, 4, 1)]).collect_schema()['release_speed'] == pl.Float32
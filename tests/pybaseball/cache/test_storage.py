@@ -0,0 +1,244 @@
+import errno
+import os
+import tempfile
+import threading
+import urllib.parse
+from datetime import date
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+from unittest.mock import MagicMock, patch
+from xml.sax.saxutils import escape
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from pybaseball import cache
+from pybaseball.cache import dataframe_utils, statcast_store
+from pybaseball.cache.storage import HTTPStorage, LocalStorage, SharedStorage, Storage
+
+
+class _ObjectStoreHandler(BaseHTTPRequestHandler):
+    ''' A stand-in for an object store bucket at /bucket, holding its objects in memory '''
+
+    objects: Dict[str, bytes] = {}
+    page_size = 2
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        pass
+
+    def _name(self) -> str:
+        path = urllib.parse.urlparse(self.path).path
+        assert path.startswith('/bucket/')
+        return urllib.parse.unquote(path[len('/bucket/'):])
+
+    def _send(self, status: int, body: bytes = b'', headers: Dict[str, str] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        name = self._name()
+        if name:
+            if name not in self.objects:
+                self._send(404)
+                return
+            self._send(200, self.objects[name])
+            return
+
+        # A ListObjectsV2 listing, a page at a time
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        prefix = query.get('prefix', [''])[0]
+        keys = sorted(key for key in self.objects if key.startswith(prefix))
+        start = int(query.get('continuation-token', ['0'])[0])
+        page = keys[start:start + self.page_size]
+        truncated = start + self.page_size < len(keys)
+        body = '<?xml version="1.0" encoding="UTF-8"?>'
+        body += '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+        body += ''.join(f'<Contents><Key>{escape(key)}</Key></Contents>' for key in page)
+        body += f'<IsTruncated>{"true" if truncated else "false"}</IsTruncated>'
+        if truncated:
+            body += f'<NextContinuationToken>{start + self.page_size}</NextContinuationToken>'
+        body += '</ListBucketResult>'
+        self._send(200, body.encode('utf-8'))
+
+    def do_HEAD(self) -> None:  # pylint: disable=invalid-name
+        name = self._name()
+        if name not in self.objects:
+            self._send(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.objects[name])))
+        self.send_header('Last-Modified', formatdate(usegmt=True))
+        self.end_headers()
+
+    def do_PUT(self) -> None:  # pylint: disable=invalid-name
+        self.objects[self._name()] = self.rfile.read(int(self.headers['Content-Length']))
+        self._send(200)
+
+    def do_DELETE(self) -> None:  # pylint: disable=invalid-name
+        # Object stores don't mind deleting what isn't there
+        self.objects.pop(self._name(), None)
+        self._send(204)
+
+
+@pytest.fixture(name='bucket_url')
+def _bucket_url() -> Iterator[str]:
+    _ObjectStoreHandler.objects = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ObjectStoreHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}/bucket'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(name='storage', params=['local', 'shared', 'http'])
+def _storage(request: pytest.FixtureRequest, directory: str) -> Storage:
+    if request.param == 'http':
+        return HTTPStorage(request.getfixturevalue('bucket_url'))
+    return LocalStorage(directory) if request.param == 'local' else SharedStorage(directory)
+
+
+def test_storage(storage: Storage) -> None:
+    storage.write('a.cache_record.json', b'{"a": 1}')
+    storage.write_json('b.cache_record.json', {'b': 2})
+    storage.write('c.parquet', b'frame')
+
+    assert storage.read('a.cache_record.json') == b'{"a": 1}'
+    assert storage.read_json('b.cache_record.json') == {'b': 2}
+    assert storage.exists('c.parquet')
+    assert storage.size('c.parquet') == 5
+    assert storage.modified('c.parquet') > 0
+    assert storage.names('.cache_record.json') == ['a.cache_record.json', 'b.cache_record.json']
+
+    storage.write('c.parquet', b'new frame')
+    assert storage.read('c.parquet') == b'new frame'
+
+    storage.delete('c.parquet')
+    assert not storage.exists('c.parquet')
+    with pytest.raises(FileNotFoundError):
+        storage.read('c.parquet')
+    with pytest.raises(FileNotFoundError):
+        storage.size('c.parquet')
+
+
+def test_storage_tree(storage: Storage) -> None:
+    storage.write('a.cache_record.json', b'{}')
+    storage.write('statcast/all/manifest.json', b'{}')
+    storage.write('statcast/all/2019-04-01.parquet', b'day')
+    storage.write('statcast/float32/BOS/manifest.json', b'{}')
+    storage.write('statcast/all/.locks/manifest.lock', b'')
+
+    assert storage.tree('statcast') == ['statcast/all/2019-04-01.parquet', 'statcast/all/manifest.json',
+                                        'statcast/float32/BOS/manifest.json']
+    assert storage.tree('missing') == []
+    # Stored below the top level, so they aren't records
+    assert storage.names('.json') == ['a.cache_record.json']
+
+
+def test_storage_move_in(storage: Storage, directory: str) -> None:
+    with tempfile.NamedTemporaryFile(dir=directory, suffix='.staged', delete=False) as staged:
+        staged.write(b'frame')
+
+    storage.move_in('frame.parquet', staged.name)
+
+    assert storage.read('frame.parquet') == b'frame'
+    assert not os.path.exists(staged.name)
+
+
+def test_storage_move_out(storage: Storage, directory: str) -> None:
+    storage.write('frame.parquet', b'frame')
+    filename = os.path.join(directory, 'quarantined.parquet')
+
+    storage.move_out('frame.parquet', filename)
+
+    assert not storage.exists('frame.parquet')
+    with open(filename, 'rb') as file:
+        assert file.read() == b'frame'
+
+
+def test_storage_frames(storage: Storage) -> None:
+    frame = pl.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+
+    for name in ('frame.parquet', 'frame.arrow', 'frame.feather', 'frame.csv'):
+        dataframe_utils.save_df(frame, name, storage=storage)
+        assert_frame_equal(dataframe_utils.load_df(name, storage), frame)
+
+
+def test_local_storage_paths(directory: str) -> None:
+    storage = LocalStorage(directory)
+
+    assert storage.local_path('a/b.parquet') == os.path.join(directory, 'a', 'b.parquet')
+    # Records from before storage backends named their frames by absolute path
+    assert storage.local_path('/elsewhere/b.parquet') == '/elsewhere/b.parquet'
+    assert storage.lock_directory == directory
+    assert HTTPStorage('http://127.0.0.1/bucket').lock_directory is None
+
+
+def test_shared_storage_retries_stale_handles(directory: str) -> None:
+    storage = SharedStorage(directory)
+    storage.write('a.parquet', b'frame')
+
+    stale = OSError(errno.ESTALE, os.strerror(errno.ESTALE))
+    with patch('builtins.open', MagicMock(side_effect=[stale, open(os.path.join(directory, 'a.parquet'), 'rb')])):
+        assert storage.read('a.parquet') == b'frame'
+
+    # Only the file itself is left, the temporary one having been renamed over it
+    assert os.listdir(directory) == ['a.parquet']
+
+
+def test_shared_storage_write_is_flushed(directory: str) -> None:
+    storage = SharedStorage(directory)
+
+    with patch('os.fsync', MagicMock(wraps=os.fsync)) as fsync:
+        storage.write('a.parquet', b'frame')
+
+    # The file, then the directory holding the rename
+    assert fsync.call_count == 2
+
+
+def test_statcast_store_in_storage(storage: Storage, directory: str) -> None:
+    days = [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3)]
+    data = pl.DataFrame({'game_date': days[:2], 'game_pk': [1, 2]}, schema_overrides={'game_pk': pl.Int32})
+    # Another machine's cache directory, sharing the storage
+    other = statcast_store.StatcastStore(os.path.join(directory, 'other'), storage=storage)
+    statcast_store.StatcastStore(os.path.join(directory, 'first'), storage=storage).save(data, days)
+
+    assert other.missing_days(days) == []
+    assert_frame_equal(pl.concat(other.load(days)), data)
+    assert other.scan(days).filter(pl.col('game_pk') == 2).collect()['game_pk'].to_list() == [2]
+    assert statcast_store.store_names(storage) == ['statcast/all']
+    assert sorted(day.day for day in statcast_store.stored_days(storage)) == ['2019-04-01', '2019-04-02']
+
+    statcast_store.remove_days(storage, directory, 'statcast/all', ['2019-04-01'])
+    assert other.missing_days(days) == [date(2019, 4, 1)]
+
+    statcast_store.purge(storage)
+    assert storage.tree('statcast') == []
+
+
+@patch('pybaseball.cache.config.enabled', True)
+def test_df_cache_shared_between_processes(directory: str, bucket_url: str) -> None:
+    df_func = MagicMock(return_value=pl.DataFrame({'a': [1, 2]}))
+    df_func.__name__ = 'df_func_storage'
+    wrapper = cache.df_cache().__call__(df_func)
+
+    # Each process has a cache directory (and index) of its own, and they share the bucket
+    with patch('pybaseball.cache.config.storage_type', 'http'), \
+            patch('pybaseball.cache.config.storage_location', bucket_url):
+        with patch('pybaseball.cache.config.cache_directory', os.path.join(directory, 'first')):
+            assert_frame_equal(wrapper(2019), pl.DataFrame({'a': [1, 2]}))
+        with patch('pybaseball.cache.config.cache_directory', os.path.join(directory, 'second')):
+            assert_frame_equal(wrapper(2019), pl.DataFrame({'a': [1, 2]}))
+            assert cache.usage()['entries'] == 1
+
+    df_func.assert_called_once_with(2019)
+    assert all(not os.path.isabs(name) for name in _ObjectStoreHandler.objects)
@@ -0,0 +1,62 @@
+import threading
+
+import polars as pl
+
+from pybaseball.cache.write_behind import WriteBehind
+
+
+def test_write_behind_writes_in_background() -> None:
+    writer = WriteBehind()
+    release = threading.Event()
+    written = []
+    frame = pl.DataFrame({'a': [1, 2]})
+
+    def _write() -> None:
+        release.wait(5)
+        written.append(threading.current_thread().name)
+
+    assert writer.submit('key', frame, _write, 4)
+    assert writer.stats()['queued'] == 1
+    # Still waiting to be written, so it can be looked up
+    pending = writer.pending('key')
+    assert pending is not None and pending.equals(frame)
+
+    release.set()
+    assert writer.drain(5)
+
+    assert written == ['pybaseball-cache-writer']
+    assert writer.pending('key') is None
+    stats = writer.stats()
+    assert stats['queued'] == 0
+    assert stats['writes'] == 1
+    assert stats['max_queued'] == 1
+    assert stats['write_seconds'] >= stats['max_write_seconds'] > 0
+
+
+def test_write_behind_turns_down_writes_when_full() -> None:
+    writer = WriteBehind()
+    release = threading.Event()
+    frame = pl.DataFrame({'a': [1, 2]})
+
+    def _write() -> None:
+        release.wait(5)
+
+    assert writer.submit('first', frame, _write, 1)
+    assert not writer.submit('second', frame, lambda: None, 1)
+    assert writer.stats()['inline'] == 1
+
+    release.set()
+    assert writer.drain(5)
+
+
+def test_write_behind_counts_failures() -> None:
+    writer = WriteBehind()
+
+    def _write() -> None:
+        raise OSError()
+
+    writer.submit('key', pl.DataFrame({'a': [1]}), _write, 4)
+
+    assert writer.drain(5)
+    assert writer.stats()['failed'] == 1
+    assert writer.stats()['writes'] == 0
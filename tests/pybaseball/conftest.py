@@ -10,6 +10,7 @@ from _pytest.monkeypatch import MonkeyPatch
 from typing_extensions import Protocol
 
 from pybaseball.datasources.bref import BRefSession
+from pybaseball.datasources.savant import SavantSession
 
 _ParseDates = Union[bool, List[int], List[str], List[List], Dict]
 
@@ -84,6 +85,14 @@ def _requests_prevent_post(monkeypatch: MonkeyPatch, thrower: Callable, logging_
     return mock
 
 
+# Autouse to prevent integration tests sneaking into the unit tests
+@pytest.fixture(autouse=True)
+def _savant_prevent_get(monkeypatch: MonkeyPatch, thrower: Callable, logging_side_effect: Callable) -> MagicMock:
+    mock = MagicMock(side_effect=logging_side_effect(f'SavantSession.session.get', after=thrower))
+    monkeypatch.setattr(SavantSession().session, 'get', mock)
+    return mock
+
+
 # Autouse to prevent file system side effects
 @pytest.fixture(autouse=True, name="mkdir")
 def _mkdir(monkeypatch: MonkeyPatch, logging_side_effect: Callable) -> MagicMock:
@@ -189,6 +198,7 @@ def response_get_monkeypatch(monkeypatch: MonkeyPatch) -> Callable:
             return DummyResponse(result)
 
         monkeypatch.setattr(requests, 'get', _monkeypatch)
+        monkeypatch.setattr(SavantSession(), 'get', _monkeypatch)
 
     return setup
 
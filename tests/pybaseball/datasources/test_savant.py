@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock
+
+from pybaseball.datasources.savant import DEFAULT_TIMEOUT, SavantSession
+
+
+def test_savant_session_is_shared() -> None:
+    session = SavantSession()
+
+    assert SavantSession() is session
+    assert SavantSession(pool_size=1).session is session.session
+
+
+def test_savant_session_pool_size() -> None:
+    session = SavantSession()
+
+    pool_kw = session.adapter.poolmanager.connection_pool_kw
+    assert pool_kw['maxsize'] == session.pool_size
+    assert pool_kw['block']
+
+
+def test_savant_session_default_timeout(_savant_prevent_get: MagicMock) -> None:
+    _savant_prevent_get.side_effect = None
+
+    SavantSession().get('https://baseballsavant.mlb.com/leaderboard')
+
+    assert _savant_prevent_get.call_args[1]['timeout'] == DEFAULT_TIMEOUT
+
+
+def test_savant_session_limits_requests_per_host(_savant_prevent_get: MagicMock) -> None:
+    session = SavantSession()
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def _get(*args: Any, **kwargs: Any) -> MagicMock:
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.01)
+        with lock:
+            state['in_flight'] -= 1
+        return MagicMock()
+
+    _savant_prevent_get.side_effect = _get
+
+    threads = [
+        threading.Thread(target=session.get, args=('https://baseballsavant.mlb.com/statcast_search/csv',))
+        for _ in range(session.max_requests_per_host * 2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert state['max_in_flight'] <= session.max_requests_per_host
+
+
+def test_savant_session_stats(_savant_prevent_get: MagicMock) -> None:
+    session = SavantSession()
+    _savant_prevent_get.side_effect = None
+    before = session.stats()['requests']
+
+    session.get('https://baseballsavant.mlb.com/leaderboard')
+
+    stats = session.stats()
+    assert stats['requests'] == before + 1
+    assert stats['reused'] == stats['requests'] - stats['connections']
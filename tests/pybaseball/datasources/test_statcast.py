@@ -0,0 +1,87 @@
+import logging
+import os
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import polars as pl
+import pytest
+from _pytest.logging import LogCaptureFixture
+
+from pybaseball.datasources import statcast as statcast_ds
+
+_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+_CSV = b'pitch_type,game_date,release_speed,events\nFF,2019-04-01,95.1,\nSL,2019-04-01,null,strikeout\n'
+
+
+@patch('pybaseball.datasources.statcast.postprocessing.try_parse_dataframe')
+def test_get_statcast_data_from_csv_with_schema(try_parse_dataframe: MagicMock) -> None:
+    data = statcast_ds.get_statcast_data_from_csv(_CSV, schema='statcast_search')
+
+    try_parse_dataframe.assert_not_called()
+    assert data.schema['game_date'] == pl.Date
+    assert data['game_date'].to_list() == [date(2019, 4, 1), date(2019, 4, 1)]
+    assert data['release_speed'].to_list() == [95.1, None]
+    assert data['events'].to_list() == [None, 'strikeout']
+
+
+def test_get_statcast_data_from_csv_with_schema_str() -> None:
+    from_bytes = statcast_ds.get_statcast_data_from_csv(_CSV, schema='statcast_search')
+    from_str = statcast_ds.get_statcast_data_from_csv(_CSV.decode('utf-8'), schema='statcast_search')
+
+    assert from_bytes.equals(from_str)
+
+
+def test_get_statcast_data_from_csv_url_passes_bytes() -> None:
+    response = MagicMock(content=_CSV)
+    with patch.object(statcast_ds.session, 'get', MagicMock(return_value=response)):
+        with patch.object(statcast_ds, 'get_statcast_data_from_csv') as parse:
+            statcast_ds.get_statcast_data_from_csv_url('/statcast_search/csv?all=true', schema='statcast_search')
+
+    assert parse.call_args[0][0] is _CSV
+    assert parse.call_args[1]['schema'] == 'statcast_search'
+
+
+def test_get_statcast_data_from_csv_compact_types() -> None:
+    with open(os.path.join(_DATA_DIR, 'single_game_request_raw.csv'), 'rb') as csv_file:
+        content = csv_file.read()
+
+    data = statcast_ds.get_statcast_data_from_csv(content, schema='statcast_search')
+
+    assert data.schema['game_pk'] == pl.Int32
+    assert data.schema['batter'] == pl.Int32
+    assert data.schema['balls'] == pl.Int8
+    assert data.schema['pitch_type'] == pl.Categorical
+    assert data.schema['des'] == pl.String
+    assert data.schema['release_speed'] == pl.Float64
+
+    compact = statcast_ds.get_statcast_data_from_csv(content, schema='statcast_search_float32')
+    assert compact.schema['release_speed'] == pl.Float32
+    assert compact.estimated_size() < data.estimated_size()
+
+
+def test_get_statcast_data_from_csv_schema_mismatch_falls_back() -> None:
+    data = statcast_ds.get_statcast_data_from_csv(b'game_pk,balls\n1,0.5\n', schema='statcast_search')
+
+    assert data['balls'].to_list() == [0.5]
+
+
+def test_get_statcast_data_from_csv_unknown_schema() -> None:
+    with pytest.raises(ValueError):
+        statcast_ds.get_statcast_data_from_csv(_CSV, schema='not_a_schema')
+
+
+def test_get_statcast_data_from_csv_url_is_not_cached() -> None:
+    # Statcast results are persisted once, by the caller (e.g. the day-partitioned store), never per url
+    assert not hasattr(statcast_ds.get_statcast_data_from_csv_url, '__wrapped__')
+
+
+def test_get_statcast_data_from_csv_schema_mismatch(caplog: LogCaptureFixture) -> None:
+    # A count that Savant started sending with decimals
+    content = b'game_date,game_pk,balls\n2019-04-01,1,2.5\n'
+
+    with caplog.at_level(logging.WARNING, logger='pybaseball.cache'):
+        data = statcast_ds.get_statcast_data_from_csv(content, schema='statcast_search')
+
+    assert data['balls'].to_list() == [2.5]
+    assert "column balls" in caplog.text
@@ -1,14 +1,23 @@
-from typing import Callable
+import importlib
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Optional
 
 import polars as pl
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 
-from pybaseball.statcast import _SC_SINGLE_GAME_REQUEST, statcast_single_game
+from pybaseball.statcast import (_SC_SINGLE_GAME_REQUEST, StatcastException, _missing_ranges, statcast_iter,
+                                  statcast_scan, statcast_single_game)
 from pybaseball.utils import DATE_FORMAT
 
 # For an explanation of this type, see the note on GetDataFrameCallable in tests/pybaseball/conftest.py
 from .conftest import GetDataFrameCallable
 
+# pybaseball re-exports the statcast function under the module's name, so get the module itself to patch it
+statcast_module = importlib.import_module('pybaseball.statcast')
+
 
 @pytest.fixture(name="single_game_raw")
 def _single_game_raw(get_data_file_contents: Callable[[str], str]) -> str:
@@ -34,3 +43,100 @@ def test_statcast_single_game_request(response_get_monkeypatch: Callable, single
     statcast_result = statcast_single_game(game_pk).reset_index(drop=True)
 
     pl.testing.assert_frame_equal(statcast_result, single_game, check_dtype=False)
+
+
+def test_missing_ranges_groups_contiguous_days() -> None:
+    missing_days = [date(2019, 4, 1), date(2019, 4, 2), date(2019, 4, 3), date(2019, 4, 5)]
+
+    assert _missing_ranges(missing_days, 2) == [
+        (date(2019, 4, 1), date(2019, 4, 2)),
+        (date(2019, 4, 3), date(2019, 4, 3)),
+        (date(2019, 4, 5), date(2019, 4, 5)),
+    ]
+
+
+def test_missing_ranges_single_day_step() -> None:
+    missing_days = [date(2019, 4, 1), date(2019, 4, 2)]
+
+    assert _missing_ranges(missing_days, 1) == [
+        (date(2019, 4, 1), date(2019, 4, 1)),
+        (date(2019, 4, 2), date(2019, 4, 2)),
+    ]
+
+
+def test_statcast_scan_requires_cache() -> None:
+    with pytest.raises(StatcastException):
+        statcast_scan('2019-04-01', '2019-04-02')
+
+
+def test_statcast_iter_yields_in_date_order(monkeypatch: MonkeyPatch) -> None:
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        # Make earlier chunks finish last so ordering can't come from completion order
+        time.sleep(0.01 * (30 - start_dt.day))
+        return pl.DataFrame({'game_date': [str(start_dt)]})
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+
+    chunks = list(statcast_iter('2019-04-01', '2019-04-06', chunk_days=2, verbose=False, max_in_flight=3))
+
+    assert [chunk['game_date'][0] for chunk in chunks] == ['2019-04-01', '2019-04-03', '2019-04-05']
+
+
+def test_statcast_iter_bounds_requests_in_flight(monkeypatch: MonkeyPatch) -> None:
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.01)
+        return pl.DataFrame({'game_date': [str(start_dt)]})
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+
+    for _ in statcast_iter('2019-04-01', '2019-04-20', verbose=False, max_in_flight=2):
+        with lock:
+            state['in_flight'] -= 1
+
+    assert state['max_in_flight'] <= 2
+
+
+def test_statcast_iter_skips_empty_chunks(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(statcast_module, '_fetch_request', lambda *args, **kwargs: pl.DataFrame())
+
+    assert list(statcast_iter('2019-04-01', '2019-04-03', verbose=False)) == []
+
+
+def test_statcast_iter_float32(monkeypatch: MonkeyPatch) -> None:
+    schemas = []
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        schemas.append(schema)
+        return pl.DataFrame({'game_date': [str(start_dt)]})
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+
+    list(statcast_iter('2019-04-01', '2019-04-02', verbose=False))
+    list(statcast_iter('2019-04-01', '2019-04-02', verbose=False, float32=True))
+
+    assert schemas == ['statcast_search'] * 2 + ['statcast_search_float32'] * 2
+
+
+def test_fetch_request_splits_truncated_responses(monkeypatch: MonkeyPatch) -> None:
+    requested = []
+
+    def _get_csv(url: str, **kwargs: Any) -> pl.DataFrame:
+        start_dt = url.split('game_date_gt=')[1].split('&')[0]
+        end_dt = url.split('game_date_lt=')[1].split('&')[0]
+        requested.append((start_dt, end_dt))
+        rows = statcast_module._MAX_SC_RESULTS if start_dt != end_dt else 1
+        return pl.DataFrame({'game_date': [end_dt] * rows, 'game_pk': [1] * rows,
+                             'at_bat_number': [1] * rows, 'pitch_number': list(range(rows))})
+
+    monkeypatch.setattr(statcast_module.statcast_ds, 'get_statcast_data_from_csv_url', _get_csv)
+
+    result = statcast_module._fetch_request(date(2019, 4, 1), date(2019, 4, 2))
+
+    assert requested == [('2019-04-01', '2019-04-02'), ('2019-04-02', '2019-04-02'), ('2019-04-01', '2019-04-01')]
+    assert result['game_date'].to_list() == ['2019-04-02', '2019-04-01']
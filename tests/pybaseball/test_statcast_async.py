@@ -0,0 +1,128 @@
+import asyncio
+import importlib
+import threading
+import time
+from datetime import date
+from typing import Any, List
+from unittest.mock import MagicMock
+
+import polars as pl
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from pybaseball.statcast_async import _hold, _open_fetcher, _request_ranges_async, statcast_async
+
+# pybaseball re-exports the statcast_async function under the module's name, so get the module itself to patch it
+statcast_async_module = importlib.import_module('pybaseball.statcast_async')
+
+
+def test_open_fetcher_limits_concurrency(monkeypatch: MonkeyPatch) -> None:
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'max_in_flight': 0}
+
+    def _get(url: str, **kwargs: Any) -> MagicMock:
+        with lock:
+            state['in_flight'] += 1
+            state['max_in_flight'] = max(state['max_in_flight'], state['in_flight'])
+        time.sleep(0.01)
+        with lock:
+            state['in_flight'] -= 1
+        return MagicMock(content=b'a\n1\n')
+
+    monkeypatch.setattr(statcast_async_module, 'aiohttp', None)
+    monkeypatch.setattr(statcast_async_module.statcast_ds.session, 'get', _get)
+
+    async def _run() -> List[bytes]:
+        async with _open_fetcher(2, 10) as fetch:
+            return list(await asyncio.gather(*[fetch(f'https://example.com/{n}') for n in range(8)]))
+
+    results = asyncio.run(_run())
+
+    assert results == [b'a\n1\n'] * 8
+    assert state['max_in_flight'] <= 2
+
+
+def test_request_ranges_async_calls_on_result(monkeypatch: MonkeyPatch) -> None:
+    async def _fetch_request(fetch: Any, start_dt: date, end_dt: date, team: Any = None,
+                             schema: str = '') -> pl.DataFrame:
+        return pl.DataFrame({'game_date': [str(start_dt)]})
+
+    monkeypatch.setattr(statcast_async_module, '_fetch_request_async', _fetch_request)
+    on_result = MagicMock()
+    date_range = [(date(2019, 4, 1), date(2019, 4, 1)), (date(2019, 4, 2), date(2019, 4, 3))]
+
+    results = asyncio.run(_request_ranges_async(MagicMock(), date_range, on_result=on_result))
+
+    assert [result['game_date'][0] for result in results] == ['2019-04-01', '2019-04-02']
+    assert sorted(call[0][0] for call in on_result.call_args_list) == date_range
+
+
+def test_request_ranges_async_cancels_on_failure(monkeypatch: MonkeyPatch) -> None:
+    cancelled = []
+
+    async def _fetch_request(fetch: Any, start_dt: date, end_dt: date, team: Any = None,
+                             schema: str = '') -> pl.DataFrame:
+        if start_dt.day == 1:
+            raise ValueError('Savant is down')
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(start_dt)
+            raise
+        return pl.DataFrame()
+
+    monkeypatch.setattr(statcast_async_module, '_fetch_request_async', _fetch_request)
+    date_range = [(date(2019, 4, 1), date(2019, 4, 1)), (date(2019, 4, 2), date(2019, 4, 2))]
+
+    async def _run() -> None:
+        await _request_ranges_async(MagicMock(), date_range)
+
+    with pytest.raises(ValueError):
+        asyncio.run(_run())
+
+    assert cancelled == [date(2019, 4, 2)]
+
+
+def test_statcast_async_bad_concurrency() -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(statcast_async('2019-04-01', '2019-04-02', concurrency=0))
+
+
+def test_hold_releases_lock_when_cancelled_while_waiting() -> None:
+    release_acquire = threading.Event()
+    lock = MagicMock()
+    lock.acquire.side_effect = lambda: release_acquire.wait(5)
+
+    async def _run() -> None:
+        async def _wait_for_lock() -> None:
+            async with _hold(lock):
+                pass
+
+        task = asyncio.ensure_future(_wait_for_lock())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The executor thread only gets the lock after the coroutine has given up on it
+        release_acquire.set()
+        deadline = time.monotonic() + 5
+        while not lock.release.called and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(_run())
+
+    lock.acquire.assert_called_once()
+    lock.release.assert_called_once()
+
+
+def test_hold_releases_lock() -> None:
+    lock = MagicMock()
+
+    async def _run() -> None:
+        async with _hold(lock):
+            lock.release.assert_not_called()
+
+    asyncio.run(_run())
+
+    lock.acquire.assert_called_once()
+    lock.release.assert_called_once()
@@ -0,0 +1,132 @@
+import importlib
+import os
+import tempfile
+from datetime import date
+from typing import Generator, List, Optional, Tuple
+
+import polars as pl
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from pybaseball import cache
+from pybaseball.cache import file_utils
+from pybaseball.statcast import StatcastException, statcast, statcast_job_status
+
+# pybaseball re-exports the statcast function under the module's name, so get the module itself to patch it
+statcast_module = importlib.import_module('pybaseball.statcast')
+
+
+@pytest.fixture(name='job_cache')
+def _job_cache(monkeypatch: MonkeyPatch) -> Generator[str, None, None]:
+    # A job keeps its progress, and the chunks' data, in a real cache
+    monkeypatch.setattr(file_utils, 'mkdir', lambda directory: os.makedirs(directory, exist_ok=True))
+    monkeypatch.setattr(statcast_module, '_JOB_BACKOFF', 0.0)
+    with tempfile.TemporaryDirectory() as directory:
+        monkeypatch.setattr(cache.config, 'enabled', True)
+        monkeypatch.setattr(cache.config, 'cache_directory', directory)
+        yield directory
+
+
+def _days_frame(start_dt: date, end_dt: date) -> pl.DataFrame:
+    days = statcast_module._days(start_dt, end_dt)
+    return pl.DataFrame({'game_date': days, 'game_pk': list(range(len(days))),
+                         'at_bat_number': [1] * len(days), 'pitch_number': [1] * len(days)},
+                        schema_overrides={'game_pk': pl.Int32, 'at_bat_number': pl.Int16, 'pitch_number': pl.Int16})
+
+
+def test_statcast_job_resumes(monkeypatch: MonkeyPatch, job_cache: str) -> None:
+    requested: List[Tuple[date, date]] = []
+    broken = {'failing': True}
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        requested.append((start_dt, end_dt))
+        if broken['failing'] and start_dt <= date(2019, 4, 20) <= end_dt:
+            raise ConnectionError('reset')
+        return _days_frame(start_dt, end_dt)
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+
+    with pytest.raises(StatcastException, match='job_id=.backfill.'):
+        statcast('2019-04-01', '2019-05-31', verbose=False, parallel=False, job_id='backfill')
+
+    status = statcast_job_status('backfill')
+    assert status['failed'] == 1 and status['planned'] == 0 and status['completed'] == status['chunks'] - 1
+    failed = [chunk for chunk in requested if chunk[0] <= date(2019, 4, 20) <= chunk[1]]
+    # Tried once, then retried with backoff
+    assert len(failed) == statcast_module._JOB_RETRIES + 1
+
+    broken['failing'] = False
+    requested.clear()
+    result = statcast('2019-04-01', '2019-05-31', verbose=False, parallel=False, job_id='backfill')
+
+    # Only the failed chunk is requested again
+    assert requested == failed[:1]
+    assert len(result) == 61
+    assert statcast_job_status('backfill')['completed'] == status['chunks']
+
+    with pytest.raises(ValueError):
+        statcast('2019-04-01', '2019-06-30', verbose=False, job_id='backfill')
+
+
+def test_statcast_job_retries_with_backoff(monkeypatch: MonkeyPatch, job_cache: str) -> None:
+    attempts: List[date] = []
+    delays: List[float] = []
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        attempts.append(start_dt)
+        if len(attempts) < 3:
+            raise ConnectionError('reset')
+        return _days_frame(start_dt, end_dt)
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+    monkeypatch.setattr(statcast_module, '_JOB_BACKOFF', 1.5)
+    monkeypatch.setattr(statcast_module.time, 'sleep', delays.append)
+
+    assert len(statcast('2019-04-01', '2019-04-01', verbose=False, parallel=False, job_id='one-day')) == 1
+    assert delays == [pytest.approx(1.5, abs=0.5), pytest.approx(3.0, abs=0.5)]
+    assert statcast_job_status('one-day')['completed'] == 1
+
+
+def test_statcast_job_requires_cache() -> None:
+    with pytest.raises(StatcastException):
+        statcast('2019-04-01', '2019-04-02', verbose=False, job_id='backfill')
+
+
+def test_statcast_job_retries_without_holding_a_worker(monkeypatch: MonkeyPatch, job_cache: str) -> None:
+    requested: List[Tuple[date, date]] = []
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        requested.append((start_dt, end_dt))
+        if start_dt == date(2019, 4, 1) and len(requested) < 4:
+            raise ConnectionError('reset')
+        return _days_frame(start_dt, end_dt)
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+    monkeypatch.setattr(statcast_module, '_JOB_BACKOFF', 0.05)
+    monkeypatch.setattr(statcast_module.statcast_ds.session, 'pool_size', 1)
+
+    assert len(statcast('2019-04-01', '2019-04-06', verbose=False, job_id='backfill')) == 6
+
+    # The one worker takes the other chunk while the failed one waits to be retried
+    first, second = (date(2019, 4, 1), date(2019, 4, 3)), (date(2019, 4, 4), date(2019, 4, 6))
+    assert requested == [first, second, first, first]
+    assert statcast_job_status('backfill')['completed'] == 2
+
+
+def test_statcast_job_plans_a_stored_range(monkeypatch: MonkeyPatch, job_cache: str) -> None:
+    requested: List[Tuple[date, date]] = []
+
+    def _fetch(start_dt: date, end_dt: date, team: Optional[str] = None, schema: str = '') -> pl.DataFrame:
+        requested.append((start_dt, end_dt))
+        return _days_frame(start_dt, end_dt)
+
+    monkeypatch.setattr(statcast_module, '_fetch_request', _fetch)
+    statcast('2019-04-01', '2019-04-06', verbose=False)
+    requested.clear()
+
+    assert len(statcast('2019-04-01', '2019-04-06', verbose=False, job_id='backfill')) == 6
+
+    # Nothing is requested, but the job still accounts for the whole range
+    assert requested == []
+    status = statcast_job_status('backfill')
+    assert status['chunks'] == 2 and status['completed'] == 2 and status['rows'] == 6
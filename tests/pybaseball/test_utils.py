@@ -2,7 +2,7 @@ from datetime import date, datetime, timedelta
 
 import pytest
 
-from pybaseball.utils import DATE_FORMAT, sanitize_date_range
+from pybaseball.utils import DATE_FORMAT, sanitize_date_range, statcast_adaptive_date_range, statcast_expected_rows
 
 
 def test_sanitize_date_range_nones() -> None:
@@ -52,3 +52,40 @@ def test_sanitize_date_range_start_dt_gt_end_dt() -> None:
     assert start_dt_date < end_dt_date
     assert str(start_dt_date) == end_dt
     assert str(end_dt_date) == start_dt
+
+
+def test_statcast_expected_rows_by_season_phase() -> None:
+    assert statcast_expected_rows(date(2019, 3, 20)) < statcast_expected_rows(date(2019, 6, 15))
+    assert statcast_expected_rows(date(2019, 10, 20)) < statcast_expected_rows(date(2019, 6, 15))
+    assert statcast_expected_rows(date(2019, 3, 1)) < statcast_expected_rows(date(2019, 6, 15))
+
+
+def test_statcast_adaptive_date_range_is_contiguous() -> None:
+    ranges = list(statcast_adaptive_date_range(date(2019, 4, 1), date(2019, 9, 30), 25000, verbose=False))
+
+    assert ranges[0][0] == date(2019, 4, 1)
+    assert ranges[-1][1] == date(2019, 9, 30)
+    for (_, previous_end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert next_start == previous_end + timedelta(days=1)
+
+
+def test_statcast_adaptive_date_range_stays_under_target() -> None:
+    for start, end in statcast_adaptive_date_range(date(2019, 4, 1), date(2019, 10, 30), 25000, verbose=False):
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        assert len(days) == 1 or sum(statcast_expected_rows(day) for day in days) <= 25000 * 0.6
+
+
+def test_statcast_adaptive_date_range_grows_on_light_days() -> None:
+    regular_season = list(statcast_adaptive_date_range(date(2019, 6, 1), date(2019, 6, 30), 25000, verbose=False))
+    postseason = list(statcast_adaptive_date_range(date(2019, 10, 3), date(2019, 10, 30), 25000, verbose=False))
+
+    assert len(postseason) < len(regular_season) < 30
+
+
+def test_statcast_adaptive_date_range_skips_offseason() -> None:
+    ranges = list(statcast_adaptive_date_range(date(2018, 10, 1), date(2019, 4, 1), 25000, verbose=False))
+
+    assert all(start.year == end.year for start, end in ranges)
+    assert date(2018, 10, 28) in [end for _, end in ranges]
+    assert date(2019, 3, 20) in [start for start, _ in ranges]
+    assert ranges[-1][1] == date(2019, 4, 1)